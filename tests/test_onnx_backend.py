@@ -0,0 +1,85 @@
+# YOLOPunk 🩸 AGPL-3.0 License
+
+"""Paridade do backend ONNX com o PyTorch nos mesmos pesos."""
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+ultralytics = pytest.importorskip("ultralytics")
+pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+
+from yolopunk.onnx_backend import OnnxDetector  # noqa: E402
+
+IMGSZ = 320
+
+
+@pytest.fixture(scope="module")
+def weights(tmp_path_factory):
+    """Exporta um yolov8n com pesos aleatórios (semente fixa) para .pt e .onnx, sem download."""
+    root = tmp_path_factory.mktemp("weights")
+    torch.manual_seed(0)
+    model = ultralytics.YOLO("yolov8n.yaml")
+    with torch.no_grad():
+        # Inicialização por fan-in: com a inicialização padrão as saídas saem quase constantes e o NMS desempata
+        # ao acaso, o que tornaria a comparação frágil
+        for module in model.model.modules():
+            if isinstance(module, torch.nn.Conv2d):
+                module.weight.normal_(0, (2.0 / module.weight[0].numel()) ** 0.5)
+                if module.bias is not None:
+                    module.bias.normal_(0, 0.5)
+            elif isinstance(module, torch.nn.BatchNorm2d):
+                module.reset_parameters()
+                module.reset_running_stats()
+    pt = root / "w.pt"
+    model.save(str(pt))
+    onnx_path = ultralytics.YOLO(str(pt)).export(format="onnx", imgsz=IMGSZ, verbose=False)
+    return pt, onnx_path
+
+
+@pytest.fixture(scope="module")
+def image():
+    """Imagem quadrada no tamanho exportado: letterbox idêntico nos dois pipelines."""
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 256, (IMGSZ // 8, IMGSZ // 8, 3), dtype=np.uint8)
+    return np.ascontiguousarray(np.kron(base, np.ones((8, 8, 1), dtype=np.uint8)))
+
+
+def test_raw_outputs_match_torch(weights, image):
+    pt, onnx_path = weights
+    detector = OnnxDetector(onnx_path)
+    tensor, _ = detector.preprocess([image])
+    onnx_out = detector.session.run(None, {detector.input_name: tensor})[0]
+
+    model = ultralytics.YOLO(str(pt)).model.float().eval()
+    with torch.no_grad():
+        torch_out = model(torch.from_numpy(tensor))
+    torch_out = torch_out[0] if isinstance(torch_out, (list, tuple)) else torch_out
+
+    assert onnx_out.shape == tuple(torch_out.shape)
+    np.testing.assert_allclose(onnx_out, torch_out.numpy(), atol=1e-3)
+
+
+def test_detections_match_torch(weights, image):
+    pt, onnx_path = weights
+    expected = ultralytics.YOLO(str(pt)).predict(image, imgsz=IMGSZ, conf=0.25, max_det=20, verbose=False)[0].boxes
+    result = OnnxDetector(onnx_path).predict(image, conf=0.25, max_det=20)[0]
+
+    assert len(result.boxes) == len(expected) > 0
+    np.testing.assert_allclose(result.boxes.xyxy, expected.xyxy.numpy(), atol=0.5)
+    np.testing.assert_allclose(result.boxes.conf, expected.conf.numpy(), atol=1e-3)
+    np.testing.assert_array_equal(result.boxes.cls, expected.cls.numpy())
+
+
+def test_unreadable_path_raises(weights, tmp_path):
+    detector = OnnxDetector(weights[1])
+    with pytest.raises(FileNotFoundError):
+        detector.predict(str(tmp_path / "missing.jpg"))
+
+
+def test_imgsz_mismatch_raises(weights, image):
+    detector = OnnxDetector(weights[1])
+    detector.predict(image, imgsz=IMGSZ)
+    with pytest.raises(ValueError, match="imgsz"):
+        detector.predict(image, imgsz=640)
@@ -55,19 +55,9 @@ __license__ = "AGPL-3.0"
 #  📥 Imports Principais
 # ═══════════════════════════════════════════════════════════════
 
-import sys
+import importlib
 from pathlib import Path
 
-# Importa módulos core (com tratamento de errors)
-try:
-    from .core import Vision
-
-    CORE_AVAILABLE = True
-except ImportError as e:
-    Vision = None
-    CORE_AVAILABLE = False
-    _core_error = str(e)
-
 # ═══════════════════════════════════════════════════════════════
 #  🔧 Configurações Iniciais
 # ═══════════════════════════════════════════════════════════════
@@ -78,10 +68,25 @@ MODELS_DIR = ROOT_DIR / "models"
 DATA_DIR = ROOT_DIR / "data"
 RESULTS_DIR = ROOT_DIR / "results"
 
-# Criar diretórios se não existirem
-MODELS_DIR.mkdir(exist_ok=True)
-DATA_DIR.mkdir(exist_ok=True)
-RESULTS_DIR.mkdir(exist_ok=True)
+
+def ensure_dir(path: Path) -> Path:
+    """Cria um diretório (e os pais) se não existir.
+
+    Os diretórios padrão (``MODELS_DIR``, ``DATA_DIR``, ``RESULTS_DIR``) não são criados no import; quem for
+    escrever neles chama esta função no primeiro uso.
+
+    Args:
+        path: Diretório a criar.
+
+    Returns:
+        O próprio ``path``.
+
+    Examples:
+        >>> cache_dir = ensure_dir(MODELS_DIR / "exports")
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
 
 # ═══════════════════════════════════════════════════════════════
 #  🔥 Exports Públicos
@@ -93,34 +98,61 @@ __all__ = [
     "RESULTS_DIR",
     # Diretórios
     "ROOT_DIR",
+    "CascadeVision",
+    "Vision",
+    "VisionPool",
     "__author__",
     "__email__",
     "__license__",
     "__version__",
+    "contrib",
+    "ensure_dir",
+    "neojudson",
 ]
 
-# Adiciona Vision se disponível
-if CORE_AVAILABLE:
-    __all__.append("Vision")
-
-# ═══════════════════════════════════════════════════════════════
-#  🚀 Inicialização
 # ═══════════════════════════════════════════════════════════════
-
-# Verificar versão do Python
-
+#  💤 Lazy Loading (PEP 562)
 # ═══════════════════════════════════════════════════════════════
-#   Módulo Contrib (Contribuições da Comunidade)
-# ═══════════════════════════════════════════════════════════════
-
-try:
-    from . import contrib
-
-    CONTRIB_AVAILABLE = True
-except ImportError as e:
-    contrib = None
-    CONTRIB_AVAILABLE = False
-    _contrib_error = str(e)
 
-if CONTRIB_AVAILABLE:
-    __all__.append("contrib")
+# Atributo público -> (módulo, atributo). Nada disso é importado em `import yolopunk`:
+# core puxa ultralytics/torch e contrib puxa os módulos da comunidade.
+_LAZY_ATTRIBUTES = {
+    "CascadeVision": (".cascade", "CascadeVision"),
+    "Vision": (".core", "Vision"),
+    "VisionPool": (".core", "VisionPool"),
+    "contrib": (".contrib", None),
+    "neojudson": (".contrib.neojudson", None),
+}
+
+# Flag de disponibilidade -> atributo cujo import ela testa
+_AVAILABILITY_FLAGS = {
+    "CORE_AVAILABLE": "Vision",
+    "CONTRIB_AVAILABLE": "contrib",
+}
+
+
+def __getattr__(name: str):
+    """Importa sob demanda os atributos pesados do pacote."""
+    if name in _LAZY_ATTRIBUTES:
+        module_name, attribute = _LAZY_ATTRIBUTES[name]
+        try:
+            module = importlib.import_module(module_name, __name__)
+            value = getattr(module, attribute) if attribute else module
+        except ImportError as e:
+            # Graceful degradation: mantém o contrato antigo (atributo None + mensagem de erro)
+            globals()[f"_{name.lower()}_error"] = str(e)
+            value = None
+        globals()[name] = value
+        return value
+
+    if name in _AVAILABILITY_FLAGS:
+        value = __getattr__(_AVAILABILITY_FLAGS[name]) is not None
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    """Inclui os atributos lazy no ``dir(yolopunk)``."""
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | set(_AVAILABILITY_FLAGS))
@@ -0,0 +1,423 @@
+# YOLOPunk 🩸 AGPL-3.0 License
+
+"""Autotuning de threads, batch e ``imgsz`` por máquina.
+
+Os padrões do torch e do OpenCV (uma thread por core lógico) e um batch fixo raramente são o melhor ponto de
+operação: em hosts de 32 ou 64 cores o YOLO pequeno satura bem antes de usar todas as threads e passa a perder tempo
+em sincronização. ``tune`` varre as combinações em imagens de amostra locais, mede throughput e latência de cada uma
+e escolhe a de maior throughput dentro do SLO de latência.
+
+O resultado fica em ``TuneStore`` (um JSON em ``MODELS_DIR``), indexado pela identidade da máquina
+(``host_fingerprint``) e do modelo, e é aplicado automaticamente pelos próximos ``Vision`` criados na mesma máquina.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import platform
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+from . import MODELS_DIR, ensure_dir
+from .registry import weights_fingerprint
+from .utils import cv2, np
+
+# Arquivo padrão das configurações salvas
+AUTOTUNE_PATH = MODELS_DIR / "autotune.json"
+
+# Batches varridos por padrão
+DEFAULT_BATCH_SIZES = (1, 2, 4, 8)
+
+# SLO de latência padrão (ms por chamada de ``detect``)
+DEFAULT_LATENCY_SLO_MS = 100.0
+
+# Versão do formato do arquivo; entradas de outra versão são ignoradas
+_STORE_VERSION = 1
+
+# Distribuições cujas versões mudam o desempenho (a primeira encontrada de cada grupo vale)
+_PERF_PACKAGES = (
+    ("numpy",),
+    ("torch",),
+    ("onnxruntime", "onnxruntime-gpu"),
+    ("opencv-python", "opencv-python-headless", "opencv-contrib-python", "opencv-contrib-python-headless"),
+)
+
+
+def available_cpus() -> int:
+    """Número de CPUs que este processo pode usar (respeita afinidade e cgroups via ``sched_getaffinity``)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _cpu_model() -> str:
+    """Modelo do processador (``/proc/cpuinfo`` no Linux, ``platform.processor()`` nos demais)."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def _dist_version(names: tuple[str, ...]) -> str | None:
+    """Versão instalada da primeira distribuição de ``names``, sem importar o pacote."""
+    for name in names:
+        try:
+            return metadata.version(name)
+        except metadata.PackageNotFoundError:
+            continue
+    return None
+
+
+@lru_cache(maxsize=1)
+def host_fingerprint() -> str:
+    """Identidade da máquina para fins de desempenho.
+
+    Combina sistema, arquitetura, modelo do processador, CPUs disponíveis e as versões de numpy, torch, ONNX Runtime
+    e OpenCV (lidas dos metadados, sem importar nada pesado). Uma atualização de biblioteca invalida as
+    configurações salvas.
+
+    Returns:
+        Hash hexadecimal (16 caracteres).
+    """
+    payload = {
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "cpu": _cpu_model(),
+        "cpus": available_cpus(),
+        "python": ".".join(platform.python_version_tuple()[:2]),
+        "packages": [_dist_version(names) for names in _PERF_PACKAGES],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def thread_candidates(cpus: int | None = None) -> tuple[int, ...]:
+    """Números de threads varridos por padrão: potências de 2 até ``cpus``, mais o próprio ``cpus``."""
+    cpus = cpus or available_cpus()
+    values = {cpus}
+    n = 1
+    while n < cpus:
+        values.add(n)
+        n *= 2
+    return tuple(sorted(values))
+
+
+def apply_threads(
+    threads: int | None = None,
+    interop_threads: int | None = None,
+    cv2_threads: int | None = None,
+    torch: bool = True,
+) -> None:
+    """Ajusta as threads do processo (afeta todos os modelos carregados nele).
+
+    Args:
+        threads: Threads intra-op do torch. None mantém o valor atual.
+        interop_threads: Threads inter-op do torch. O torch só aceita a mudança antes do primeiro trabalho
+            paralelo; depois disso o valor é ignorado silenciosamente.
+        cv2_threads: Threads do OpenCV. None mantém o valor atual.
+        torch: Se False, não importa nem ajusta o torch (backend onnxruntime).
+    """
+    if cv2_threads is not None:
+        cv2.setNumThreads(cv2_threads)
+    if not torch or (threads is None and interop_threads is None):
+        return
+    try:
+        import torch as _torch
+    except ImportError:
+        return
+    if threads is not None:
+        _torch.set_num_threads(threads)
+    if interop_threads is not None and _torch.get_num_interop_threads() != interop_threads:
+        try:
+            _torch.set_num_interop_threads(interop_threads)
+        except RuntimeError:
+            pass
+
+
+def _current_threads(torch: bool = True) -> dict:
+    """Threads atuais do processo, nas chaves de ``apply_threads`` (torch ausente ou desativado sai como None)."""
+    current = {"threads": None, "interop_threads": None, "cv2_threads": cv2.getNumThreads()}
+    if torch:
+        try:
+            import torch as _torch
+        except ImportError:
+            return current
+        current.update(threads=_torch.get_num_threads(), interop_threads=_torch.get_num_interop_threads())
+    return current
+
+
+class TuneStore:
+    """Configurações do autotuner persistidas em JSON, por (máquina, modelo).
+
+    A escrita é atômica (arquivo temporário + ``os.replace``), então leitores nunca veem um JSON pela metade. Com
+    vários processos gravando ao mesmo tempo, a última escrita vence.
+
+    Args:
+        path: Arquivo JSON. Padrão: ``MODELS_DIR / "autotune.json"``.
+
+    Examples:
+        >>> store = TuneStore()
+        >>> key = store.make_key("yolov8n.pt", backend="torch", device="cpu")
+        >>> store.get(key)  # None se ainda não calibrado nesta máquina
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        """Inicializa o store (o arquivo é criado na primeira gravação)."""
+        self.path = Path(path) if path is not None else AUTOTUNE_PATH
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(
+        model: str | Path,
+        backend: str = "torch",
+        device: str = "cpu",
+        precision: str = "fp32",
+        host: str | None = None,
+    ) -> str:
+        """Chave de uma configuração: máquina + pesos + backend + device + precisão."""
+        host = host or host_fingerprint()
+        return f"{host}:{weights_fingerprint(model)}:{backend}:{device}:{precision}"
+
+    def _read(self) -> dict:
+        """Conteúdo do arquivo (vazio se ausente, corrompido ou de outra versão)."""
+        try:
+            data = json.loads(self.path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if data.get("version") != _STORE_VERSION:
+            return {}
+        return data.get("entries", {})
+
+    def get(self, key: str) -> dict | None:
+        """Configuração salva para a chave, ou None."""
+        if not self.path.exists():
+            return None
+        with self._lock:
+            entry = self._read().get(key)
+        return dict(entry["settings"]) if entry else None
+
+    def lookup(
+        self,
+        model: str | Path,
+        backend: str = "torch",
+        device: str = "cpu",
+        precision: str = "fp32",
+    ) -> dict | None:
+        """Configuração salva para o modelo nesta máquina, ou None (sem hashear os pesos se o arquivo não existe)."""
+        if not self.path.exists():
+            return None
+        return self.get(self.make_key(model, backend, device, precision))
+
+    def put(self, key: str, settings: dict, report: dict | None = None) -> None:
+        """Grava (ou substitui) a configuração de uma chave.
+
+        Args:
+            key: Chave de ``make_key``.
+            settings: Configuração aplicável (``threads``, ``interop_threads``, ``cv2_threads``, ``batch_size``,
+                ``imgsz``).
+            report: Medições que justificam a escolha, guardadas junto para consulta.
+        """
+        with self._lock:
+            entries = self._read()
+            entries[key] = {"settings": dict(settings), "report": report or {}, "created": time.time()}
+            self._write(entries)
+
+    def delete(self, key: str) -> bool:
+        """Remove a configuração de uma chave. Retorna True se existia."""
+        with self._lock:
+            entries = self._read()
+            if entries.pop(key, None) is None:
+                return False
+            self._write(entries)
+        return True
+
+    def _write(self, entries: dict) -> None:
+        """Regrava o arquivo inteiro de forma atômica (chamado com o lock adquirido)."""
+        ensure_dir(self.path.parent)
+        fd, tmp = tempfile.mkstemp(prefix=".autotune-", suffix=".json", dir=self.path.parent)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"version": _STORE_VERSION, "entries": entries}, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def __repr__(self) -> str:
+        """Representação string do objeto."""
+        return f"TuneStore(path={str(self.path)!r})"
+
+
+def load_samples(source: Any, max_images: int = 16) -> list[np.ndarray]:
+    """Carrega imagens de amostra (BGR) para o autotuner.
+
+    Args:
+        source: Pasta, arquivo de imagem, array BGR ou lista deles.
+        max_images: Máximo de imagens carregadas (ordem estável).
+
+    Returns:
+        Lista de arrays BGR HWC uint8.
+    """
+    from .onnx_backend import IMAGE_SUFFIXES
+
+    if hasattr(source, "shape"):
+        items = [source] if len(source.shape) == 3 else list(source)
+    elif isinstance(source, (str, Path)):
+        path = Path(source)
+        if path.is_dir():
+            items = sorted(p for p in path.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+        else:
+            items = [path]
+    else:
+        items = list(source)
+
+    images = []
+    for item in items[:max_images]:
+        img = item if hasattr(item, "shape") else cv2.imread(str(item), cv2.IMREAD_COLOR)
+        if img is None:
+            raise FileNotFoundError(f"Imagem de amostra não encontrada ou inválida: {item}")
+        images.append(img)
+    if not images:
+        raise ValueError(f"Nenhuma imagem de amostra em {source}")
+    return images
+
+
+def _measure(detector: Any, images: list, batch_size: int, imgsz: int | None, repeat: int, warmup: int) -> dict:
+    """Mede ``detect`` com lotes de ``batch_size`` imagens: latência por chamada e throughput."""
+    kwargs: dict[str, Any] = {"batch": batch_size}
+    if imgsz is not None:
+        kwargs["imgsz"] = imgsz
+    latencies = []
+    for call in range(warmup + repeat):
+        batch = [images[(call * batch_size + j) % len(images)] for j in range(batch_size)]
+        t0 = time.perf_counter()
+        detector.detect(batch, return_format="arrays", **kwargs)
+        if call >= warmup:
+            latencies.append(1000.0 * (time.perf_counter() - t0))
+    p50, p95 = np.percentile(latencies, (50, 95))
+    return {
+        "latency_p50_ms": float(p50),
+        "latency_p95_ms": float(p95),
+        "images_per_s": 1000.0 * batch_size * len(latencies) / sum(latencies),
+    }
+
+
+def _select(runs: list[dict]) -> dict:
+    """Maior throughput entre as execuções dentro do SLO; sem nenhuma, a de menor latência."""
+    within = [run for run in runs if run["meets_slo"]]
+    if within:
+        return max(within, key=lambda run: run["images_per_s"])
+    return min(runs, key=lambda run: run["latency_p95_ms"])
+
+
+def tune(
+    detector: Any,
+    images: list[np.ndarray],
+    latency_slo_ms: float = DEFAULT_LATENCY_SLO_MS,
+    threads: tuple[int, ...] | None = None,
+    cv2_threads: tuple[int, ...] | None = None,
+    batch_sizes: tuple[int, ...] = DEFAULT_BATCH_SIZES,
+    imgsz: tuple[int, ...] | None = None,
+    repeat: int = 5,
+    warmup: int = 1,
+) -> dict:
+    """Varre threads, batch e ``imgsz`` e aplica a melhor configuração em ``detector``.
+
+    A varredura tem duas etapas. Primeiro a grade ``imgsz`` x threads do torch/ONNX Runtime x batch, com o OpenCV
+    usando o mesmo número de threads; para cada (``imgsz``, threads) os batches crescem até estourar o SLO (lotes
+    maiores só aumentam a latência da chamada). Depois, com o vencedor fixo, varre só as threads do OpenCV.
+
+    O SLO vale para o p95 da latência de uma chamada de ``detect`` com o lote inteiro. Entre as configurações que o
+    cumprem vence a de maior throughput; se nenhuma cumprir, a de menor latência (e ``meets_slo`` sai False).
+
+    Args:
+        detector: ``Vision`` a calibrar.
+        images: Imagens de amostra BGR (``load_samples``).
+        latency_slo_ms: Latência máxima (p95, ms) por chamada.
+        threads: Threads intra-op candidatas. Padrão: ``thread_candidates()``.
+        cv2_threads: Threads do OpenCV candidatas. Padrão: as mesmas de ``threads``.
+        batch_sizes: Batches candidatos. Modelos ONNX com batch fixo usam só 1.
+        imgsz: Tamanhos de entrada candidatos (backend torch). Tamanhos menores trocam acurácia por velocidade,
+            então só entram na varredura se passados. Padrão: (640,). Ignorado no backend onnxruntime, cuja
+            entrada é fixada na exportação.
+        repeat: Chamadas medidas por configuração.
+        warmup: Chamadas descartadas antes de medir cada configuração.
+
+    Returns:
+        Relatório com ``host``, ``latency_slo_ms``, ``meets_slo``, ``best`` (configuração aplicada), ``best_run``
+        (medições dela), ``runs`` (todas as medições) e ``elapsed_s``.
+    """
+    if not images:
+        raise ValueError("Lista de imagens de amostra vazia")
+    started = time.perf_counter()
+    torch_backend = detector.backend == "torch"
+    threads = tuple(threads or thread_candidates())
+    sizes: tuple = tuple(imgsz or (640,)) if torch_backend else (None,)
+    batch_sizes = tuple(sorted(set(batch_sizes)))
+    if not torch_backend and not detector.model.dynamic_batch:
+        batch_sizes = (1,)
+    interop = 1 if torch_backend else None
+
+    def run(size: int | None, n: int, n_cv2: int, batch_size: int) -> dict:
+        settings = {
+            "threads": n,
+            "interop_threads": interop,
+            "cv2_threads": n_cv2,
+            "batch_size": batch_size,
+            "imgsz": size,
+        }
+        detector.apply_tuning(settings)
+        result = {**settings, **_measure(detector, images, batch_size, size, repeat, warmup)}
+        result["meets_slo"] = result["latency_p95_ms"] <= latency_slo_ms
+        if detector.verbose:
+            print(
+                f"🩸 autotune threads={n} cv2={n_cv2} batch={batch_size} imgsz={size}: "
+                f"{result['images_per_s']:.1f} img/s, p95 {result['latency_p95_ms']:.1f} ms"
+            )
+        return result
+
+    previous = dict(detector.tuning)
+    # ``previous`` pode não ter threads (detector sem tuning): o estado real do processo é restaurado à parte
+    previous_threads = _current_threads(torch=torch_backend)
+    runs: list[dict] = []
+    try:
+        for size in sizes:
+            for n in threads:
+                for batch_size in batch_sizes:
+                    runs.append(run(size, n, n, batch_size))
+                    if not runs[-1]["meets_slo"]:
+                        break
+
+        best = _select(runs)
+        stage = [best]
+        for n_cv2 in tuple(cv2_threads or threads):
+            if n_cv2 != best["cv2_threads"]:
+                stage.append(run(best["imgsz"], best["threads"], n_cv2, best["batch_size"]))
+        runs += stage[1:]
+        best = _select(stage)
+    except BaseException:
+        detector.apply_tuning(previous)
+        apply_threads(**previous_threads, torch=torch_backend)
+        raise
+
+    settings = {name: best[name] for name in ("threads", "interop_threads", "cv2_threads", "batch_size", "imgsz")}
+    detector.apply_tuning(settings)
+    return {
+        "host": host_fingerprint(),
+        "latency_slo_ms": latency_slo_ms,
+        "meets_slo": best["meets_slo"],
+        "best": settings,
+        "best_run": best,
+        "runs": runs,
+        "elapsed_s": time.perf_counter() - started,
+    }
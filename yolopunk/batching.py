@@ -0,0 +1,239 @@
+# YOLOPunk 🩸 AGPL-3.0 License
+
+"""Micro-batching de requisições concorrentes.
+
+Agrupa chamadas de imagem única vindas de várias threads em um único
+forward pass, limitado por tamanho máximo de batch e tempo máximo de espera.
+"""
+
+from __future__ import annotations
+
+import collections
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+
+
+class _Request:
+    """Requisição pendente na fila do batcher."""
+
+    __slots__ = ("enqueued_at", "future", "item", "key")
+
+    def __init__(self, item: Any, key: Hashable):
+        self.item = item
+        self.key = key
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class MicroBatcher:
+    """Agrupa requisições concorrentes em batches para um único forward pass.
+
+    Uma thread de fundo consome a fila: espera pela primeira requisição e então
+    coleta outras com a mesma chave até atingir ``max_batch_size`` ou até
+    ``max_wait_ms`` se esgotar. Requisições com chaves diferentes (ex.: outro
+    ``conf``) ficam para o próximo batch.
+
+    Args:
+        predict_fn: Função que recebe a chave e a lista de itens e retorna uma
+            lista de resultados na mesma ordem.
+        max_batch_size: Número máximo de itens por batch.
+        max_wait_ms: Tempo máximo (ms) que a primeira requisição espera por
+            companheiras de batch.
+        name: Nome da thread de fundo.
+
+    Examples:
+        >>> batcher = MicroBatcher(lambda key, items: [x * 2 for x in items])
+        >>> batcher.submit(21)
+        42
+        >>> batcher.close()
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[Hashable, list], list],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        name: str = "yolopunk-microbatcher",
+    ):
+        """Inicializa o batcher e inicia a thread de fundo."""
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size deve ser >= 1, recebido: {max_batch_size}")
+        if max_wait_ms < 0:
+            raise ValueError(f"max_wait_ms deve ser >= 0, recebido: {max_wait_ms}")
+
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._queue: queue.Queue[_Request | None] = queue.Queue()
+        self._pending: collections.deque[_Request] = collections.deque()
+        self._closed = False
+        self._lock = threading.Lock()
+
+        # Métricas
+        self._requests = 0
+        self._batches = 0
+        self._histogram: collections.Counter[int] = collections.Counter()
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any, key: Hashable = None) -> Any:
+        """Enfileira um item e bloqueia até o resultado estar disponível.
+
+        Args:
+            item: Item a processar (ex.: caminho ou array de uma imagem).
+            key: Chave de compatibilidade; só itens com a mesma chave são
+                agrupados no mesmo batch.
+
+        Returns:
+            Resultado correspondente ao item.
+        """
+        return self.submit_async(item, key).result()
+
+    def submit_async(self, item: Any, key: Hashable = None) -> Future:
+        """Enfileira um item sem bloquear.
+
+        Args:
+            item: Item a processar.
+            key: Chave de compatibilidade do batch.
+
+        Returns:
+            Future que recebe o resultado do item.
+        """
+        request = _Request(item, key)
+        # Checagem e put sob o mesmo lock do ``close``: nada entra na fila depois do sentinela de fechamento
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher já foi fechado")
+            self._queue.put(request)
+        return request.future
+
+    def _next_request(self, timeout: float | None) -> _Request | None:
+        """Retorna a próxima requisição, priorizando as adiadas."""
+        if self._pending:
+            return self._pending.popleft()
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _collect(self, first: _Request) -> list[_Request]:
+        """Coleta requisições compatíveis com ``first`` até encher o batch."""
+        batch = [first]
+        deferred: list[_Request] = []
+        deadline = first.enqueued_at + self.max_wait_ms / 1000.0
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if self._pending:
+                request = self._pending.popleft()
+            elif remaining <= 0:
+                # Prazo esgotado: aproveita apenas o que já está na fila
+                try:
+                    request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            else:
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if request is None:
+                # Sentinela de fechamento: devolve para o loop principal
+                self._queue.put(None)
+                break
+            if request.key == first.key:
+                batch.append(request)
+            else:
+                deferred.append(request)
+
+        self._pending.extend(deferred)
+        return batch
+
+    def _run(self) -> None:
+        """Loop da thread de fundo."""
+        while True:
+            first = self._next_request(timeout=None)
+            if first is None:
+                break
+
+            batch = self._collect(first)
+            started = time.monotonic()
+            waits = [started - r.enqueued_at for r in batch]
+
+            with self._lock:
+                self._requests += len(batch)
+                self._batches += 1
+                self._histogram[len(batch)] += 1
+                self._wait_total += sum(waits)
+                self._wait_max = max(self._wait_max, *waits)
+
+            try:
+                results = self.predict_fn(first.key, [r.item for r in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"predict_fn retornou {len(results)} resultados para {len(batch)} itens")
+            except BaseException as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+
+            for request, result in zip(batch, results):
+                request.future.set_result(result)
+
+        # Falha requisições que sobraram após o fechamento
+        leftovers = list(self._pending)
+        self._pending.clear()
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                leftovers.append(request)
+        for request in leftovers:
+            request.future.set_exception(RuntimeError("MicroBatcher fechado antes de processar a requisição"))
+
+    def stats(self) -> dict:
+        """Retorna métricas do batcher.
+
+        Returns:
+            Dicionário com ``queue_depth``, ``requests``, ``batches``,
+            ``mean_batch_size``, ``batch_size_histogram``, ``mean_wait_ms`` e
+            ``max_wait_ms``.
+        """
+        with self._lock:
+            requests = self._requests
+            batches = self._batches
+            return {
+                "queue_depth": self._queue.qsize() + len(self._pending),
+                "requests": requests,
+                "batches": batches,
+                "mean_batch_size": requests / batches if batches else 0.0,
+                "batch_size_histogram": dict(sorted(self._histogram.items())),
+                "mean_wait_ms": 1000.0 * self._wait_total / requests if requests else 0.0,
+                "max_wait_ms": 1000.0 * self._wait_max,
+            }
+
+    def close(self, timeout: float | None = None) -> None:
+        """Para a thread de fundo após esvaziar o batch em andamento.
+
+        Args:
+            timeout: Tempo máximo (s) para aguardar a thread terminar.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join(timeout)
+
+    def __repr__(self) -> str:
+        """Representação string do objeto."""
+        return f"MicroBatcher(max_batch_size={self.max_batch_size}, max_wait_ms={self.max_wait_ms})"
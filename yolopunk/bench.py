@@ -0,0 +1,624 @@
+# YOLOPunk 🩸 AGPL-3.0 License
+
+"""Benchmarks do YOLOPunk.
+
+Mede custos que não aparecem em ``Vision.benchmark``: o tempo de ``import yolopunk``, as operações de
+``yolopunk.boxes`` em escala e o caminho real ``load_image`` → ``resize_image`` → ``detect`` → ``draw_boxes`` →
+``save_image`` sobre imagens e vídeos sintéticos, com percentis de latência, throughput e pico de RSS.
+
+Uso pela linha de comando:
+    $ python -m yolopunk.bench import --budget-ms 100
+    $ python -m yolopunk.bench boxes --sizes 1000 10000 100000
+    $ python -m yolopunk.bench pipeline --image-sizes 640 1280 --batch-sizes 1 8 --threads 1 4 --output bench.json
+    $ python -m yolopunk.bench pipeline --baseline bench.json --tolerance 0.1
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+try:
+    import resource
+
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    RESOURCE_AVAILABLE = False
+    resource = None
+
+# Tamanhos padrão do micro-benchmark de boxes
+BOX_BENCH_SIZES = (1_000, 10_000, 100_000)
+
+# Estágios medidos por `bench_pipeline`, na ordem do caminho real
+PIPELINE_STAGES = ("load_image", "resize_image", "detect", "draw_boxes", "save_image")
+
+# Métricas comparadas com o baseline: (caminho, maior é melhor)
+_BASELINE_METRICS = (
+    (("end_to_end", "p50_ms"), False),
+    (("end_to_end", "p95_ms"), False),
+    (("end_to_end", "images_per_s"), True),
+    *((("stages", stage, "p50_ms"), False) for stage in PIPELINE_STAGES),
+)
+
+# Orçamento para `import yolopunk` em um interpretador limpo
+IMPORT_BUDGET_MS = 100.0
+
+# Módulos que não podem ser carregados por `import yolopunk`
+HEAVY_MODULES = ("torch", "ultralytics", "cv2", "onnxruntime")
+
+_IMPORT_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"ms": 1000.0 * elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import_time(module: str = "yolopunk", repeat: int = 5) -> dict:
+    """Mede o tempo de import de um módulo em interpretadores novos.
+
+    Cada repetição roda em um subprocesso, para que caches de ``sys.modules`` não mascarem o custo real.
+
+    Args:
+        module: Gnome do módulo a importar.
+        repeat: Número de medições.
+
+    Returns:
+        Dicionário com ``min_ms``, ``median_ms``, ``max_ms`` e ``heavy_modules`` (módulos pesados carregados).
+
+    Examples:
+        >>> measure_import_time("yolopunk")["median_ms"]
+    """
+    code = _IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)
+    timings = []
+    heavy: set[str] = set()
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        sample = json.loads(output.strip().splitlines()[-1])
+        timings.append(sample["ms"])
+        heavy.update(sample["heavy"])
+
+    return {
+        "module": module,
+        "min_ms": min(timings),
+        "median_ms": statistics.median(timings),
+        "max_ms": max(timings),
+        "heavy_modules": sorted(heavy),
+    }
+
+
+def check_import_budget(budget_ms: float = IMPORT_BUDGET_MS, module: str = "yolopunk", repeat: int = 5) -> dict:
+    """Verifica se o import respeita o orçamento e não carrega módulos pesados.
+
+    Args:
+        budget_ms: Orçamento (ms) para a mediana do tempo de import.
+        module: Gnome do módulo a importar.
+        repeat: Número de medições.
+
+    Returns:
+        Resultado de ``measure_import_time`` acrescido de ``budget_ms`` e ``ok``.
+    """
+    result = measure_import_time(module, repeat=repeat)
+    result["budget_ms"] = budget_ms
+    result["ok"] = result["median_ms"] <= budget_ms and not result["heavy_modules"]
+    return result
+
+
+def synthetic_boxes(n: int, num_objects: int | None = None, num_classes: int = 80, seed: int = 0) -> tuple:
+    """Gera detecções sintéticas parecidas com a saída de um detector antes do NMS.
+
+    Cada objeto recebe várias boxes ruidosas ao redor da posição real, com a mesma classe e scores variados.
+
+    Args:
+        n: Número total de boxes.
+        num_objects: Número de objetos reais. Padrão: ``n // 50``.
+        num_classes: Número de classes.
+        seed: Semente do gerador.
+
+    Returns:
+        Tupla (boxes (n, 4) ``xyxy`` float32, scores (n,) float32, class_ids (n,) int32).
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    num_objects = num_objects or max(1, n // 50)
+    centers = rng.uniform(0, 4096, (num_objects, 2))
+    sizes = rng.uniform(16, 256, (num_objects, 2))
+    classes = rng.integers(0, num_classes, num_objects)
+    owner = rng.integers(0, num_objects, n)
+    jitter = rng.normal(0, 0.08, (n, 4)) * np.tile(sizes[owner], 2)
+    half = sizes[owner] / 2
+    boxes = np.concatenate([centers[owner] - half, centers[owner] + half], axis=1) + jitter
+    boxes[:, 2:] = np.maximum(boxes[:, 2:], boxes[:, :2] + 1)
+    scores = rng.uniform(0.05, 1.0, n)
+    return boxes.astype(np.float32), scores.astype(np.float32), classes[owner].astype(np.int32)
+
+
+def _time_ms(fn: Any, repeat: int) -> float:
+    """Mediana do tempo de ``fn()`` em ms."""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        timings.append(1000.0 * (time.perf_counter() - t0))
+    return statistics.median(timings)
+
+
+def bench_boxes(sizes: tuple[int, ...] = BOX_BENCH_SIZES, repeat: int = 3, iou_block: int = 256) -> list[dict]:
+    """Mede conversões, matriz de IoU, NMS e WBF de ``yolopunk.boxes`` para vários números de boxes.
+
+    A matriz de IoU é medida contra um bloco fixo de ``iou_block`` boxes (uma matriz N×N completa com 100k boxes
+    não cabe em memória), então o tempo deve crescer linearmente com N.
+
+    O NMS é medido por classe, agnóstico e agnóstico com muitos sobreviventes (um objeto por box, o pior caso
+    de um NMS guloso que compara cada box mantida com todas as restantes).
+
+    Args:
+        sizes: Números de boxes.
+        repeat: Repetições por medição (vale a mediana).
+        iou_block: Número de colunas da matriz de IoU.
+
+    Returns:
+        Lista com um dicionário por tamanho: ``boxes``, o tempo (ms) de cada operação e quantas boxes cada NMS
+        manteve (``kept``, ``kept_sparse``).
+
+    Examples:
+        >>> for row in bench_boxes((1_000, 100_000)):
+        ...     print(row["boxes"], row["nms_ms"])
+    """
+    from . import boxes as ops
+
+    rows = []
+    for n in sizes:
+        boxes, scores, class_ids = synthetic_boxes(n)
+        sparse_boxes, sparse_scores, _ = synthetic_boxes(n, num_objects=n)
+        block = boxes[:iou_block]
+        keep = ops.nms(boxes, scores, 0.5, class_ids=class_ids)
+        rows.append(
+            {
+                "boxes": n,
+                "convert_ms": _time_ms(lambda: ops.cxcywh_to_xyxy(ops.xyxy_to_cxcywh(boxes)), repeat),
+                "iou_ms": _time_ms(lambda: ops.box_iou(boxes, block), repeat),
+                "giou_ms": _time_ms(lambda: ops.box_giou(boxes, block), repeat),
+                "diou_ms": _time_ms(lambda: ops.box_diou(boxes, block), repeat),
+                "nms_ms": _time_ms(lambda: ops.nms(boxes, scores, 0.5, class_ids=class_ids), repeat),
+                "nms_agnostic_ms": _time_ms(lambda: ops.nms(boxes, scores, 0.5), repeat),
+                "nms_sparse_ms": _time_ms(lambda: ops.nms(sparse_boxes, sparse_scores, 0.5), repeat),
+                "wbf_ms": _time_ms(lambda: ops.weighted_boxes_fusion(boxes, scores, class_ids, 0.55), repeat),
+                "kept": len(keep),
+                "kept_sparse": len(ops.nms(sparse_boxes, sparse_scores, 0.5)),
+            }
+        )
+    return rows
+
+
+def percentiles(samples_ms: list[float]) -> dict:
+    """Resume amostras de latência.
+
+    Args:
+        samples_ms: Latências em ms.
+
+    Returns:
+        Dicionário com ``n``, ``mean_ms``, ``p50_ms``, ``p95_ms``, ``p99_ms`` e ``max_ms``.
+    """
+    import numpy as np
+
+    if not samples_ms:
+        return {"n": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    values = np.asarray(samples_ms, dtype=np.float64)
+    p50, p95, p99 = np.percentile(values, (50, 95, 99))
+    return {
+        "n": len(values),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(values.max()),
+    }
+
+
+def peak_rss_mb() -> float | None:
+    """Pico de memória residente do processo (MB) até agora, ou None se indisponível.
+
+    É o ``ru_maxrss`` do processo inteiro: cumulativo e monotônico, não dá para zerar entre configurações. Numa
+    grade, cada leitura é o máximo de todas as configurações já rodadas, não o pico de uma delas.
+    """
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB; macOS em bytes
+    return peak / (1024**2 if sys.platform == "darwin" else 1024)
+
+
+def make_synthetic_images(folder: str | Path, count: int, size: int, seed: int = 0) -> list[Path]:
+    """Gera imagens JPEG sintéticas (fundo com ruído e formas coloridas).
+
+    Args:
+        folder: Diretório de saída.
+        count: Número de imagens.
+        size: Lado maior da imagem; a proporção é 4:3.
+        seed: Semente do gerador.
+
+    Returns:
+        Caminhos das imagens geradas.
+    """
+    import cv2
+    import numpy as np
+
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    width, height = size, size * 3 // 4
+    paths = []
+    for i in range(count):
+        img = rng.integers(0, 64, (height, width, 3), dtype=np.uint8)
+        for _ in range(8):
+            x1, y1 = int(rng.integers(0, width - 2)), int(rng.integers(0, height - 2))
+            x2 = min(width - 1, x1 + int(rng.integers(width // 20, width // 4)))
+            y2 = min(height - 1, y1 + int(rng.integers(height // 20, height // 4)))
+            cv2.rectangle(img, (x1, y1), (x2, y2), tuple(int(c) for c in rng.integers(64, 256, 3)), -1)
+        path = folder / f"synthetic_{size}_{i:05d}.jpg"
+        cv2.imwrite(str(path), img)
+        paths.append(path)
+    return paths
+
+
+def make_synthetic_video(path: str | Path, frames: int, size: int, fps: float = 30.0, seed: int = 0) -> Path:
+    """Gera um vídeo sintético com formas em movimento.
+
+    Args:
+        path: Arquivo de saída (.mp4).
+        frames: Número de frames.
+        size: Largura do vídeo; a proporção é 16:9.
+        fps: Frames por segundo.
+        seed: Semente do gerador.
+
+    Returns:
+        Caminho do vídeo.
+    """
+    import cv2
+    import numpy as np
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    width, height = size, size * 9 // 16
+    background = rng.integers(0, 64, (height, width, 3), dtype=np.uint8)
+    starts = rng.uniform(0, 1, (6, 2)) * (width, height)
+    speeds = rng.uniform(-4, 4, (6, 2))
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    try:
+        for t in range(frames):
+            frame = background.copy()
+            for (x, y), (dx, dy) in zip(starts, speeds):
+                cx, cy = int((x + dx * t) % width), int((y + dy * t) % height)
+                cv2.rectangle(frame, (cx, cy), (cx + width // 10, cy + height // 8), (200, 40, 40), -1)
+            writer.write(frame)
+    finally:
+        writer.release()
+    return path
+
+
+def _get_threads() -> tuple[int, int | None]:
+    """Threads atuais do OpenCV e do torch (None se o torch não estiver instalado)."""
+    import cv2
+
+    try:
+        import torch
+    except ImportError:
+        return cv2.getNumThreads(), None
+    return cv2.getNumThreads(), torch.get_num_threads()
+
+
+def _set_threads(threads: int | None, defaults: tuple[int, int | None]) -> None:
+    """Ajusta threads do torch (se instalado) e do OpenCV; None restaura ``defaults`` (de ``_get_threads``)."""
+    import cv2
+
+    cv2_threads, torch_threads = (threads, threads) if threads is not None else defaults
+    cv2.setNumThreads(cv2_threads)
+    if torch_threads is not None:
+        try:
+            import torch
+
+            torch.set_num_threads(torch_threads)
+        except ImportError:
+            pass
+
+
+def bench_pipeline(
+    model: str = "yolov8n.pt",
+    backend: str = "torch",
+    device: str | None = "cpu",
+    image_sizes: tuple[int, ...] = (640,),
+    batch_sizes: tuple[int, ...] = (1,),
+    threads: tuple[int | None, ...] = (None,),
+    images: int = 32,
+    imgsz: int = 640,
+    warmup: int = 2,
+    video_frames: int = 0,
+    workdir: str | Path | None = None,
+) -> dict:
+    """Mede o caminho real de ponta a ponta em uma grade de configurações.
+
+    Para cada combinação (tamanho de imagem, batch, threads) roda ``load_image`` → ``resize_image`` → ``detect`` →
+    ``draw_boxes`` → ``save_image`` sobre imagens sintéticas. Latências de estágio são por imagem (o tempo de um
+    ``detect`` em lote é dividido pelo tamanho do lote); a latência de ponta a ponta é a de cada lote completo.
+
+    Args:
+        model: Modelo passado para ``Vision``.
+        backend: Backend de inferência.
+        device: Dispositivo.
+        image_sizes: Lados maiores das imagens sintéticas.
+        batch_sizes: Imagens por chamada de ``detect``.
+        threads: Números de threads do torch/OpenCV (None usa o padrão do processo, restaurado ao final).
+        images: Imagens medidas por configuração.
+        imgsz: Tamanho de entrada do modelo (``resize_image`` para ``(imgsz, imgsz)``).
+        warmup: Lotes descartados no início de cada configuração.
+        video_frames: Se > 0, mede também ``process_video`` sobre um vídeo sintético com esse número de frames.
+        workdir: Diretório para os arquivos sintéticos e saídas. Padrão: diretório temporário.
+
+    Returns:
+        Relatório com ``host`` (plataforma e versões), ``params`` e ``runs`` (um item por configuração, com
+        ``stages`` e ``end_to_end`` em percentis, ``images_per_s`` e ``cumulative_peak_rss_mb``, o pico de memória
+        do processo até o fim daquela configuração; ver ``peak_rss_mb``).
+
+    Examples:
+        >>> report = bench_pipeline("yolov8n.pt", image_sizes=(640, 1280), batch_sizes=(1, 8))
+        >>> report["runs"][0]["end_to_end"]["p95_ms"]
+    """
+    from .core import Vision
+    from .utils import draw_boxes, load_image, resize_image, save_image
+
+    params = {
+        "model": model,
+        "backend": backend,
+        "device": device,
+        "image_sizes": list(image_sizes),
+        "batch_sizes": list(batch_sizes),
+        "threads": list(threads),
+        "images": images,
+        "imgsz": imgsz,
+        "warmup": warmup,
+        "video_frames": video_frames,
+    }
+    report: dict[str, Any] = {"host": _host_info(), "params": params, "runs": [], "video": []}
+
+    # Só cria o diretório temporário quando não há workdir
+    if workdir is None:
+        scratch = tempfile.TemporaryDirectory(prefix="yolopunk-bench-")
+    else:
+        scratch = contextlib.nullcontext(workdir)
+    with scratch as tmp:
+        root = Path(tmp)
+        # Threads padrão lidas uma vez: ``None`` na grade volta a elas depois de uma configuração explícita
+        default_threads = _get_threads()
+        detector = Vision(model, device=device, backend=backend)
+        try:
+            for size in image_sizes:
+                paths = make_synthetic_images(root / f"images_{size}", images, size)
+                for batch_size in batch_sizes:
+                    for thread_count in threads:
+                        _set_threads(thread_count, default_threads)
+                        samples: dict[str, list[float]] = {stage: [] for stage in PIPELINE_STAGES}
+                        end_to_end: list[float] = []
+                        measured = 0
+                        started = time.perf_counter()
+                        batches = [paths[i : i + batch_size] for i in range(0, len(paths), batch_size)]
+                        for b, batch in enumerate([*batches[:1] * warmup, *batches]):
+                            timings = {stage: 0.0 for stage in PIPELINE_STAGES}
+                            t_batch = time.perf_counter()
+
+                            t0 = time.perf_counter()
+                            loaded = [load_image(p, color_mode="BGR") for p in batch]
+                            timings["load_image"] = time.perf_counter() - t0
+
+                            t0 = time.perf_counter()
+                            resized = [resize_image(img, (imgsz, imgsz)) for img in loaded]
+                            timings["resize_image"] = time.perf_counter() - t0
+
+                            t0 = time.perf_counter()
+                            dets = detector.detect(resized, imgsz=imgsz, batch=len(batch), return_format="arrays")
+                            timings["detect"] = time.perf_counter() - t0
+
+                            t0 = time.perf_counter()
+                            drawn = [draw_boxes(img, dets[i][0], color=(0, 0, 255)) for i, img in enumerate(resized)]
+                            timings["draw_boxes"] = time.perf_counter() - t0
+
+                            t0 = time.perf_counter()
+                            for img, path in zip(drawn, batch):
+                                save_image(img, root / "annotated" / path.name, color_mode="BGR")
+                            timings["save_image"] = time.perf_counter() - t0
+
+                            if b < warmup:
+                                started = time.perf_counter()
+                                continue
+                            end_to_end.append(1000.0 * (time.perf_counter() - t_batch))
+                            for stage, elapsed in timings.items():
+                                samples[stage].extend([1000.0 * elapsed / len(batch)] * len(batch))
+                            measured += len(batch)
+
+                        wall_s = time.perf_counter() - started
+                        summary = percentiles(end_to_end)
+                        summary["images_per_s"] = measured / wall_s if wall_s > 0 else 0.0
+                        report["runs"].append(
+                            {
+                                "image_size": size,
+                                "batch_size": batch_size,
+                                "threads": thread_count,
+                                "stages": {stage: percentiles(values) for stage, values in samples.items()},
+                                "end_to_end": summary,
+                                "cumulative_peak_rss_mb": peak_rss_mb(),
+                            }
+                        )
+
+            if video_frames > 0:
+                video = make_synthetic_video(root / "synthetic.mp4", video_frames, max(image_sizes))
+                for batch_size in batch_sizes:
+                    result = detector.process_video(
+                        video, output=root / f"annotated_{batch_size}.mp4", batch_size=batch_size, imgsz=imgsz
+                    )
+                    report["video"].append(
+                        {
+                            "batch_size": batch_size,
+                            "fps": result["fps"],
+                            "wall_s": result["wall_s"],
+                            "stages": {name: result[name] for name in ("decode", "inference", "encode")},
+                            "cumulative_peak_rss_mb": peak_rss_mb(),
+                        }
+                    )
+        finally:
+            detector.close()
+            _set_threads(None, default_threads)
+    return report
+
+
+def _host_info() -> dict:
+    """Descreve a máquina e as versões relevantes para comparar relatórios."""
+    info = {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+    for module in ("numpy", "cv2", "torch", "ultralytics", "onnxruntime"):
+        try:
+            info[module] = __import__(module).__version__
+        except ImportError:
+            info[module] = None
+    return info
+
+
+def _run_key(run: dict) -> tuple:
+    """Identifica uma configuração do relatório."""
+    return run["image_size"], run["batch_size"], run["threads"]
+
+
+def compare_to_baseline(current: dict, baseline: dict, tolerance: float = 0.10) -> list[dict]:
+    """Compara dois relatórios de ``bench_pipeline`` e lista as regressões.
+
+    Latências (p50/p95 de ponta a ponta e p50 de cada estágio) regridem quando ficam mais de ``tolerance`` acima
+    do baseline; throughput regride quando fica mais de ``tolerance`` abaixo. Só configurações presentes nos dois
+    relatórios são comparadas.
+
+    Args:
+        current: Relatório atual.
+        baseline: Relatório de referência.
+        tolerance: Variação relativa aceita (0.10 = 10%).
+
+    Returns:
+        Lista de regressões com ``config``, ``metric``, ``baseline``, ``current`` e ``change`` (relativa).
+
+    Examples:
+        >>> regressions = compare_to_baseline(report, json.load(open("baseline.json")))
+    """
+    reference = {_run_key(run): run for run in baseline.get("runs", [])}
+    regressions = []
+    for run in current.get("runs", []):
+        base = reference.get(_run_key(run))
+        if base is None:
+            continue
+        for path, higher_is_better in _BASELINE_METRICS:
+            new, old = run, base
+            for part in path:
+                new, old = new.get(part, {}), old.get(part, {})
+            if not isinstance(new, (int, float)) or not isinstance(old, (int, float)) or old <= 0:
+                continue
+            change = (new - old) / old
+            if (change < -tolerance) if higher_is_better else (change > tolerance):
+                regressions.append(
+                    {
+                        "config": dict(zip(("image_size", "batch_size", "threads"), _run_key(run))),
+                        "metric": ".".join(path),
+                        "baseline": old,
+                        "current": new,
+                        "change": change,
+                    }
+                )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Ponto de entrada da linha de comando.
+
+    Returns:
+        Código de saída: 0 em sucesso; 1 se ``import`` estourar o orçamento ou ``pipeline`` regredir em relação ao
+        baseline.
+    """
+    parser = argparse.ArgumentParser(prog="python -m yolopunk.bench", description="Benchmarks do YOLOPunk")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Mede o tempo de `import yolopunk`")
+    import_parser.add_argument("--module", default="yolopunk")
+    import_parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    import_parser.add_argument("--repeat", type=int, default=5)
+
+    boxes_parser = subparsers.add_parser("boxes", help="Micro-benchmarks de yolopunk.boxes")
+    boxes_parser.add_argument("--sizes", type=int, nargs="+", default=list(BOX_BENCH_SIZES))
+    boxes_parser.add_argument("--repeat", type=int, default=3)
+
+    pipeline_parser = subparsers.add_parser("pipeline", help="Mede load → resize → detect → draw → save")
+    pipeline_parser.add_argument("--model", default="yolov8n.pt")
+    pipeline_parser.add_argument("--backend", default="torch")
+    pipeline_parser.add_argument("--device", default="cpu")
+    pipeline_parser.add_argument("--image-sizes", type=int, nargs="+", default=[640])
+    pipeline_parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1])
+    pipeline_parser.add_argument("--threads", type=int, nargs="+", default=None)
+    pipeline_parser.add_argument("--images", type=int, default=32)
+    pipeline_parser.add_argument("--imgsz", type=int, default=640)
+    pipeline_parser.add_argument("--warmup", type=int, default=2)
+    pipeline_parser.add_argument("--video-frames", type=int, default=0)
+    pipeline_parser.add_argument("--output", help="Arquivo JSON para o relatório")
+    pipeline_parser.add_argument("--baseline", help="Relatório JSON anterior para detectar regressões")
+    pipeline_parser.add_argument("--tolerance", type=float, default=0.10)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        result = check_import_budget(args.budget_ms, module=args.module, repeat=args.repeat)
+        print(json.dumps(result, indent=2))
+        return 0 if result["ok"] else 1
+    if args.command == "boxes":
+        print(json.dumps(bench_boxes(tuple(args.sizes), repeat=args.repeat), indent=2))
+        return 0
+    if args.command == "pipeline":
+        report = bench_pipeline(
+            args.model,
+            backend=args.backend,
+            device=args.device,
+            image_sizes=tuple(args.image_sizes),
+            batch_sizes=tuple(args.batch_sizes),
+            threads=tuple(args.threads) if args.threads else (None,),
+            images=args.images,
+            imgsz=args.imgsz,
+            warmup=args.warmup,
+            video_frames=args.video_frames,
+        )
+        if args.baseline:
+            with open(args.baseline) as f:
+                report["regressions"] = compare_to_baseline(report, json.load(f), args.tolerance)
+        output = json.dumps(report, indent=2)
+        if args.output:
+            Path(args.output).write_text(output)
+        print(output)
+        return 1 if report.get("regressions") else 0
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,500 @@
+# YOLOPunk 🩸 AGPL-3.0 License
+
+"""Operações vetorizadas sobre boxes.
+
+Conversões de formato, matrizes de IoU/GIoU/DIoU/IoS, NMS por classe e weighted box fusion (WBF) sobre arrays NumPy,
+sem laços Python sobre pares de boxes. Todas as funções aceitam arrays ``(N, 4)``; as conversões aceitam qualquer forma
+``(..., 4)``.
+
+Formatos:
+    - ``xyxy``: ``x1, y1, x2, y2`` (cantos)
+    - ``xywh``: ``x1, y1, largura, altura`` (canto superior esquerdo + tamanho)
+    - ``cxcywh``: ``cx, cy, largura, altura`` (centro + tamanho, saída bruta do YOLO)
+"""
+
+from __future__ import annotations
+
+from .utils import np
+
+# Evita divisão por zero em boxes degeneradas
+_EPS = 1e-9
+
+# Linhas e colunas das matrizes de IoU em bloco do NMS (128 x 2048 float32 = 1 MB por matriz, cabe no cache)
+_NMS_BLOCK = 128
+_NMS_WINDOW = 2048
+# Até quantas boxes o NMS usa uma única matriz N×N (acima disso, blocos só entre vizinhos)
+_NMS_DENSE = 256
+# Rodadas vetorizadas da resolução do NMS antes de cair no laço sequencial
+_NMS_ROUNDS = 64
+
+
+# ─── Conversões ────────────────────────────────────────────────────
+
+
+def xyxy_to_xywh(boxes: np.ndarray) -> np.ndarray:
+    """Converte ``x1, y1, x2, y2`` em ``x1, y1, w, h``."""
+    boxes = np.asarray(boxes)
+    return np.concatenate([boxes[..., :2], boxes[..., 2:4] - boxes[..., :2]], axis=-1)
+
+
+def xywh_to_xyxy(boxes: np.ndarray) -> np.ndarray:
+    """Converte ``x1, y1, w, h`` em ``x1, y1, x2, y2``."""
+    boxes = np.asarray(boxes)
+    return np.concatenate([boxes[..., :2], boxes[..., :2] + boxes[..., 2:4]], axis=-1)
+
+
+def xyxy_to_cxcywh(boxes: np.ndarray) -> np.ndarray:
+    """Converte ``x1, y1, x2, y2`` em ``cx, cy, w, h``."""
+    boxes = np.asarray(boxes)
+    return np.concatenate([(boxes[..., :2] + boxes[..., 2:4]) / 2, boxes[..., 2:4] - boxes[..., :2]], axis=-1)
+
+
+def cxcywh_to_xyxy(boxes: np.ndarray) -> np.ndarray:
+    """Converte ``cx, cy, w, h`` em ``x1, y1, x2, y2``."""
+    boxes = np.asarray(boxes)
+    half = boxes[..., 2:4] / 2
+    return np.concatenate([boxes[..., :2] - half, boxes[..., :2] + half], axis=-1)
+
+
+def box_area(boxes: np.ndarray) -> np.ndarray:
+    """Área de boxes ``xyxy`` (negativas viram zero)."""
+    boxes = np.asarray(boxes)
+    return np.clip(boxes[..., 2] - boxes[..., 0], 0, None) * np.clip(boxes[..., 3] - boxes[..., 1], 0, None)
+
+
+def clip_boxes(boxes: np.ndarray, shape: tuple[int, int]) -> np.ndarray:
+    """Limita boxes ``xyxy`` à imagem.
+
+    Args:
+        boxes: Array (..., 4).
+        shape: Forma da imagem (altura, largura).
+
+    Returns:
+        Novo array com as coordenadas dentro da imagem.
+    """
+    h, w = shape[:2]
+    boxes = np.array(boxes, copy=True)
+    boxes[..., 0::2] = boxes[..., 0::2].clip(0, w)
+    boxes[..., 1::2] = boxes[..., 1::2].clip(0, h)
+    return boxes
+
+
+def unletterbox(boxes: np.ndarray, orig_shape: tuple[int, int], size: tuple[int, int]) -> np.ndarray:
+    """Leva boxes da imagem de ``resize_image(img, size, keep_aspect=True)`` de volta à imagem original.
+
+    Reproduz exatamente a escala truncada e o padding centralizado de ``resize_image``.
+
+    Args:
+        boxes: Array (N, 4) ``xyxy`` em pixels da imagem redimensionada.
+        orig_shape: Forma da imagem original (altura, largura).
+        size: Tamanho passado para ``resize_image`` (largura, altura).
+
+    Returns:
+        Array (N, 4) ``xyxy`` em pixels da imagem original, limitado às bordas.
+
+    Examples:
+        >>> resized = resize_image(img, (640, 640))
+        >>> boxes = unletterbox(model_boxes, img.shape[:2], (640, 640))
+    """
+    h, w = orig_shape[:2]
+    target_w, target_h = size
+    scale = min(target_w / w, target_h / h)
+    new_w, new_h = int(w * scale), int(h * scale)
+    offset = np.array([(target_w - new_w) // 2, (target_h - new_h) // 2] * 2, dtype=np.float32)
+    gain = np.array([new_w / w, new_h / h] * 2, dtype=np.float32)
+    return clip_boxes((np.asarray(boxes, dtype=np.float32) - offset) / gain, (h, w))
+
+
+# ─── Matrizes de sobreposição ──────────────────────────────────────
+
+
+def _pairwise(a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, ...]:
+    """Calcula interseção e união para todos os pares (N, M).
+
+    Trabalha coordenada a coordenada com broadcasting (N, 1) x (1, M) e buffers reaproveitados, evitando arrays
+    intermediários (N, M, 2).
+
+    Returns:
+        Tupla (colunas de ``a`` (N, 1), colunas de ``b`` (1, M), interseção, união).
+    """
+    a = np.asarray(a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float32).reshape(-1, 4)
+    ax1, ay1, ax2, ay2 = (c[:, None] for c in a.T)
+    bx1, by1, bx2, by2 = (c[None, :] for c in b.T)
+
+    inter = np.minimum(ax2, bx2)
+    inter -= np.maximum(ax1, bx1)
+    np.maximum(inter, 0, out=inter)
+    ih = np.minimum(ay2, by2)
+    ih -= np.maximum(ay1, by1)
+    np.maximum(ih, 0, out=ih)
+    inter *= ih
+
+    union = ih  # reaproveita o buffer
+    np.add(box_area(a)[:, None], box_area(b)[None, :], out=union)
+    union -= inter
+    return (ax1, ay1, ax2, ay2), (bx1, by1, bx2, by2), inter, union
+
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Matriz de IoU entre dois conjuntos de boxes ``xyxy``.
+
+    Args:
+        a: Array (N, 4).
+        b: Array (M, 4).
+
+    Returns:
+        Array float32 (N, M).
+
+    Examples:
+        >>> box_iou(predicted, ground_truth).max(axis=1)
+    """
+    _, _, inter, union = _pairwise(a, b)
+    union += _EPS
+    return np.divide(inter, union, out=inter)
+
+
+def _enclosing(a: tuple, b: tuple) -> tuple[np.ndarray, np.ndarray]:
+    """Largura e altura da menor box que envolve cada par."""
+    ax1, ay1, ax2, ay2 = a
+    bx1, by1, bx2, by2 = b
+    width = np.maximum(ax2, bx2)
+    width -= np.minimum(ax1, bx1)
+    height = np.maximum(ay2, by2)
+    height -= np.minimum(ay1, by1)
+    return width, height
+
+
+def box_giou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Matriz de Generalized IoU (IoU menos a fração vazia da box envolvente), em [-1, 1]."""
+    a, b, inter, union = _pairwise(a, b)
+    width, height = _enclosing(a, b)
+    enclose = width
+    enclose *= height
+    enclose += _EPS
+    union += _EPS
+    iou = np.divide(inter, union, out=inter)
+    # giou = iou - (enclose - union) / enclose = iou - 1 + union / enclose
+    iou -= 1.0
+    iou += np.divide(union, enclose, out=union)
+    return iou
+
+
+def box_diou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Matriz de Distance IoU (IoU penalizado pela distância entre centros relativa à diagonal envolvente)."""
+    a, b, inter, union = _pairwise(a, b)
+    width, height = _enclosing(a, b)
+    diagonal = np.square(width, out=width)
+    diagonal += np.square(height, out=height)
+    diagonal += _EPS
+    dx = (a[0] + a[2]) / 2 - (b[0] + b[2]) / 2
+    distance = np.square(dx, out=dx)
+    dy = (a[1] + a[3]) / 2 - (b[1] + b[3]) / 2
+    distance += np.square(dy, out=dy)
+    union += _EPS
+    iou = np.divide(inter, union, out=inter)
+    iou -= np.divide(distance, diagonal, out=distance)
+    return iou
+
+
+def box_ios(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Matriz de interseção sobre a menor área (IoS), em [0, 1].
+
+    Vale 1 quando uma box está contida na outra, mesmo que o IoU seja baixo (ex.: metade de um objeto cortada na
+    emenda de um tile).
+    """
+    a = np.asarray(a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float32).reshape(-1, 4)
+    _, _, inter, smaller = _pairwise(a, b)
+    np.minimum(box_area(a)[:, None], box_area(b)[None, :], out=smaller)
+    smaller += _EPS
+    return np.divide(inter, smaller, out=inter)
+
+
+# ─── Supressão e fusão ─────────────────────────────────────────────
+
+
+def _class_groups(class_ids: np.ndarray | None, n: int) -> list[np.ndarray]:
+    """Particiona índices por classe (uma única partição se ``class_ids`` for None)."""
+    if class_ids is None:
+        return [np.arange(n)]
+    class_ids = np.asarray(class_ids).reshape(-1)
+    order = np.argsort(class_ids, kind="stable")
+    splits = np.flatnonzero(np.diff(class_ids[order])) + 1
+    return np.split(order, splits)
+
+
+def _overlap_pairs(boxes: np.ndarray, iou_threshold: float) -> tuple[np.ndarray, np.ndarray]:
+    """Pares ``(i, j)``, ``i < j``, com IoU acima do threshold, sem montar a matriz N×N.
+
+    As boxes são ordenadas pelo início no eixo em que são mais estreitas em relação ao espalhamento e cortadas em
+    faixas de ~sqrt(N · ``_NMS_BLOCK``) boxes; dentro de cada faixa, ordenadas pelo outro eixo e cortadas em
+    blocos de ``_NMS_BLOCK``, que ficam aproximadamente quadrados. Cada bloco só é comparado (matriz de IoU bloco
+    × candidatos) com as boxes que podem passar do threshold: como ``IoU <= interseção_eixo / lado`` em cada eixo
+    e para as duas boxes, a interseção precisa cobrir mais que ``iou_threshold`` do lado de cada uma. O custo
+    acompanha o número de vizinhos de cada box, não N², com poucos ou muitos sobreviventes.
+    """
+    n = len(boxes)
+    t = min(max(float(iou_threshold), 0.0), 1.0)
+    lengths = boxes[:, 2:4] - boxes[:, :2]
+    spread = boxes[:, 2:4].max(axis=0) - boxes[:, :2].min(axis=0) + _EPS
+    axis = int(np.argmin(lengths.mean(axis=0) / spread))
+    other = 1 - axis
+    by_start = np.argsort(boxes[:, axis], kind="stable")
+    ordered = boxes[by_start]
+    # Até onde cada box alcança um parceiro: início + (1 - t) · lado
+    reach = ordered[:, :2] + (1.0 - t) * (ordered[:, 2:4] - ordered[:, :2])
+
+    # Faixas no eixo de varredura; em cada uma, posições (em ``ordered``) ordenadas pelo outro eixo e a maior
+    # folga (1 - t) · lado, que limita quão antes do bloco um parceiro pode começar
+    strip = max(_NMS_BLOCK, int((n * _NMS_BLOCK) ** 0.5))
+    strip_starts = np.arange(0, n, strip)
+    strip_lo = ordered[strip_starts, axis]
+    strips = []
+    for s0 in strip_starts.tolist():
+        s1 = min(s0 + strip, n)
+        perm = s0 + np.argsort(ordered[s0:s1, other], kind="stable")
+        slack = float((reach[s0:s1, other] - ordered[s0:s1, other]).max())
+        strips.append((perm, ordered[perm, other], slack))
+
+    first, second = [], []
+    for k, (perm, _, _) in enumerate(strips):
+        for b0 in range(0, len(perm), _NMS_BLOCK):
+            rows = perm[b0 : b0 + _NMS_BLOCK]
+            block = ordered[rows]
+            low, high = block[:, other].min(), reach[rows, other].max()
+            last = max(int(np.searchsorted(strip_lo, reach[rows, axis].max(), side="right")), k + 1)
+            candidates = np.concatenate(
+                [
+                    strip_perm[np.searchsorted(starts, low - slack) : np.searchsorted(starts, high, side="right")]
+                    for strip_perm, starts, slack in strips[k:last]
+                ]
+            )
+            for c0 in range(0, len(candidates), _NMS_WINDOW):
+                cols = candidates[c0 : c0 + _NMS_WINDOW]
+                _, _, inter, union = _pairwise(block, ordered[cols])
+                union *= iou_threshold
+                r, c = np.nonzero(inter > union)
+                r, c = rows[r], cols[c]
+                upper = c > r
+                first.append(r[upper])
+                second.append(c[upper])
+    if not first:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64)
+    a, b = by_start[np.concatenate(first)], by_start[np.concatenate(second)]
+    return np.minimum(a, b), np.maximum(a, b)
+
+
+def _resolve_dense(boxes: np.ndarray, iou_threshold: float) -> tuple[np.ndarray, np.ndarray]:
+    """Resolução gulosa com a matriz de sobreposição completa (boxes em ordem decrescente de score).
+
+    Cada linha da matriz é a máscara de boxes que a box suprime; o laço só pula as já suprimidas e acumula as
+    máscaras das mantidas.
+
+    Returns:
+        Tupla (máscara das mantidas, rank do líder de cada box).
+    """
+    n = len(boxes)
+    _, _, inter, union = _pairwise(boxes, boxes)
+    union *= iou_threshold
+    over = np.triu(inter > union, 1)
+    keep = np.zeros(n, dtype=bool)
+    suppressed = np.zeros(n, dtype=bool)
+    for i in range(n):
+        if not suppressed[i]:
+            keep[i] = True
+            suppressed |= over[i]
+    # Líder de cada box suprimida: a primeira mantida (maior score) que a sobrepõe
+    leader = np.arange(n)
+    lost = ~keep
+    leader[lost] = np.flatnonzero(keep)[over[keep][:, lost].argmax(axis=0)]
+    return keep, leader
+
+
+def _resolve_sparse(prior: np.ndarray, later: np.ndarray, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Resolução gulosa sobre a lista de pares sobrepostos ``prior < later`` (ranks em ordem de score).
+
+    Decide as boxes em rodadas vetorizadas: uma box é mantida quando nenhum vizinho de score maior foi mantido e
+    suprimida assim que um foi; cada rodada decide todas as boxes cujos vizinhos de score maior já estão
+    decididos. Cadeias longas (raras) terminam num laço sequencial sobre as boxes que restarem.
+
+    Returns:
+        Tupla (máscara das mantidas, rank do líder de cada box).
+    """
+    keep = np.zeros(n, dtype=bool)
+    decided = np.zeros(n, dtype=bool)
+    pending_prior, pending_later = prior, later
+    for _ in range(_NMS_ROUNDS):
+        hit = np.zeros(n, dtype=bool)
+        hit[pending_later[keep[pending_prior]]] = True
+        blocked = np.zeros(n, dtype=bool)
+        blocked[pending_later[~decided[pending_prior]]] = True
+        kept = ~(decided | hit | blocked)
+        keep |= kept
+        decided |= kept | hit
+        # Arestas que ainda importam: destino indeciso e origem não suprimida
+        live = ~decided[pending_later] & (keep[pending_prior] | ~decided[pending_prior])
+        pending_prior, pending_later = pending_prior[live], pending_later[live]
+        if not pending_later.size:
+            break
+    else:
+        # Indecisas sem arestas pendentes só tinham vizinhos suprimidos: mantidas antes do laço
+        free = ~decided
+        free[pending_later] = False
+        keep |= free
+        decided |= free
+        edges = np.lexsort((pending_prior, pending_later))
+        pending_prior, pending_later = pending_prior[edges], pending_later[edges]
+        targets, starts = np.unique(pending_later, return_index=True)
+        stops = np.append(starts[1:], len(pending_later))
+        for target, start, stop in zip(targets.tolist(), starts.tolist(), stops.tolist()):
+            if keep[pending_prior[start:stop]].any():
+                decided[target] = True
+            else:
+                keep[target] = decided[target] = True
+    keep |= ~decided
+
+    # Líder de cada box suprimida: o vizinho mantido de maior score (menor rank)
+    leader = np.arange(n)
+    kept_edge = keep[prior] & ~keep[later]
+    prior, later = prior[kept_edge], later[kept_edge]
+    edges = np.lexsort((prior, later))
+    prior, later = prior[edges], later[edges]
+    first = np.ones(len(later), dtype=bool)
+    first[1:] = later[1:] != later[:-1]
+    leader[later[first]] = prior[first]
+    return keep, leader
+
+
+def _greedy_clusters(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> tuple[np.ndarray, np.ndarray]:
+    """Agrupa boxes gulosamente: a de maior score restante lidera e absorve as que passam do IoU.
+
+    Equivale ao laço guloso clássico sem comparar cada líder com todas as boxes restantes. Até ``_NMS_DENSE``
+    boxes, a sobreposição sai de uma única matriz (``_resolve_dense``); acima disso, de matrizes de IoU em
+    blocos só entre vizinhos (``_overlap_pairs``), resolvidas sobre a lista de pares (``_resolve_sparse``).
+
+    Returns:
+        Tupla (índices dos membros, início de cada grupo em ``membros``). Em cada grupo o líder vem primeiro e
+        os demais seguem em ordem decrescente de score; os grupos seguem a ordem decrescente de score do líder.
+    """
+    n = len(boxes)
+    if n == 1:
+        return np.zeros(1, np.int64), np.zeros(1, np.int64)
+    # Ordem determinística: em empates de score, o maior índice vem primeiro
+    order = np.argsort(scores, kind="stable")[::-1]
+    # Sobreposição calculada sobre as boxes já em ordem de score: índices são ranks
+    ordered = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)[order]
+    if n <= _NMS_DENSE:
+        _, leader = _resolve_dense(ordered, iou_threshold)
+    else:
+        _, leader = _resolve_sparse(*_overlap_pairs(ordered, iou_threshold), n)
+
+    grouped = np.lexsort((np.arange(n), leader))
+    group_starts = np.flatnonzero(np.r_[True, np.diff(leader[grouped]) != 0]) if n else np.zeros(0, np.int64)
+    return order[grouped], group_starts
+
+
+def nms(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    iou_threshold: float,
+    class_ids: np.ndarray | None = None,
+    max_det: int | None = None,
+) -> np.ndarray:
+    """Non-maximum suppression guloso, opcionalmente por classe.
+
+    Com ``class_ids``, cada classe é suprimida de forma independente (boxes de classes diferentes nunca se
+    suprimem), o que também reduz o custo: só boxes da mesma classe são comparadas. O custo acompanha o número de
+    pares sobrepostos, não N², então 100k boxes com poucos ou muitos sobreviventes levam segundos, não minutos.
+
+    Args:
+        boxes: Array (N, 4) em ``x1, y1, x2, y2``.
+        scores: Array (N,) de confianças.
+        iou_threshold: IoU acima do qual boxes de menor score são descartadas.
+        class_ids: Array (N,) de IDs de classe. None para NMS agnóstico.
+        max_det: Número máximo de índices retornados.
+
+    Returns:
+        Índices mantidos, em ordem decrescente de score.
+
+    Examples:
+        >>> keep = nms(boxes, scores, 0.5, class_ids=class_ids, max_det=300)
+    """
+    boxes = np.asarray(boxes)
+    scores = np.asarray(scores)
+    keep = []
+    for group in _class_groups(class_ids, len(boxes)):
+        if len(group):
+            members, starts = _greedy_clusters(boxes[group], scores[group], iou_threshold)
+            keep.append(group[members[starts]])
+    if not keep:
+        return np.zeros(0, dtype=np.int64)
+    keep = np.concatenate(keep).astype(np.int64)
+    keep = keep[np.argsort(scores[keep], kind="stable")[::-1]]
+    return keep[:max_det] if max_det is not None else keep
+
+
+def weighted_boxes_fusion(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    class_ids: np.ndarray,
+    iou_threshold: float = 0.55,
+    num_models: int = 1,
+    skip_threshold: float = 0.0,
+    conf_type: str = "avg",
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Weighted box fusion: funde boxes sobrepostas da mesma classe em vez de descartá-las.
+
+    Cada grupo (box de maior score + boxes da mesma classe com IoU acima do threshold em relação a ela) vira uma
+    box com coordenadas médias ponderadas pelo score. Útil para juntar saídas de vários modelos, de TTA ou de
+    tiles sobrepostos.
+
+    Args:
+        boxes: Array (N, 4) em ``x1, y1, x2, y2`` (todas as fontes concatenadas).
+        scores: Array (N,) de confianças.
+        class_ids: Array (N,) de IDs de classe.
+        iou_threshold: IoU mínimo para uma box entrar no grupo.
+        num_models: Número de fontes combinadas; grupos com menos boxes que fontes têm o score reduzido
+            proporcionalmente.
+        skip_threshold: Boxes com score abaixo disso são ignoradas.
+        conf_type: Score do grupo: 'avg' (média) ou 'max'.
+
+    Returns:
+        Tupla (boxes (M, 4), scores (M,), class_ids (M,)) em ordem decrescente de score.
+
+    Examples:
+        >>> boxes, scores, class_ids = weighted_boxes_fusion(
+        ...     np.concatenate([b1, b2]), np.concatenate([s1, s2]), np.concatenate([c1, c2]), num_models=2
+        ... )
+    """
+    if conf_type not in ("avg", "max"):
+        raise ValueError(f"conf_type inválido: {conf_type!r}. Opções: avg, max")
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+    class_ids = np.asarray(class_ids).reshape(-1)
+    mask = scores >= skip_threshold
+    boxes, scores, class_ids = boxes[mask], scores[mask], class_ids[mask]
+
+    members, starts = [], []
+    offset = 0
+    for group in _class_groups(class_ids, len(boxes)):
+        if len(group):
+            group_members, group_starts = _greedy_clusters(boxes[group], scores[group], iou_threshold)
+            members.append(group[group_members])
+            starts.append(group_starts + offset)
+            offset += len(group)
+    if not members:
+        return np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, class_ids.dtype)
+
+    # Reduz todos os grupos de uma vez com somas segmentadas
+    members = np.concatenate(members)
+    starts = np.concatenate(starts)
+    sizes = np.diff(np.append(starts, len(members)))
+    weights = scores[members]
+    total = np.add.reduceat(weights, starts)
+    fused = np.add.reduceat(boxes[members] * weights[:, None], starts) / (total[:, None] + _EPS)
+    fused_scores = total / sizes if conf_type == "avg" else np.maximum.reduceat(weights, starts)
+    fused_scores = fused_scores * np.minimum(sizes, num_models) / num_models
+
+    order = np.argsort(-fused_scores, kind="stable")
+    return fused[order].astype(np.float32), fused_scores[order].astype(np.float32), class_ids[members[starts]][order]
@@ -0,0 +1,379 @@
+# YOLOPunk 🩸 AGPL-3.0 License
+
+"""Cascata de modelos: um modelo rápido em tudo, um modelo grande só onde ele está em dúvida.
+
+A maioria dos frames é fácil, e um ``yolov8n`` acerta sozinho; rodar um ``yolov8m`` em todos eles desperdiça CPU.
+``CascadeVision`` roda o modelo pequeno primeiro e escala para o grande apenas o que caiu na faixa de incerteza
+(``band``) de confiança:
+
+- ``mode="image"``: a imagem inteira é re-inferida pelo modelo grande quando a maior confiança do pequeno cai na
+  faixa, e as detecções do grande substituem as do pequeno.
+- ``mode="crop"``: só as regiões das detecções incertas (com margem de contexto) vão para o modelo grande; as
+  detecções confiantes do pequeno ficam, e as do grande entram no lugar das incertas (com NMS por classe).
+
+``stats()`` reporta a taxa de escalonamento e o throughput de ponta a ponta.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+from .core import Vision
+from .onnx_backend import IMAGE_SUFFIXES
+from .results import DetectionBatch
+from .tiling import merge_detections
+from .utils import load_images, np
+
+# Modos de escalonamento suportados
+CASCADE_MODES = ("image", "crop")
+
+
+def _iter_chunks(source: Any, chunk_size: int) -> Iterator[tuple[list[np.ndarray], list[str]]]:
+    """Gera ``source`` (arquivo, pasta, array BGR ou lista deles) em chunks de arrays BGR e rótulos.
+
+    Arquivos são decodificados chunk a chunk (em paralelo, com ``load_images``), então só ``chunk_size`` imagens
+    ficam em memória por vez, qualquer que seja o tamanho da pasta.
+    """
+    if hasattr(source, "shape"):
+        items = iter([source] if len(source.shape) == 3 else list(source))
+    elif isinstance(source, (str, Path)):
+        path = Path(source)
+        paths = sorted(p for p in path.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES) if path.is_dir() else [path]
+        items = iter(paths)
+    else:
+        items = iter(source)
+
+    index = 0
+    while True:
+        chunk = list(itertools.islice(items, chunk_size))
+        if not chunk:
+            return
+        files = [item for item in chunk if not hasattr(item, "shape")]
+        workers = min(len(files), os.cpu_count() or 1)
+        loaded = load_images(files, workers=workers, color_mode="BGR") if files else None
+        images, paths = [], []
+        for item in chunk:
+            if hasattr(item, "shape"):
+                images.append(item)
+                paths.append(f"image{index}.jpg")
+            else:
+                _, img = next(loaded)
+                if img is None:
+                    raise FileNotFoundError(f"Imagem não encontrada: {item}")
+                images.append(img)
+                paths.append(str(item))
+            index += 1
+        yield images, paths
+
+
+class CascadeVision:
+    """Detector em cascata sobre dois ``Vision``.
+
+    Os dois modelos devem ter o mesmo conjunto de classes (ex.: ``yolov8n.pt`` e ``yolov8m.pt``, ambos COCO).
+
+    Args:
+        small: Modelo rápido (nome/caminho ou ``Vision`` já criado).
+        large: Modelo preciso, chamado só nos casos incertos (nome/caminho ou ``Vision``).
+        band: Faixa de incerteza ``(low, high)`` de confiança. Detecções do modelo pequeno com ``low <= score <
+            high`` são incertas; acima de ``high`` são aceitas; abaixo de ``low`` são tratadas como fundo.
+        mode: 'image' (escala a imagem inteira) ou 'crop' (escala só as regiões incertas).
+        max_crops: No modo 'crop', imagens com mais detecções incertas que isso são escaladas inteiras (uma
+            inferência na imagem sai mais barata que muitos recortes).
+        crop_padding: Margem de contexto em volta de cada detecção incerta, em fração do lado maior da box.
+        min_crop: Lado mínimo (pixels) de um recorte.
+        crop_imgsz: Tamanho de entrada do modelo grande nos recortes (backend torch). None usa o padrão.
+        escalate_empty: Se True, imagens sem nenhuma detecção do modelo pequeno também vão para o grande (útil
+            quando o pequeno perde objetos difíceis por completo).
+        merge_iou: IoU do NMS que junta as detecções confiantes do pequeno com as do grande no modo 'crop'.
+        verbose: Se True, exibe logs.
+        **vision_kwargs: Argumentos para os ``Vision`` criados a partir de nomes (device, backend...).
+
+    Examples:
+        >>> cascade = CascadeVision("yolov8n.pt", "yolov8m.pt", band=(0.25, 0.6))
+        >>> batch = cascade.detect("frames/")
+        >>> cascade.stats()["escalation_rate"], cascade.stats()["images_per_s"]
+
+        >>> # Só as regiões incertas vão para o modelo grande
+        >>> cascade = CascadeVision("yolov8n.pt", "yolov8m.pt", mode="crop", crop_imgsz=320)
+    """
+
+    def __init__(
+        self,
+        small: str | Vision = "yolov8n.pt",
+        large: str | Vision = "yolov8m.pt",
+        band: tuple[float, float] = (0.25, 0.6),
+        mode: str = "image",
+        max_crops: int = 8,
+        crop_padding: float = 0.5,
+        min_crop: int = 64,
+        crop_imgsz: int | None = 320,
+        escalate_empty: bool = False,
+        merge_iou: float = 0.5,
+        verbose: bool = False,
+        **vision_kwargs: Any,
+    ):
+        """Inicializa a cascata (os modelos são carregados no primeiro uso)."""
+        low, high = band
+        if not 0.0 <= low < high <= 1.0:
+            raise ValueError(f"band deve satisfazer 0 <= low < high <= 1, recebido: {band}")
+        if mode not in CASCADE_MODES:
+            raise ValueError(f"Modo inválido: {mode!r}. Opções: {', '.join(CASCADE_MODES)}")
+        if max_crops < 1:
+            raise ValueError(f"max_crops deve ser >= 1, recebido: {max_crops}")
+
+        self.small = small if isinstance(small, Vision) else Vision(small, verbose=verbose, **vision_kwargs)
+        self.large = large if isinstance(large, Vision) else Vision(large, verbose=verbose, **vision_kwargs)
+        self._owned = [v for v, given in ((self.small, small), (self.large, large)) if not isinstance(given, Vision)]
+        self.band = (float(low), float(high))
+        self.mode = mode
+        self.max_crops = max_crops
+        self.crop_padding = crop_padding
+        self.min_crop = min_crop
+        self.crop_imgsz = crop_imgsz
+        self.escalate_empty = escalate_empty
+        self.merge_iou = merge_iou
+        self.verbose = verbose
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    # ─── Detecção ──────────────────────────────────────────────────
+
+    def detect(
+        self,
+        source: Any,
+        conf: float = 0.25,
+        iou: float = 0.7,
+        max_det: int = 300,
+        classes: list[int] | None = None,
+        batch_size: int = 8,
+        chunk_size: int = 64,
+        **kwargs: Any,
+    ) -> DetectionBatch:
+        """Detecta com o modelo pequeno e escala os casos incertos para o grande.
+
+        A fonte é processada em chunks de ``chunk_size`` imagens: arquivos são lidos só quando o chunk deles chega,
+        então a memória não cresce com o tamanho da pasta (só as detecções são acumuladas).
+
+        Args:
+            source: Imagem, pasta, array BGR ou lista deles.
+            conf: Threshold de confiança do resultado final. O modelo pequeno roda com ``min(conf, band[0])``
+                para enxergar toda a faixa de incerteza.
+            iou: Threshold de IoU do NMS de cada modelo.
+            max_det: Número máximo de detecções por imagem.
+            classes: Lista de IDs de classes para filtrar.
+            batch_size: Imagens (ou recortes) por chamada do modelo grande.
+            chunk_size: Imagens carregadas e processadas por vez.
+            **kwargs: Arguments adicionais para ``Vision.detect`` dos dois modelos.
+
+        Returns:
+            ``DetectionBatch`` com uma entrada por imagem, em coordenadas da imagem original.
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size deve ser >= 1, recebido: {chunk_size}")
+        batches = []
+        chunks = _iter_chunks(source, chunk_size)
+        while True:
+            # O tempo de ponta a ponta de cada chunk inclui a leitura das imagens
+            started = time.perf_counter()
+            chunk = next(chunks, None)
+            if chunk is None:
+                break
+            batches.append(self._detect_images(*chunk, started, conf, iou, max_det, classes, batch_size, kwargs))
+        return DetectionBatch.concatenate(batches)
+
+    def _detect_images(
+        self,
+        images: list[np.ndarray],
+        paths: list[str],
+        started: float,
+        conf: float,
+        iou: float,
+        max_det: int,
+        classes: list[int] | None,
+        batch_size: int,
+        kwargs: dict,
+    ) -> DetectionBatch:
+        """Cascata sobre um chunk de imagens já carregadas (ver ``detect``)."""
+        low, high = self.band
+
+        first = self.small.detect(
+            images, conf=min(conf, low), iou=iou, max_det=max_det, classes=classes, return_format="arrays", **kwargs
+        )
+        small_s = time.perf_counter() - started
+
+        # Decide o que escalar
+        escalated: list[int] = []
+        crop_owner: list[int] = []
+        crop_targets: list[np.ndarray] = []
+        for i, (_, scores, _) in enumerate(first):
+            uncertain = (scores >= low) & (scores < high)
+            if self.escalate_empty and not len(scores):
+                escalated.append(i)
+            elif self.mode == "image":
+                if len(scores) and low <= scores.max() < high:
+                    escalated.append(i)
+            elif uncertain.sum() > self.max_crops:
+                escalated.append(i)
+            elif uncertain.any():
+                boxes = first[i][0][uncertain]
+                crop_owner.extend([i] * len(boxes))
+                crop_targets.append(boxes)
+
+        t_large = time.perf_counter()
+        common = {"conf": conf, "iou": iou, "max_det": max_det, "classes": classes, "return_format": "arrays"}
+        replaced: dict[int, tuple] = {}
+        for start in range(0, len(escalated), batch_size):
+            chunk = escalated[start : start + batch_size]
+            dets = self.large.detect([images[i] for i in chunk], **common, **kwargs)
+            for j, i in enumerate(chunk):
+                replaced[i] = dets[j]
+
+        crop_dets = self._detect_crops(images, crop_owner, crop_targets, batch_size, common, kwargs)
+        large_s = time.perf_counter() - t_large
+
+        # Junta os resultados por imagem
+        per_image = []
+        for i, (boxes, scores, class_ids) in enumerate(first):
+            if i in replaced:
+                per_image.append(replaced[i])
+                continue
+            keep = (scores >= conf) & ~((scores >= low) & (scores < high)) if i in crop_dets else scores >= conf
+            boxes, scores, class_ids = boxes[keep], scores[keep], class_ids[keep]
+            if i in crop_dets:
+                extra_boxes, extra_scores, extra_ids = crop_dets[i]
+                boxes, scores, class_ids = merge_detections(
+                    np.concatenate([boxes, extra_boxes]),
+                    np.concatenate([scores, extra_scores]),
+                    np.concatenate([class_ids, extra_ids]),
+                    iou=self.merge_iou,
+                    max_det=max_det,
+                    method="nms",
+                )
+            per_image.append((boxes, scores, class_ids))
+
+        counts = np.array([len(item[1]) for item in per_image], dtype=np.int64)
+        offsets = np.zeros(len(per_image) + 1, np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        batch = DetectionBatch(
+            np.concatenate([item[0] for item in per_image]),
+            np.concatenate([item[1] for item in per_image]),
+            np.concatenate([item[2] for item in per_image]),
+            offsets,
+            np.array([img.shape[:2] for img in images], dtype=np.int32),
+            paths,
+            first.names,
+        )
+
+        wall_s = time.perf_counter() - started
+        with self._lock:
+            self._images += len(images)
+            self._escalated += len(escalated)
+            self._crop_images += len(crop_dets)
+            self._crops += len(crop_owner)
+            self._small_s += small_s
+            self._large_s += large_s
+            self._wall_s += wall_s
+        if self.verbose:
+            print(
+                f"🩸 Cascata: {len(images)} imagens, {len(escalated)} escaladas inteiras, {len(crop_owner)} recortes "
+                f"em {len(crop_dets)} imagens ({len(images) / wall_s:.1f} img/s)"
+            )
+        return batch
+
+    def _detect_crops(
+        self,
+        images: list[np.ndarray],
+        owners: list[int],
+        targets: list[np.ndarray],
+        batch_size: int,
+        common: dict,
+        kwargs: dict,
+    ) -> dict[int, tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Roda o modelo grande nos recortes das detecções incertas.
+
+        Cada recorte responde apenas pela própria detecção: só entram as detecções do modelo grande cujo centro
+        cai dentro da box incerta original.
+
+        Returns:
+            Imagem -> (boxes, scores, class_ids) do modelo grande, em coordenadas da imagem.
+        """
+        if not owners:
+            return {}
+        targets = np.concatenate(targets)
+        owners = np.asarray(owners)
+        shapes = np.array([images[i].shape[:2] for i in owners], dtype=np.float32)
+
+        # Janelas com margem de contexto e lado mínimo, limitadas à imagem
+        centers = (targets[:, :2] + targets[:, 2:]) / 2
+        side = (targets[:, 2:] - targets[:, :2]).max(axis=1, keepdims=True) * (1 + 2 * self.crop_padding)
+        half = np.maximum(side, self.min_crop) / 2
+        limits = shapes[:, ::-1]
+        x0y0 = np.clip(centers - half, 0, limits).astype(np.int64)
+        x1y1 = np.clip(centers + half, 0, limits).astype(np.int64)
+        crops = [images[i][y0:y1, x0:x1] for i, (x0, y0), (x1, y1) in zip(owners, x0y0, x1y1)]
+
+        crop_kwargs = dict(kwargs)
+        if self.crop_imgsz is not None and self.large.backend == "torch":
+            crop_kwargs["imgsz"] = self.crop_imgsz
+        found: dict[int, list] = {}
+        for start in range(0, len(crops), batch_size):
+            dets = self.large.detect(crops[start : start + batch_size], **common, **crop_kwargs)
+            for j, (boxes, scores, class_ids) in enumerate(dets):
+                k = start + j
+                boxes = boxes + np.tile(x0y0[k], 2).astype(np.float32)
+                centers_k = (boxes[:, :2] + boxes[:, 2:]) / 2
+                inside = np.all((centers_k >= targets[k, :2]) & (centers_k <= targets[k, 2:]), axis=1)
+                found.setdefault(int(owners[k]), []).append((boxes[inside], scores[inside], class_ids[inside]))
+
+        return {i: tuple(np.concatenate(parts) for parts in zip(*items)) for i, items in found.items()}
+
+    # ─── Estatísticas ──────────────────────────────────────────────
+
+    def reset_stats(self) -> None:
+        """Zera os contadores de ``stats()``."""
+        with self._lock:
+            self._images = 0
+            self._escalated = 0
+            self._crop_images = 0
+            self._crops = 0
+            self._small_s = 0.0
+            self._large_s = 0.0
+            self._wall_s = 0.0
+
+    def stats(self) -> dict:
+        """Taxa de escalonamento e throughput acumulados desde o último ``reset_stats()``.
+
+        Returns:
+            Dicionário com ``images``, ``escalated_images`` (re-inferidas inteiras), ``crop_images`` e ``crops``
+            (modo 'crop'), ``escalation_rate`` (fração das imagens que passaram pelo modelo grande), ``small_ms``
+            e ``large_ms`` (tempo médio por imagem em cada estágio) e ``images_per_s`` (de ponta a ponta).
+        """
+        with self._lock:
+            images = self._images
+            return {
+                "images": images,
+                "escalated_images": self._escalated,
+                "crop_images": self._crop_images,
+                "crops": self._crops,
+                "escalation_rate": (self._escalated + self._crop_images) / images if images else 0.0,
+                "small_ms": 1000.0 * self._small_s / images if images else 0.0,
+                "large_ms": 1000.0 * self._large_s / images if images else 0.0,
+                "images_per_s": images / self._wall_s if self._wall_s > 0 else 0.0,
+            }
+
+    def close(self) -> None:
+        """Libera os ``Vision`` criados pela cascata (os recebidos prontos ficam com quem os criou)."""
+        for vision in self._owned:
+            vision.close()
+
+    def __repr__(self) -> str:
+        """Representação string do objeto."""
+        return (
+            f"CascadeVision(small={self.small.model_name!r}, large={self.large.model_name!r}, band={self.band}, "
+            f"mode={self.mode!r})"
+        )
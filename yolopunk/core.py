@@ -2,13 +2,53 @@
 
 """Módulo core do YOLOPunk.
 
-Contém a classe Vision, interface principal para detecção de objetos.
+Contém a classe Vision, interface principal para detecção de objetos, e a classe VisionPool para inferência em
+múltiplos processos.
 """
 
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
+import itertools
+import multiprocessing
+import os
+import threading
+import time
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
+
+from .autotune import DEFAULT_BATCH_SIZES, DEFAULT_LATENCY_SLO_MS, TuneStore, apply_threads, load_samples, tune
+from .batching import MicroBatcher
+from .boxes import clip_boxes
+from .export_cache import ExportCache, cached_export
+from .gating import GatedInfer, MotionGate
+from .jobs import (
+    DEFAULT_CHUNK_SIZE,
+    JobCheckpoint,
+    JobProgress,
+    iter_images,
+    job_description,
+    parse_shard,
+)
+from .metrics import VisionMetrics
+from .onnx_backend import IMAGE_SUFFIXES, OnnxDetector
+from .quantize import (
+    QUANTIZATION_MODES,
+    cached_quantize,
+    calibration_fingerprint,
+    calibration_images,
+    measure_quantization,
+)
+from .registry import registry, weights_fingerprint
+from .result_cache import ResultCache
+from .results import DetectionBatch
+from .sink import DetectionSink
+from .streams import StreamScheduler
+from .tiling import merge_detections, slice_image
+from .tracking import TrackFrame, Tracker
+from .utils import cv2, np
+from .video import VideoPipeline
 
 try:
     from ultralytics import YOLO
@@ -18,6 +58,58 @@ except ImportError:
     ULTRALYTICS_AVAILABLE = False
     YOLO = None
 
+# Backends de inferência suportados por Vision
+BACKENDS = ("torch", "onnxruntime")
+
+# Formatos de retorno de Vision.detect
+PRECISIONS = ("fp32", "int8")
+RETURN_FORMATS = ("results", "arrays")
+
+# Extensões tratadas como vídeo (não entram no micro-batching)
+_VIDEO_SUFFIXES = {".mp4", ".avi", ".mov", ".mkv", ".webm", ".wmv", ".m4v", ".mpeg", ".mpg", ".ts", ".gif"}
+
+# Imagens convertidas por vez ao gravar em um DetectionSink
+_SINK_CHUNK = 256
+
+
+def _open_frames(source: str | Path | int | Any) -> Iterator[Any]:
+    """Abre uma fonte de frames já na chamada e devolve o gerador que a lê.
+
+    Caminhos e índices de câmera são abertos com ``cv2.VideoCapture`` (liberado quando o gerador termina ou é
+    fechado); qualquer outro iterável de frames BGR é percorrido como está.
+
+    Raises:
+        FileNotFoundError: Se o vídeo ou a câmera não puder ser aberto.
+    """
+    if not isinstance(source, (str, Path, int)):
+        return iter(source)
+    capture = cv2.VideoCapture(source if isinstance(source, int) else str(source))
+    if not capture.isOpened():
+        raise FileNotFoundError(f"Não foi possível abrir o vídeo: {source}")
+
+    def read() -> Iterator[Any]:
+        try:
+            while True:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                yield frame
+        finally:
+            capture.release()
+
+    return read()
+
+
+def _reject_reserved(kwargs: dict, **hints: str) -> None:
+    """Recusa em ``**kwargs`` argumentos de ``detect`` que o método chamador já define.
+
+    Raises:
+        ValueError: Se algum argumento reservado foi passado; a mensagem indica o que usar no lugar.
+    """
+    for name, hint in hints.items():
+        if name in kwargs:
+            raise ValueError(f"{name!r} é definido internamente aqui; {hint}")
+
 
 class Vision:
     """Interface principal do YOLOPunk para detecção de objetos.
@@ -39,12 +131,47 @@ class Vision:
               - 'pose': Estimação de pose
               - 'classify': Classificação
         verbose: Se True, exibe logs do YOLO.
+        micro_batch: Se True, chamadas concorrentes de ``detect`` com uma única imagem são agrupadas em um único
+            forward pass (ver ``yolopunk.batching.MicroBatcher``).
+        max_batch_size: Tamanho máximo do batch no modo micro-batching.
+        max_wait_ms: Tempo máximo (ms) que uma requisição espera por outras no modo micro-batching.
+        max_inflight: Número máximo de chamadas assíncronas (``adetect``/``atrain``) executando ao mesmo tempo. Também
+            é o tamanho do executor dedicado.
+        shared: Se True (padrão), o modelo vem do registro do processo (``yolopunk.registry``) e é compartilhado
+            com outras instâncias que usam os mesmos pesos, tarefa e device: a memória não cresce com o número de
+            instâncias, e as chamadas dessas instâncias são serializadas pelo lock do modelo. Use False para uma
+            cópia privada dos pesos quando instâncias precisam rodar em paralelo (ex.: uma por thread de GPU).
+        preload: Se True, carrega o modelo e executa o warmup já na construção.
+        warmup_shapes: Formas usadas no warmup. Cada item pode ser ``imgsz`` (int), ``(batch, imgsz)`` ou
+            ``(batch, height, width)``. Padrão com ``preload=True``: ``[640]``.
+        backend: Backend de inferência. Opções:
+                 - 'torch': Ultralytics + PyTorch (padrão)
+                 - 'onnxruntime': ONNX Runtime com pré/pós-processamento em NumPy. ``model`` deve ser um ``.onnx``
+                   exportado por ``export(format="onnx")``; só detecção, sem ``train``/``export``.
+        precision: Precisão numérica. Opções:
+                   - 'fp32': Pesos originais (padrão)
+                   - 'int8': Modelo quantizado para CPU, executado com ONNX Runtime. Pesos ``.pt`` são exportados
+                     para ONNX e quantizados uma vez (``ExportCache``); ver ``precision_report()`` para medir o
+                     ganho e a perda de acurácia.
+        quantization: Modo da quantização INT8: 'dynamic' (padrão, sem calibração) ou 'static' (calibrada). Em
+            redes convolucionais o modo dinâmico do ONNX Runtime (``ConvInteger``) costuma ganhar pouco ou até
+            perder para o FP32; o estático é o que entrega o ganho de 2-4x em CPU.
+        calibration: Pasta de imagens para calibrar a quantização estática.
+        metrics: Instrumentação por estágio de ``detect``. True cria um ``VisionMetrics``; uma instância pode ser
+            compartilhada entre detectores. None (padrão) desliga a instrumentação sem custo no caminho quente.
+        autotuned: Se True (padrão), aplica a configuração salva por ``autotune()`` para esta máquina e modelo
+            (threads do torch/OpenCV, batch e ``imgsz`` padrão de ``detect``), se houver uma.
 
     Attributes:
         model_name: Gnome ou caminho do modelo.
         device: Device utilizado.
         task: Tarefa configurada.
         model: Instância do modelo YOLO (None se não carregado).
+        ready: True quando o modelo está carregado e aquecido (útil para readiness probes).
+        warmup_report: Tempos de carga e de cada forma do warmup (vazio até o warmup rodar).
+        metrics: ``VisionMetrics`` da instância, ou None se a instrumentação estiver desligada.
+        quantization_report: Último relatório de ``precision_report()`` (vazio até rodar).
+        tuning: Configuração de ``autotune()`` em uso (vazio se nenhuma).
 
     Examples:
         >>> # Detecção básica
@@ -58,6 +185,36 @@ class Vision:
         >>> # Segmentação
         >>> segmenter = Vision("yolov8n-seg.pt", task="segment")
         >>> results = segmenter.detect("image.jpg")
+
+        >>> # Micro-batching para muitas threads com uma imagem cada
+        >>> detector = Vision("yolov8n.pt", micro_batch=True, max_batch_size=16, max_wait_ms=4)
+        >>> results = detector.detect("image.jpg")
+        >>> detector.batch_stats()["mean_batch_size"]
+
+        >>> # API assíncrona com back-pressure
+        >>> detector = Vision("yolov8n.pt", max_inflight=2)
+        >>> results = await detector.adetect("image.jpg")
+
+        >>> # Carga antecipada + warmup antes de receber tráfego
+        >>> detector = Vision("yolov8n.pt", preload=True, warmup_shapes=[640, (8, 640)])
+        >>> detector.ready, detector.warmup_report["total_s"]
+
+        >>> # Servir um modelo exportado com ONNX Runtime (sem torch)
+        >>> detector = Vision("yolov8n.onnx", backend="onnxruntime")
+        >>> results = detector.detect("image.jpg")
+        >>> results[0].boxes.xyxy  # Array NumPy
+
+        >>> # INT8 em CPU com quantização estática calibrada
+        >>> detector = Vision("yolov8n.pt", precision="int8", quantization="static", calibration="data/calib")
+        >>> detector.precision_report(validation_paths)["speedup"]
+
+        >>> # Tempos por estágio, exportáveis para Prometheus
+        >>> detector = Vision("yolov8n.pt", metrics=True)
+        >>> detector.detect("image.jpg")
+        >>> print(detector.metrics.to_prometheus())
+
+        >>> # Calibrar threads/batch/imgsz nesta máquina; os próximos Vision aplicam o resultado sozinhos
+        >>> detector.autotune("data/samples", latency_slo_ms=50)["best"]
     """
 
     def __init__(
@@ -66,16 +223,83 @@ class Vision:
         device: str | None = None,
         task: str = "detect",
         verbose: bool = False,
+        micro_batch: bool = False,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        max_inflight: int = 4,
+        shared: bool = True,
+        preload: bool = False,
+        warmup_shapes: list | None = None,
+        backend: str = "torch",
+        precision: str = "fp32",
+        quantization: str = "dynamic",
+        calibration: str | Path | None = None,
+        metrics: VisionMetrics | bool | None = None,
+        autotuned: bool = True,
     ):
         """Inicializa o detector Vision."""
-        if not ULTRALYTICS_AVAILABLE:
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend inválido: {backend!r}. Opções: {', '.join(BACKENDS)}")
+        if precision not in PRECISIONS:
+            raise ValueError(f"Precisão inválida: {precision!r}. Opções: {', '.join(PRECISIONS)}")
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Quantização inválida: {quantization!r}. Opções: {', '.join(QUANTIZATION_MODES)}")
+        if precision == "int8":
+            if device not in (None, "cpu"):
+                raise ValueError(f"precision='int8' só roda em CPU, recebido device={device!r}")
+            if quantization == "static" and calibration is None:
+                raise ValueError("quantization='static' requer calibration=<pasta de imagens>")
+            backend = "onnxruntime"
+        if backend == "torch" and not ULTRALYTICS_AVAILABLE:
             raise ImportError("Ultralytics YOLO não está instalado. Install com: pip install ultralytics")
 
         self.model_name = model
-        self.device = device or self._auto_detect_device()
+        self.backend = backend
+        if backend == "onnxruntime":
+            # Não importa torch só para detectar o device
+            self.device = device or "cpu"
+        else:
+            self.device = device or self._auto_detect_device()
         self.task = task
         self.verbose = verbose
+        self.shared = shared and backend == "torch"
         self._model: YOLO | None = None
+        self._registry_token: Any = None
+        self._model_lock = threading.RLock()
+        self._batcher: MicroBatcher | None = None
+        if micro_batch:
+            self._batcher = MicroBatcher(
+                self._predict_batch,
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_wait_ms,
+            )
+
+        if max_inflight < 1:
+            raise ValueError(f"max_inflight deve ser >= 1, recebido: {max_inflight}")
+        self.max_inflight = max_inflight
+        self._executor: concurrent.futures.ThreadPoolExecutor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._semaphore_loop: asyncio.AbstractEventLoop | None = None
+
+        self.metrics: VisionMetrics | None = VisionMetrics() if metrics is True else (metrics or None)
+        self.precision = precision
+        self.quantization = quantization
+        self.calibration = calibration
+        self.quantization_report: dict = {}
+        self._fp32_onnx: str | None = None
+        self._model_identity: dict | None = None
+
+        self.tuning: dict = {}
+        if autotuned:
+            settings = TuneStore().lookup(model, backend=self.backend, device=self.device, precision=precision)
+            if settings:
+                self.apply_tuning(settings)
+
+        self.warmup_shapes = warmup_shapes if warmup_shapes is not None else ([640] if preload else [])
+        self.warmup_report: dict = {}
+        self._ready = False
+        if preload:
+            self.warmup()
 
     def _auto_detect_device(self) -> str:
         """Detecta automaticamente o melhor device disponível.
@@ -95,18 +319,287 @@ class Vision:
     def model(self) -> YOLO:
         """Lazy loading do modelo YOLO.
 
-        O modelo só é carregado quando acessado pela primeira vez.
+        O modelo só é carregado quando acessado pela primeira vez. Com ``shared=True`` a instância vem do registro
+        do processo e é reaproveitada por outros ``Vision`` com os mesmos pesos.
 
         Returns:
             Instância do modelo YOLO.
         """
         if self._model is None:
-            self._model = YOLO(self.model_name, task=self.task)
+            t0 = time.perf_counter()
+            if self.backend == "onnxruntime":
+                self._model = OnnxDetector(
+                    self._onnx_path(), device=self.device, intra_op_threads=self.tuning.get("threads")
+                )
+            elif self.shared:
+                self._registry_token, self._model, self._model_lock = registry.acquire(
+                    self.model_name, task=self.task, device=self.device
+                )
+            else:
+                self._model = YOLO(self.model_name, task=self.task)
+            record = self.metrics.active if self.metrics is not None else None
+            if record is not None:
+                record.add("load", 1000.0 * (time.perf_counter() - t0))
             if self.verbose:
                 print(f"🩸 Modelo carregado: {self.model_name}")
                 print(f"🩸 Device: {self.device}")
         return self._model
 
+    @property
+    def ready(self) -> bool:
+        """Indica se a instância está pronta para tráfego.
+
+        Com ``warmup_shapes`` configurado, só é True após ``warmup()``; sem warmup, basta o modelo estar carregado.
+        """
+        if self.warmup_shapes:
+            return self._ready
+        return self._model is not None
+
+    def _onnx_path(self) -> str:
+        """Caminho do modelo ONNX a carregar; com ``precision='int8'`` exporta e quantiza (com cache) se preciso."""
+        if self.precision == "fp32":
+            return self.model_name
+
+        source = self.model_name
+        if Path(source).suffix.lower() != ".onnx":
+            if not ULTRALYTICS_AVAILABLE:
+                raise ImportError("Exportar para ONNX requer Ultralytics. Install com: pip install ultralytics")
+            source, _ = cached_export(YOLO(self.model_name, task=self.task), "onnx", {})
+        self._fp32_onnx = str(source)
+        path, hit = cached_quantize(source, mode=self.quantization, calibration=self.calibration)
+        if self.verbose:
+            print(f"🩸 Modelo INT8 ({self.quantization}, {'cache' if hit else 'novo'}): {path}")
+        return str(path)
+
+    def precision_report(
+        self,
+        validation: list,
+        iou: float = 0.5,
+        repeat: int = 1,
+        **kwargs: Any,
+    ) -> dict:
+        """Mede o ganho de velocidade e a perda de acurácia do modelo INT8 contra o FP32 de origem.
+
+        As detecções do FP32 (mesmo grafo ONNX, antes da quantização) servem de referência: ``precision`` e
+        ``recall`` indicam quanto o INT8 inventa ou perde, ``mean_iou`` e ``score_mae`` quanto as boxes e scores
+        casados se deslocam.
+
+        Args:
+            validation: Lista de imagens de validação (caminhos ou arrays BGR).
+            iou: IoU mínimo para casar detecções.
+            repeat: Repetições por imagem na medição de latência.
+            **kwargs: Arguments adicionais para ``detect`` (conf, classes...).
+
+        Returns:
+            Dicionário com ``reference_ms``, ``candidate_ms``, ``speedup``, ``precision``, ``recall``, ``f1``,
+            ``mean_iou`` e ``score_mae``. Também fica em ``quantization_report``.
+
+        Examples:
+            >>> detector = Vision("yolov8n.pt", precision="int8")
+            >>> report = detector.precision_report(["val/1.jpg", "val/2.jpg"])
+            >>> report["speedup"], report["f1"]
+        """
+        if self.precision != "int8":
+            raise ValueError("precision_report() requer precision='int8'")
+        if self._fp32_onnx is None:
+            _ = self.model  # Carregar o INT8 resolve o FP32 de origem
+        reference = Vision(self._fp32_onnx, backend="onnxruntime", device="cpu", autotuned=False)
+        try:
+            report = measure_quantization(reference, self, validation, iou=iou, repeat=repeat, **kwargs)
+        finally:
+            reference.close()
+        report["mode"] = self.quantization
+        self.quantization_report = report
+        if self.verbose:
+            print(
+                f"🩸 INT8 ({self.quantization}): {report['speedup']:.2f}x mais rápido, "
+                f"F1 {report['f1']:.3f} contra FP32 (precision {report['precision']:.3f}, "
+                f"recall {report['recall']:.3f})"
+            )
+        return report
+
+    def apply_tuning(self, settings: dict) -> None:
+        """Aplica uma configuração de ``autotune()``.
+
+        As threads do torch e do OpenCV são do processo inteiro, então valem também para outros modelos carregados
+        nele; ``batch_size`` e ``imgsz`` viram padrões de ``detect`` (argumentos explícitos continuam valendo).
+
+        Args:
+            settings: Dicionário com ``threads``, ``interop_threads``, ``cv2_threads``, ``batch_size`` e ``imgsz``
+                (chaves ausentes ou None mantêm o padrão).
+        """
+        previous = self.tuning.get("threads")
+        self.tuning = dict(settings)
+        apply_threads(
+            settings.get("threads"),
+            settings.get("interop_threads"),
+            settings.get("cv2_threads"),
+            torch=self.backend == "torch",
+        )
+        if self.backend == "onnxruntime" and self._model is not None and settings.get("threads") != previous:
+            # A sessão do ONNX Runtime fixa as threads na criação
+            with self._model_lock:
+                self._release_model()
+
+    def autotune(
+        self,
+        sample_source: Any,
+        latency_slo_ms: float = DEFAULT_LATENCY_SLO_MS,
+        threads: tuple[int, ...] | None = None,
+        cv2_threads: tuple[int, ...] | None = None,
+        batch_sizes: tuple[int, ...] = DEFAULT_BATCH_SIZES,
+        imgsz: tuple[int, ...] | None = None,
+        max_images: int = 16,
+        repeat: int = 5,
+        persist: bool = True,
+        store: TuneStore | None = None,
+    ) -> dict:
+        """Calibra threads, batch e ``imgsz`` nesta máquina e aplica o resultado.
+
+        Varre as combinações em imagens de amostra locais (ver ``yolopunk.autotune.tune``) e escolhe a de maior
+        throughput cujo p95 de latência por chamada cabe em ``latency_slo_ms``. Com ``persist=True`` a escolha é
+        salva por (máquina, modelo) e aplicada automaticamente pelos próximos ``Vision`` com os mesmos pesos,
+        backend, device e precisão.
+
+        Args:
+            sample_source: Pasta, imagem, array BGR ou lista deles, representativos do tráfego real.
+            latency_slo_ms: Latência máxima (p95, ms) de uma chamada de ``detect`` com o lote inteiro.
+            threads: Threads do torch (ou intra-op do ONNX Runtime) candidatas. Padrão: potências de 2 até o número
+                de CPUs disponíveis.
+            cv2_threads: Threads do OpenCV candidatas. Padrão: as mesmas de ``threads``.
+            batch_sizes: Batches candidatos.
+            imgsz: Tamanhos de entrada candidatos (backend torch). Tamanhos menores trocam acurácia por velocidade,
+                então só entram se passados. Padrão: (640,).
+            max_images: Máximo de imagens de amostra carregadas.
+            repeat: Chamadas medidas por configuração.
+            persist: Se True, salva a configuração escolhida.
+            store: Onde salvar. Padrão: ``TuneStore()``.
+
+        Returns:
+            Relatório com ``best`` (configuração aplicada), ``best_run``, ``meets_slo``, ``runs`` e ``key`` (chave no
+            store, se salvo). Também fica em ``tuning``.
+
+        Examples:
+            >>> detector = Vision("yolov8n.pt", device="cpu")
+            >>> report = detector.autotune("data/samples", latency_slo_ms=50, batch_sizes=(1, 4, 16))
+            >>> report["best"], report["best_run"]["images_per_s"]
+            >>> Vision("yolov8n.pt", device="cpu").tuning  # Aplicado automaticamente
+        """
+        images = load_samples(sample_source, max_images)
+        metrics, self.metrics = self.metrics, None  # Medições do autotune não entram nas métricas da instância
+        try:
+            report = tune(
+                self,
+                images,
+                latency_slo_ms=latency_slo_ms,
+                threads=threads,
+                cv2_threads=cv2_threads,
+                batch_sizes=batch_sizes,
+                imgsz=imgsz,
+                repeat=repeat,
+            )
+        finally:
+            self.metrics = metrics
+
+        if persist:
+            store = store or TuneStore()
+            report["key"] = store.make_key(self.model_name, self.backend, self.device, self.precision)
+            summary = {name: report[name] for name in ("host", "latency_slo_ms", "meets_slo", "best_run")}
+            store.put(report["key"], report["best"], summary)
+        if self.verbose:
+            best = report["best_run"]
+            status = "dentro do" if report["meets_slo"] else "FORA do"
+            print(
+                f"🩸 Autotune: {report['best']} -> {best['images_per_s']:.1f} img/s, p95 {best['latency_p95_ms']:.1f} "
+                f"ms ({status} SLO de {latency_slo_ms:g} ms, {len(report['runs'])} configurações)"
+            )
+        return report
+
+    @staticmethod
+    def _normalize_shape(shape: int | tuple | list) -> tuple[int, int, int]:
+        """Converte uma forma de warmup em (batch, height, width)."""
+        if isinstance(shape, int):
+            return 1, shape, shape
+        if len(shape) == 2:
+            return int(shape[0]), int(shape[1]), int(shape[1])
+        if len(shape) == 3:
+            return int(shape[0]), int(shape[1]), int(shape[2])
+        raise ValueError(f"Forma de warmup inválida: {shape!r}. Use imgsz, (batch, imgsz) ou (batch, h, w)")
+
+    def warmup(self, shapes: list | None = None) -> dict:
+        """Carrega o modelo e executa forward passes com imagens sintéticas.
+
+        Remove da primeira requisição real o custo de carga dos pesos, setup do grafo e aquecimento do alocador.
+
+        Args:
+            shapes: Formas a aquecer (ver ``warmup_shapes``). Padrão: ``self.warmup_shapes`` ou ``[640]``.
+
+        Returns:
+            Relatório com ``load_s`` (carga do modelo), ``shapes`` (tempo de cada forma) e ``total_s``.
+
+        Examples:
+            >>> detector = Vision("yolov8n.pt")
+            >>> report = detector.warmup([(1, 640), (4, 640)])
+            >>> report["shapes"][0]["seconds"]
+        """
+        shapes = shapes or self.warmup_shapes or [640]
+        started = time.perf_counter()
+
+        self._ready = False
+        self.model  # noqa: B018 - força o carregamento
+        load_s = time.perf_counter() - started
+
+        timings = []
+        for shape in shapes:
+            batch, height, width = self._normalize_shape(shape)
+            images = [np.zeros((height, width, 3), dtype=np.uint8) for _ in range(batch)]
+            t0 = time.perf_counter()
+            # O backend onnxruntime tem entrada fixa da exportação; só o torch recebe o imgsz da forma
+            size = {"imgsz": (height, width)} if self.backend == "torch" else {}
+            self._predict(source=images, batch=batch, **size)
+            timings.append({"batch": batch, "height": height, "width": width, "seconds": time.perf_counter() - t0})
+
+        self.warmup_report = {
+            "load_s": load_s,
+            "shapes": timings,
+            "total_s": time.perf_counter() - started,
+        }
+        self._ready = True
+        if self.verbose:
+            print(f"🩸 Warmup concluído em {self.warmup_report['total_s']:.2f}s (carga: {load_s:.2f}s)")
+        return self.warmup_report
+
+    def _release_model(self) -> None:
+        """Solta a referência ao modelo (devolvendo-a ao registro, se compartilhado)."""
+        if self._registry_token is not None:
+            registry.release(self._registry_token)
+            self._registry_token = None
+            self._model_lock = threading.RLock()
+        self._model = None
+        self._ready = False
+
+    def _require_torch_backend(self, operation: str) -> None:
+        """Falha com mensagem clara para operações que só existem no backend torch."""
+        if self.backend != "torch":
+            raise ValueError(f"{operation}() não é suportado pelo backend {self.backend!r}; use backend='torch'")
+
+    def _predict(self, **kwargs: Any) -> Any:
+        """Chama ``model.predict`` com device/verbose da instância, serializado pelo lock do modelo.
+
+        Com ``stream=True`` o predict devolve um gerador que só roda a inferência quando consumido; o lock fica
+        preso até o gerador terminar, senão outra chamada reconfiguraria o predictor (conf, imgsz, max_det) no meio.
+        """
+        model = self.model
+        if kwargs.get("stream"):
+            return self._locked_stream(model, **kwargs)
+        with self._model_lock:
+            return model.predict(device=self.device, verbose=self.verbose, **kwargs)
+
+    def _locked_stream(self, model: Any, **kwargs: Any) -> Any:
+        """Gerador de ``model.predict(stream=True)`` que segura o lock do modelo até ser esgotado ou fechado."""
+        with self._model_lock:
+            yield from model.predict(device=self.device, verbose=self.verbose, **kwargs)
+
     def detect(
         self,
         source: str | Path | list,
@@ -117,6 +610,9 @@ class Vision:
         save: bool = False,
         save_txt: bool = False,
         save_conf: bool = False,
+        return_format: str = "results",
+        result_cache: ResultCache | None = None,
+        sink: DetectionSink | None = None,
         **kwargs: Any,
     ) -> Any:
         """Realiza detecção de objetos em imagem(ns) ou vídeo.
@@ -131,10 +627,21 @@ class Vision:
             save: Se True, salva imagens com anotações.
             save_txt: Se True, salva resultados em formato texto.
             save_conf: Se True, inclui confiança nos arquivos texto.
+            return_format: Formato do retorno. Opções:
+                           - 'results': Lista de resultados por imagem (padrão)
+                           - 'arrays': ``DetectionBatch`` com arrays contíguos; os resultados por imagem são
+                             convertidos e descartados um a um, sem reter imagens nem tensores
+            result_cache: Cache persistente de detecções. Imagens já vistas (mesmo conteúdo, modelo e parâmetros)
+                não passam pelo modelo. Implica ``return_format='arrays'`` e aceita apenas imagens (arquivo,
+                diretório, array ou lista).
+            sink: ``DetectionSink`` que recebe as detecções em arquivos colunares (Arrow/Parquet), em blocos, sem
+                acumular os resultados da chamada em memória. Substitui ``save_txt`` em acervos grandes; a chamada
+                retorna apenas o número de imagens processadas.
             **kwargs: Arguments adicionais para model.predict()
 
         Returns:
-            Resultados da detecção (ultralytics.engine.results.Results)
+            Resultados da detecção (ultralytics.engine.results.Results, ou ``OnnxResult`` com backend='onnxruntime'),
+            ou ``DetectionBatch`` com ``return_format='arrays'``, ou o número de imagens gravadas com ``sink``.
 
         Examples:
             >>> # Detecção básica
@@ -151,8 +658,85 @@ class Vision:
 
             >>> # Webcam
             >>> results = detector.detect(0, stream=True)
+
+            >>> # Arrays compactos para listas grandes
+            >>> batch = detector.detect(image_paths, return_format="arrays")
+            >>> batch.filter(classes=[0], min_score=0.5).counts
+
+            >>> # Reprocessar um acervo sem repetir inferência
+            >>> batch = detector.detect("images/", result_cache=ResultCache("cache.sqlite"))
+
+            >>> # Milhões de imagens direto para Parquet
+            >>> with DetectionSink("results/run1", format="parquet") as sink:
+            ...     detector.detect("images/", sink=sink)
         """
-        results = self.model.predict(
+        call = (source, conf, iou, max_det, classes, save, save_txt, save_conf, return_format, result_cache, sink)
+        metrics = self.metrics
+        if metrics is None:
+            return self._detect(*call, **kwargs)
+
+        record = metrics.begin("detect")
+        try:
+            output = self._detect(*call, **kwargs)
+        except BaseException as e:
+            metrics.end(record, e)
+            raise
+        if record is not None and kwargs.get("stream"):
+            # O gerador é consumido depois: a chamada termina quando ele se esgota
+            metrics.detach(record)
+            return self._metered_stream(output, metrics, record)
+        metrics.end(record)
+        return output
+
+    def _detect(
+        self,
+        source: Any,
+        conf: float,
+        iou: float,
+        max_det: int,
+        classes: list[int] | None,
+        save: bool,
+        save_txt: bool,
+        save_conf: bool,
+        return_format: str,
+        result_cache: ResultCache | None,
+        sink: DetectionSink | None,
+        **kwargs: Any,
+    ) -> Any:
+        """Implementação de ``detect`` (sem a instrumentação da chamada)."""
+        if self.tuning.get("imgsz") and "imgsz" not in kwargs:
+            kwargs["imgsz"] = self.tuning["imgsz"]
+        if sink is not None and (save or save_txt or kwargs.get("stream")):
+            raise ValueError("sink não combina com save, save_txt ou stream=True")
+        if result_cache is not None:
+            if save or save_txt or kwargs.get("stream"):
+                raise ValueError("result_cache não combina com save, save_txt ou stream=True")
+            batch = self._detect_cached(source, result_cache, conf, iou, max_det, classes, kwargs)
+            if sink is not None:
+                sink.write(batch)
+                return len(batch)
+            return batch
+
+        if return_format not in RETURN_FORMATS:
+            raise ValueError(f"return_format inválido: {return_format!r}. Opções: {', '.join(RETURN_FORMATS)}")
+        arrays = return_format == "arrays" or sink is not None
+        if arrays and kwargs.get("stream"):
+            raise ValueError("return_format='arrays' não combina com stream=True")
+
+        if self._batcher is not None and self._is_batchable(source, save, save_txt, kwargs):
+            key = (conf, iou, max_det, tuple(classes) if classes is not None else None, tuple(sorted(kwargs.items())))
+            results = self._observed([self._batcher.submit(source, key)])
+            if sink is not None:
+                return self._write_sink(results, sink)
+            return self._to_batch(results) if arrays else results
+
+        if self.tuning.get("batch_size") and "batch" not in kwargs:
+            kwargs["batch"] = self.tuning["batch_size"]
+        if arrays and self.backend == "torch":
+            # Gera resultado a resultado para não acumular Results (imagens e tensores) em memória
+            kwargs["stream"] = True
+
+        results = self._predict(
             source=source,
             conf=conf,
             iou=iou,
@@ -161,12 +745,877 @@ class Vision:
             save=save,
             save_txt=save_txt,
             save_conf=save_conf,
-            device=self.device,
-            verbose=self.verbose,
             **kwargs,
         )
+        results = self._observed(results)
+        if sink is not None:
+            return self._write_sink(results, sink)
+        if arrays:
+            return self._to_batch(results)
         return results
 
+    def _observed(self, results: Any) -> Any:
+        """Soma os tempos por estágio (``result.speed``) de cada resultado na chamada instrumentada em andamento."""
+        record = self.metrics.active if self.metrics is not None else None
+        if record is None:
+            return results
+        if isinstance(results, list):
+            for result in results:
+                record.add_speed(getattr(result, "speed", None))
+            return results
+        return self._observe_stream(results, record)
+
+    @staticmethod
+    def _observe_stream(results: Any, record: Any) -> Any:
+        """Versão de ``_observed`` para geradores; o tempo do consumidor entre itens conta como 'convert'."""
+        for result in results:
+            record.add_speed(getattr(result, "speed", None))
+            t0 = time.perf_counter()
+            yield result
+            record.add("convert", 1000.0 * (time.perf_counter() - t0))
+
+    def _to_batch(self, results: Any) -> DetectionBatch:
+        """Converte resultados em ``DetectionBatch``, medindo a conversão quando instrumentado."""
+        record = self.metrics.active if self.metrics is not None else None
+        if record is None or not isinstance(results, list):
+            return DetectionBatch.from_results(results)
+        t0 = time.perf_counter()
+        batch = DetectionBatch.from_results(results)
+        record.add("convert", 1000.0 * (time.perf_counter() - t0))
+        return batch
+
+    def _write_sink(self, results: Any, sink: DetectionSink) -> int:
+        """Converte e envia os resultados ao ``sink`` em blocos de ``_SINK_CHUNK`` imagens."""
+        results = iter(results)
+        written = 0
+        while True:
+            chunk = list(itertools.islice(results, _SINK_CHUNK))
+            if not chunk:
+                return written
+            sink.write(self._to_batch(chunk))
+            written += len(chunk)
+
+    @staticmethod
+    def _metered_stream(results: Any, metrics: VisionMetrics, record: Any) -> Any:
+        """Envolve o gerador de ``detect(stream=True)`` e fecha o registro da chamada quando ele termina."""
+        error = None
+        try:
+            yield from results
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            metrics.end(record, error)
+
+    def _detect_cached(
+        self,
+        source: Any,
+        cache: ResultCache,
+        conf: float,
+        iou: float,
+        max_det: int,
+        classes: list[int] | None,
+        kwargs: dict,
+    ) -> DetectionBatch:
+        """Detecção consultando ``cache`` antes do modelo; só as imagens ausentes são inferidas."""
+        items = self._expand_images(source)
+        params = cache.params_digest(
+            {
+                **self._cache_identity(),
+                "conf": conf,
+                "iou": iou,
+                "max_det": max_det,
+                "classes": sorted(classes) if classes is not None else None,
+                **kwargs,
+            }
+        )
+        keys = [f"{digest}:{params}" for digest in cache.content_digests(items)]
+        found = cache.get_many(list(dict.fromkeys(keys)))
+        names = cache.get_names(params)
+
+        missing = [i for i, key in enumerate(keys) if key not in found]
+        if missing:
+            # Imagens repetidas na mesma chamada são inferidas uma vez só
+            unique = list({keys[i]: i for i in reversed(missing)}.values())[::-1]
+            fresh = self.detect(
+                [items[i] for i in unique],
+                conf=conf,
+                iou=iou,
+                max_det=max_det,
+                classes=classes,
+                return_format="arrays",
+                **kwargs,
+            )
+            entries = []
+            for j, i in enumerate(unique):
+                boxes, scores, class_ids = fresh[j]
+                data = np.concatenate([boxes, scores[:, None], class_ids[:, None].astype(np.float32)], axis=1)
+                found[keys[i]] = (data, tuple(fresh.orig_shapes[j]))
+                entries.append((keys[i], data, fresh.orig_shapes[j]))
+            cache.put_many(entries)
+            if names is None and fresh.names:
+                names = fresh.names
+                cache.put_names(params, names)
+        if names is None:
+            # Cache de uma versão sem nomes: carrega o modelo uma vez e grava para as próximas chamadas
+            names = dict(self.model.names)
+            cache.put_names(params, names)
+
+        counts = np.array([len(found[key][0]) for key in keys], dtype=np.int64)
+        offsets = np.zeros(len(keys) + 1, np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        data = np.concatenate([found[key][0] for key in keys]) if keys else np.zeros((0, 6), np.float32)
+        return DetectionBatch(
+            data[:, :4],
+            data[:, 4],
+            data[:, 5],
+            offsets,
+            np.array([found[key][1] for key in keys], dtype=np.int32).reshape(-1, 2),
+            [str(item) if isinstance(item, (str, Path)) else f"image{i}.jpg" for i, item in enumerate(items)],
+            names,
+        )
+
+    def _cache_identity(self) -> dict:
+        """Identidade do modelo efetivamente executado, para a chave do ``result_cache``.
+
+        Inclui precisão e, em INT8, o modo de quantização e a impressão digital das imagens de calibração: o mesmo
+        ``.pt`` em FP32, INT8 dinâmico ou INT8 calibrado com outra pasta produz detecções diferentes.
+        """
+        if self._model_identity is None:
+            identity = {
+                "weights": weights_fingerprint(self.model_name),
+                "backend": self.backend,
+                "task": self.task,
+                "precision": self.precision,
+            }
+            if self.precision == "int8":
+                identity["quantization"] = self.quantization
+                if self.quantization == "static":
+                    identity["calibration"] = calibration_fingerprint(calibration_images(self.calibration))
+            self._model_identity = identity
+        return self._model_identity
+
+    @staticmethod
+    def _expand_images(source: Any) -> list:
+        """Normaliza ``source`` em uma lista de imagens (caminhos de arquivo ou arrays)."""
+        if hasattr(source, "shape"):
+            return [source] if len(source.shape) == 3 else list(source)
+        if isinstance(source, (str, Path)):
+            path = Path(source)
+            if path.is_dir():
+                return sorted(str(p) for p in path.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+            if not path.is_file() or path.suffix.lower() in _VIDEO_SUFFIXES:
+                raise ValueError(f"result_cache aceita apenas imagens locais, recebido: {source}")
+            return [str(path)]
+        items = []
+        for item in source:
+            items.extend(Vision._expand_images(item))
+        return items
+
+    @staticmethod
+    def _is_batchable(source: Any, save: bool, save_txt: bool, kwargs: dict) -> bool:
+        """Verifica se a chamada pode entrar no micro-batch.
+
+        Apenas imagens únicas (caminho de arquivo ou array) sem salvamento e sem streaming são agrupadas; o resto
+        segue o caminho direto.
+        """
+        if save or save_txt or kwargs.get("stream") or "batch" in kwargs:
+            return False
+        try:
+            hash(tuple(kwargs.values()))
+        except TypeError:
+            return False
+        if isinstance(source, (str, Path)):
+            path = Path(source)
+            return path.is_file() and path.suffix.lower() not in _VIDEO_SUFFIXES
+        return hasattr(source, "shape") and len(source.shape) == 3
+
+    def _predict_batch(self, key: tuple, sources: list) -> list:
+        """Executa um único forward pass para um batch do micro-batcher."""
+        conf, iou, max_det, classes, extra = key
+        return list(
+            self._predict(
+                source=sources,
+                conf=conf,
+                iou=iou,
+                max_det=max_det,
+                classes=list(classes) if classes is not None else None,
+                batch=len(sources),
+                **dict(extra),
+            )
+        )
+
+    def batch_stats(self) -> dict:
+        """Retorna métricas do micro-batching.
+
+        Returns:
+            Dicionário com profundidade da fila, histograma de tamanhos de batch e tempos de espera, ou vazio se o
+            micro-batching estiver desligado.
+
+        Examples:
+            >>> detector = Vision("yolov8n.pt", micro_batch=True)
+            >>> detector.batch_stats()["batch_size_histogram"]
+        """
+        if self._batcher is None:
+            return {}
+        return self._batcher.stats()
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        """Retorna (criando sob demanda) o executor dedicado das chamadas assíncronas."""
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_inflight,
+                thread_name_prefix="yolopunk-vision",
+            )
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Retorna o semáforo de in-flight associado ao event loop corrente."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_inflight)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _run_async(self, fn: Any, *args: Any, **kwargs: Any) -> Any:
+        """Executa ``fn`` no executor dedicado respeitando o limite de in-flight.
+
+        Se a corrotina for cancelada antes da tarefa começar, a tarefa é descartada. Se já estiver em execução, o
+        forward pass não pode ser interrompido: o slot do semáforo só é liberado quando ele termina, para que o limite
+        de in-flight continue refletindo o trabalho real nos cores.
+        """
+        semaphore = self._get_semaphore()
+        await semaphore.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._get_executor().submit(lambda: fn(*args, **kwargs))
+        except BaseException:
+            semaphore.release()
+            raise
+
+        try:
+            result = await asyncio.shield(asyncio.wrap_future(future))
+        except asyncio.CancelledError:
+            if future.cancel():
+                semaphore.release()
+            else:
+                future.add_done_callback(lambda _: loop.call_soon_threadsafe(semaphore.release))
+            raise
+        except BaseException:
+            semaphore.release()
+            raise
+        semaphore.release()
+        return result
+
+    async def adetect(
+        self,
+        source: str | Path | list,
+        conf: float = 0.25,
+        iou: float = 0.7,
+        max_det: int = 300,
+        classes: list[int] | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Versão assíncrona de ``detect``.
+
+        A inferência roda no executor dedicado, então o event loop nunca bloqueia no forward pass. No máximo
+        ``max_inflight`` chamadas executam ao mesmo tempo; as demais aguardam no semáforo.
+
+        Args:
+            source: Mesmo que em ``detect``.
+            conf: Threshold de confiança (0.0-1.0).
+            iou: Threshold de IoU para NMS.
+            max_det: Número máximo de detecções por imagem.
+            classes: Lista de IDs de classes para filtrar.
+            **kwargs: Arguments adicionais para ``detect``. ``stream=True`` não é suportado.
+
+        Returns:
+            Resultados da detecção, como em ``detect``.
+
+        Examples:
+            >>> results = await detector.adetect("image.jpg", conf=0.5)
+            >>> results = await asyncio.gather(*(detector.adetect(p) for p in paths))
+        """
+        if kwargs.get("stream"):
+            raise ValueError("adetect não suporta stream=True; use detect() em uma thread")
+        return await self._run_async(
+            self.detect,
+            source,
+            conf=conf,
+            iou=iou,
+            max_det=max_det,
+            classes=classes,
+            **kwargs,
+        )
+
+    async def atrain(
+        self,
+        data: str,
+        **kwargs: Any,
+    ) -> Any:
+        """Versão assíncrona de ``train``.
+
+        Args:
+            data: Caminho para arquivo YAML de configuração do dataset.
+            **kwargs: Arguments adicionais para ``train``.
+
+        Returns:
+            Resultados do treinamento.
+
+        Examples:
+            >>> results = await detector.atrain("dataset.yaml", epochs=10)
+        """
+        return await self._run_async(self.train, data, **kwargs)
+
+    def close(self) -> None:
+        """Libera recursos de fundo (micro-batching, executor assíncrono) e a referência ao modelo."""
+        if self._batcher is not None:
+            self._batcher.close()
+            self._batcher = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self._release_model()
+
+    def __del__(self) -> None:
+        """Devolve a referência ao registro quando a instância é coletada."""
+        try:
+            if self._registry_token is not None:
+                registry.release(self._registry_token)
+        except Exception:
+            pass
+
+    def detect_directory(
+        self,
+        path: str | Path,
+        shard: str | tuple[int, int] | None = None,
+        checkpoint: str | Path | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        recursive: bool = True,
+        sink: DetectionSink | None = None,
+        on_chunk: Any = None,
+        on_progress: Any = None,
+        sync_every: int = 16384,
+        report_every: float = 30.0,
+        count_total: bool = True,
+        conf: float = 0.25,
+        iou: float = 0.7,
+        max_det: int = 300,
+        classes: list[int] | None = None,
+        **kwargs: Any,
+    ) -> dict:
+        """Processa um diretório enorme em chunks, com shards e checkpoint para retomar depois de uma queda.
+
+        Os arquivos são enumerados sob demanda (``os.scandir``, ver ``yolopunk.jobs.iter_images``), filtrados
+        pelo shard (hash do caminho relativo) e agrupados em chunks de ``chunk_size`` imagens. Cada chunk vira um
+        ``DetectionBatch`` entregue ao ``sink`` e/ou ao ``on_chunk`` e, depois disso, a última imagem do chunk é
+        registrada no checkpoint como cursor. A enumeração é ordenada, então numa nova execução com o mesmo
+        checkpoint tudo até o cursor é pulado sem inferência, mesmo que arquivos tenham sido adicionados ou
+        removidos no meio (arquivos novos antes do cursor ficam para um job novo).
+
+        A garantia é "pelo menos uma vez": um chunk interrompido é refeito na retomada. Com ``sink``, os chunks
+        só entram no checkpoint depois de ``sink.sync()`` (a cada ``sync_every`` imagens e no fim), quando suas
+        detecções já estão em partes completas no disco.
+
+        Uma imagem ilegível (corrompida ou removida depois da enumeração) não derruba o job: o chunk é refeito sem
+        ela, e o caminho vai para ``failed_paths`` no relatório e para o checkpoint, de onde volta no relatório das
+        retomadas sem nova tentativa.
+
+        Args:
+            path: Diretório de imagens.
+            shard: Parte do trabalho deste processo, ``"i/N"`` ou ``(i, N)``. Processos com o mesmo N e i
+                diferentes cobrem o diretório sem sobreposição.
+            checkpoint: Arquivo do manifesto de chunks concluídos. None: sem retomada.
+            chunk_size: Imagens por chunk (unidade de inferência, de entrega e de checkpoint). Pode mudar entre
+                execuções do mesmo checkpoint.
+            recursive: Se True, inclui os subdiretórios.
+            sink: ``DetectionSink`` que recebe cada chunk.
+            on_chunk: Callback ``on_chunk(paths, batch)`` por chunk processado.
+            on_progress: Callback ``on_progress(stats)`` com ``JobProgress.stats()`` após cada chunk.
+            sync_every: Imagens entre sincronizações do ``sink`` (cada uma fecha a parte atual).
+            report_every: Segundos entre linhas de progresso impressas (com ``verbose``).
+            count_total: Se True, conta os arquivos do shard numa thread em paralelo para calcular % e ETA.
+            conf: Threshold de confiança (0.0-1.0).
+            iou: Threshold de IoU para NMS.
+            max_det: Número máximo de detecções por imagem.
+            classes: Lista de IDs de classes para filtrar.
+            **kwargs: Arguments adicionais para ``detect`` (exceto ``return_format``).
+
+        Returns:
+            Relatório final de ``JobProgress.stats()`` com ``shard``, ``checkpoint`` e ``failed_paths`` (imagens
+            ilegíveis do shard, incluindo as registradas no checkpoint por execuções anteriores).
+
+        Examples:
+            >>> # Máquina 3 de 8, gravando em Parquet e retomável
+            >>> with DetectionSink("results/shard3", format="parquet") as sink:
+            ...     report = detector.detect_directory(
+            ...         "/data/images", shard="3/8", checkpoint="results/shard3.ckpt", sink=sink
+            ...     )
+            >>> report["processed"], report["skipped"], report["images_per_s"]
+        """
+        if sink is None and on_chunk is None:
+            raise ValueError("detect_directory precisa de sink ou on_chunk para entregar os resultados")
+        # ``sink`` já é argumento deste método e nunca chega a ``kwargs``
+        _reject_reserved(kwargs, return_format="os chunks são sempre entregues como DetectionBatch")
+        if chunk_size < 1:
+            raise ValueError("chunk_size deve ser >= 1")
+        shard = parse_shard(shard)
+        manifest = None
+        if checkpoint is not None:
+            manifest = JobCheckpoint(checkpoint, job_description(path, shard, recursive))
+        progress = JobProgress()
+        entries = iter_images(path, recursive=recursive, shard=shard, with_relpath=True)
+        failed_paths: list[str] = []
+        if manifest is not None and manifest.cursor is not None:
+            # A enumeração é ordenada: tudo até o cursor já foi concluído
+            skipped = 0
+            for entry in entries:
+                if not manifest.is_done(entry[1]):
+                    entries = itertools.chain([entry], entries)
+                    break
+                skipped += 1
+            progress.update(skipped=skipped)
+            failed_paths.extend(os.path.join(path, rel) for rel in manifest.failed)
+
+        if count_total:
+
+            def count() -> None:
+                progress.total = sum(1 for _ in iter_images(path, recursive=recursive, shard=shard))
+
+            threading.Thread(target=count, name="yolopunk-count", daemon=True).start()
+
+        # Chunks entregues ao sink mas ainda não sincronizados: (cursor, imagens, falhas)
+        pending: list[tuple[str, int, list[str]]] = []
+        pending_images = 0
+        last_report = time.perf_counter()
+        try:
+            while True:
+                chunk_entries = list(itertools.islice(entries, chunk_size))
+                if not chunk_entries:
+                    break
+                chunk, relpaths = (list(v) for v in zip(*chunk_entries))
+                cursor = relpaths[-1]
+                batch, bad = self._detect_chunk(
+                    chunk, conf=conf, iou=iou, max_det=max_det, classes=classes, return_format="arrays", **kwargs
+                )
+                failed = [relpaths[i] for i in bad]
+                if bad:
+                    failed_paths.extend(chunk[i] for i in bad)
+                    chunk = [p for i, p in enumerate(chunk) if i not in bad]
+                    if self.verbose:
+                        print(f"🩸 {len(bad)} imagem(ns) ilegível(is) ignorada(s): {', '.join(failed[:3])}")
+                if on_chunk is not None:
+                    on_chunk(chunk, batch)
+                if sink is not None:
+                    sink.write(batch)
+                    pending.append((cursor, len(chunk), failed))
+                    pending_images += len(chunk)
+                    if pending_images >= sync_every:
+                        sink.sync()
+                        if manifest is not None:
+                            manifest.mark(pending)
+                        pending, pending_images = [], 0
+                elif manifest is not None:
+                    manifest.mark([(cursor, len(chunk), failed)])
+                progress.update(processed=len(chunk), failed=len(bad))
+
+                if on_progress is not None:
+                    on_progress(progress.stats())
+                if self.verbose and time.perf_counter() - last_report >= report_every:
+                    last_report = time.perf_counter()
+                    print(f"🩸 {progress.format()}")
+        finally:
+            try:
+                if sink is not None and pending:
+                    # Também numa interrupção: o que já foi entregue ao sink fica no disco e não é refeito
+                    sink.sync()
+                    if manifest is not None:
+                        manifest.mark(pending)
+            finally:
+                if manifest is not None:
+                    manifest.close()
+
+        report = progress.stats()
+        report["shard"] = f"{shard[0]}/{shard[1]}"
+        report["checkpoint"] = str(checkpoint) if checkpoint is not None else None
+        report["failed_paths"] = failed_paths
+        if self.verbose:
+            print(f"🩸 Diretório processado (shard {report['shard']}): {progress.format()}")
+        return report
+
+    def _detect_chunk(self, chunk: list[str], **kwargs: Any) -> tuple[DetectionBatch, set[int]]:
+        """Detecta um chunk de arquivos, isolando imagens ilegíveis.
+
+        O caminho feliz é uma única chamada a ``detect``. Se ela falhar, as imagens que ``cv2.imread`` não lê são
+        separadas e o chunk é refeito sem elas; se nenhuma for ilegível, o erro original é propagado (falha do
+        modelo ou do device, que não deve ser registrada como problema das imagens).
+
+        Returns:
+            Tupla (batch das imagens legíveis, índices das ilegíveis no chunk).
+        """
+        try:
+            return self.detect(chunk, **kwargs), set()
+        except Exception:
+            bad = {i for i, p in enumerate(chunk) if cv2.imread(p) is None}
+            if not bad:
+                raise
+        good = [p for i, p in enumerate(chunk) if i not in bad]
+        batch = self.detect(good, **kwargs) if good else DetectionBatch.empty()
+        return batch, bad
+
+    def process_video(
+        self,
+        source: str | Path | int,
+        output: str | Path | None = None,
+        conf: float = 0.25,
+        iou: float = 0.7,
+        max_det: int = 300,
+        classes: list[int] | None = None,
+        batch_size: int = 1,
+        stride: int = 1,
+        queue_size: int = 8,
+        drop_frames: bool = False,
+        on_result: Any = None,
+        gate: MotionGate | None = None,
+        **kwargs: Any,
+    ) -> dict:
+        """Processa um vídeo em pipeline: decodificação, inferência e codificação em threads separadas.
+
+        Diferente de ``detect(stream=True, save=True)``, que serializa os três estágios, aqui eles se sobrepõem
+        ligados por filas limitadas (ver ``yolopunk.video.VideoPipeline``).
+
+        Args:
+            source: Caminho do vídeo ou índice de câmera.
+            output: Caminho do vídeo anotado (desenhado com ``draw_boxes``). None para não gravar.
+            conf: Threshold de confiança (0.0-1.0).
+            iou: Threshold de IoU para NMS.
+            max_det: Número máximo de detecções por frame.
+            classes: Lista de IDs de classes para filtrar.
+            batch_size: Frames por forward pass.
+            stride: Processa 1 a cada ``stride`` frames.
+            queue_size: Capacidade das filas entre estágios.
+            drop_frames: Se True, descarta os frames mais antigos quando a inferência não acompanha.
+            on_result: Callback ``on_result(frame_index, frame, (boxes, labels, scores))`` por frame processado.
+            gate: ``MotionGate`` opcional; frames quase idênticos ao último inferido reutilizam suas detecções.
+            **kwargs: Arguments adicionais para ``detect`` (exceto ``batch`` e ``return_format``).
+
+        Returns:
+            Relatório com FPS e tempo ocupado por estágio, FPS de ponta a ponta e frames descartados (e contadores
+            do gate em ``report["gate"]``, se usado).
+
+        Examples:
+            >>> report = detector.process_video("video.mp4", output="annotated.mp4", batch_size=4, stride=2)
+            >>> report["decode"]["fps"], report["inference"]["fps"], report["encode"]["fps"]
+        """
+        _reject_reserved(kwargs, batch="use batch_size", return_format="o pipeline sempre usa 'arrays'")
+
+        def infer(frames: list) -> list:
+            batch = self.detect(
+                frames,
+                conf=conf,
+                iou=iou,
+                max_det=max_det,
+                classes=classes,
+                return_format="arrays",
+                batch=len(frames),
+                **kwargs,
+            )
+            detections = []
+            for boxes, scores, class_ids in batch:
+                labels = [batch.names.get(int(c), str(int(c))) for c in class_ids]
+                detections.append((boxes, labels, scores))
+            return detections
+
+        pipeline = VideoPipeline(
+            GatedInfer(infer, gate) if gate is not None else infer,
+            source,
+            output=output,
+            batch_size=batch_size,
+            stride=stride,
+            queue_size=queue_size,
+            drop_frames=drop_frames,
+            on_result=on_result,
+        )
+        report = pipeline.run()
+        if gate is not None:
+            report["gate"] = gate.stats()
+        if self.verbose:
+            print(
+                f"🩸 Vídeo processado: {report['inference']['frames']} frames, {report['fps']:.1f} FPS "
+                f"(decode {report['decode']['capacity_fps']:.1f}, "
+                f"inferência {report['inference']['capacity_fps']:.1f}, "
+                f"encode {report['encode']['capacity_fps']:.1f})"
+            )
+        return report
+
+    def multi_stream(
+        self,
+        batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        conf: float = 0.25,
+        iou: float = 0.7,
+        max_det: int = 300,
+        classes: list[int] | None = None,
+        result_buffer: int = 32,
+        **kwargs: Any,
+    ) -> StreamScheduler:
+        """Cria um agendador que processa várias fontes de vídeo com batches compartilhados entre streams.
+
+        Cada fonte registrada com ``add`` tem sua thread de captura; uma única thread de inferência junta o frame
+        mais recente de vários streams num batch (ver ``yolopunk.streams.StreamScheduler``), respeitando o limite
+        de FPS e o peso de cada stream. O throughput cresce com o tamanho do batch, não com o número de loops.
+
+        Args:
+            batch_size: Máximo de frames (de streams diferentes) por forward pass.
+            max_wait_ms: Espera máxima por outros streams antes de um batch incompleto.
+            conf: Threshold de confiança (0.0-1.0).
+            iou: Threshold de IoU para NMS.
+            max_det: Número máximo de detecções por frame.
+            classes: Lista de IDs de classes para filtrar.
+            result_buffer: Resultados guardados por stream sem ``on_result``.
+            **kwargs: Arguments adicionais para ``detect`` (exceto ``batch`` e ``return_format``).
+
+        Returns:
+            ``StreamScheduler`` cujos resultados são ``(boxes, scores, class_ids)`` por frame.
+
+        Examples:
+            >>> scheduler = detector.multi_stream(batch_size=8)
+            >>> for i, url in enumerate(camera_urls):
+            ...     scheduler.add(url, name=f"cam{i}", max_fps=5, on_result=handle)
+            >>> scheduler.add("entrada.mp4", max_fps=15, weight=2.0)
+            >>> report = scheduler.run(duration=300)
+            >>> report["fps"], report["mean_batch_size"]
+        """
+        _reject_reserved(kwargs, batch="use batch_size", return_format="o agendador sempre usa 'arrays'")
+
+        def infer(frames: list) -> list:
+            batch = self.detect(
+                frames,
+                conf=conf,
+                iou=iou,
+                max_det=max_det,
+                classes=classes,
+                return_format="arrays",
+                batch=len(frames),
+                **kwargs,
+            )
+            return list(batch)
+
+        return StreamScheduler(infer, batch_size=batch_size, max_wait_ms=max_wait_ms, result_buffer=result_buffer)
+
+    def detect_tiled(
+        self,
+        source: str | Path | Any | list,
+        tile: int = 640,
+        overlap: float = 0.2,
+        conf: float = 0.25,
+        iou: float = 0.7,
+        max_det: int = 300,
+        classes: list[int] | None = None,
+        merge_iou: float = 0.5,
+        merge: str = "nms",
+        merge_ios: float | None = None,
+        batch_size: int = 16,
+        include_full: bool = False,
+        **kwargs: Any,
+    ) -> DetectionBatch:
+        """Detecção fatiada para imagens muito maiores que ``imgsz``.
+
+        A imagem é dividida em tiles sobrepostos (views, sem cópia) que passam pelo modelo em lotes de
+        ``batch_size``; as boxes voltam para coordenadas globais e duplicatas nas emendas são fundidas por classe
+        (NMS ou weighted box fusion e, com ``merge_ios``, IoS para pedaços cortados na emenda). Objetos pequenos
+        continuam visíveis porque cada tile é inferido na resolução nativa.
+
+        Args:
+            source: Caminho de imagem, array BGR ou lista deles.
+            tile: Lado do tile em pixels (também usado como ``imgsz``, salvo se ``imgsz`` for passado).
+            overlap: Fração de sobreposição entre tiles vizinhos.
+            conf: Threshold de confiança (0.0-1.0).
+            iou: Threshold de IoU do NMS dentro de cada tile.
+            max_det: Número máximo de detecções por imagem (após a fusão).
+            classes: Lista de IDs de classes para filtrar.
+            merge_iou: Threshold de IoU para fundir duplicatas entre tiles.
+            merge: Estratégia de fusão entre tiles: 'nms' ou 'wbf'.
+            merge_ios: Fração da menor box coberta pela interseção acima da qual uma box cortada numa emenda é
+                fundida na box da mesma classe que atravessa a emenda (absorve a metade de um objeto vista pelo tile
+                vizinho; ex.: 0.8). None desativa.
+            batch_size: Tiles por forward pass.
+            include_full: Se True, inclui também a imagem inteira reduzida (ajuda com objetos maiores que o tile).
+            **kwargs: Arguments adicionais para ``detect``. ``imgsz`` redimensiona cada tile (ex.: ``tile=320,
+                imgsz=640`` amplia os tiles para objetos muito pequenos).
+
+        Returns:
+            ``DetectionBatch`` com uma entrada por imagem, em coordenadas da imagem original.
+
+        Examples:
+            >>> batch = detector.detect_tiled("aerial_8k.jpg", tile=640, overlap=0.2)
+            >>> boxes, scores, class_ids = batch[0]
+        """
+        imgsz = kwargs.pop("imgsz", tile)
+        # Definidos aqui por tile: o lote é o chunk e o retorno é sempre um DetectionBatch
+        kwargs.pop("batch", None)
+        kwargs.pop("return_format", None)
+        sources = source if isinstance(source, (list, tuple)) else [source]
+        batches = []
+        for item in sources:
+            img = cv2.imread(str(item), cv2.IMREAD_COLOR) if isinstance(item, (str, Path)) else item
+            if img is None:
+                raise FileNotFoundError(f"Imagem não encontrada: {item}")
+
+            views, offsets = slice_image(img, tile, overlap)
+            if include_full:
+                views.append(img)
+                offsets = np.concatenate([offsets, np.zeros((1, 2), np.float32)])
+
+            boxes, scores, class_ids = [], [], []
+            for start in range(0, len(views), batch_size):
+                chunk = views[start : start + batch_size]
+                dets = self.detect(
+                    chunk,
+                    conf=conf,
+                    iou=iou,
+                    max_det=max_det,
+                    classes=classes,
+                    imgsz=imgsz,
+                    batch=len(chunk),
+                    return_format="arrays",
+                    **kwargs,
+                )
+                shift = np.tile(offsets[start + dets.image_ids], 2)
+                boxes.append(dets.boxes + shift)
+                scores.append(dets.scores)
+                class_ids.append(dets.class_ids)
+
+            boxes, scores, class_ids = merge_detections(
+                np.concatenate(boxes),
+                np.concatenate(scores),
+                np.concatenate(class_ids),
+                iou=merge_iou,
+                max_det=max_det,
+                method=merge,
+                ios=merge_ios,
+                windows=np.concatenate([offsets, offsets + [[v.shape[1], v.shape[0]] for v in views]], axis=1),
+            )
+            batches.append(
+                DetectionBatch(
+                    boxes,
+                    scores,
+                    class_ids,
+                    np.array([0, len(boxes)]),
+                    np.array([img.shape[:2]]),
+                    [str(item) if isinstance(item, (str, Path)) else f"image{len(batches)}.jpg"],
+                    dets.names,
+                )
+            )
+        return DetectionBatch.concatenate(batches)
+
+    def detect_gated(
+        self,
+        source: str | Path | int | Any,
+        threshold: float = 0.02,
+        max_stale: int = 30,
+        gate: MotionGate | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Detecção em stream com gate de movimento.
+
+        O modelo só roda quando o frame difere do último frame inferido (score acima de ``threshold``) ou quando
+        ``max_stale`` frames seguidos reutilizaram o mesmo resultado. Nos demais frames o resultado anterior é
+        re-emitido.
+
+        Args:
+            source: Caminho de vídeo, índice de câmera ou iterável de frames BGR.
+            threshold: Diferença mínima (0-1) para rodar o modelo de novo.
+            max_stale: Máximo de frames seguidos reutilizando o mesmo resultado.
+            gate: ``MotionGate`` já configurado (sobrepõe ``threshold``/``max_stale``); útil para ler ``stats()``.
+            **kwargs: Arguments adicionais para ``detect``.
+
+        Returns:
+            Gerador com o resultado de cada frame (o mesmo objeto é re-emitido enquanto a cena está estática).
+            Argumentos e a fonte são validados já na chamada, não no primeiro frame.
+
+        Raises:
+            FileNotFoundError: Se o vídeo ou a câmera não puder ser aberto.
+
+        Examples:
+            >>> gate = MotionGate(threshold=0.03, max_stale=50)
+            >>> for result in detector.detect_gated("camera.mp4", gate=gate):
+            ...     pass
+            >>> gate.stats()["skip_ratio"]
+        """
+        gate = gate or MotionGate(threshold=threshold, max_stale=max_stale)
+        gated = GatedInfer(lambda frames: [self.detect(frames[0], **kwargs)[0]], gate)
+
+        return (gated([frame])[0] for frame in _open_frames(source))
+
+    def track(
+        self,
+        source: str | Path | int | Any,
+        detect_every: int = 5,
+        iou: float = 0.7,
+        max_det: int = 300,
+        classes: list[int] | None = None,
+        tracker: Tracker | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Tracking multi-objeto com detecção esparsa.
+
+        O detector roda só a cada ``detect_every`` frames (ou antes, se a confiança dos tracks decair); nos frames
+        intermediários os tracks avançam pela predição do filtro de Kalman (ver ``yolopunk.tracking.Tracker``). Os
+        IDs são estáveis enquanto o objeto continuar sendo reencontrado. Para várias câmeras, use um gerador por
+        câmera (cada um com o próprio ``Tracker``).
+
+        Args:
+            source: Caminho de vídeo, índice de câmera ou iterável de frames BGR.
+            detect_every: Intervalo máximo, em frames, entre duas detecções (ignorado se ``tracker`` for passado).
+            iou: Threshold de IoU do NMS do detector.
+            max_det: Número máximo de detecções por frame.
+            classes: Lista de IDs de classes para filtrar.
+            tracker: ``Tracker`` já configurado (thresholds, associação, ``max_age``...); útil para ler ``stats()``.
+            **kwargs: Arguments adicionais para ``detect`` (exceto ``conf``, que vem de ``tracker.low_thresh``, e
+                ``return_format``).
+
+        Returns:
+            Gerador de tuplas ``(frame, TrackFrame)`` por frame, com boxes, IDs, confianças e classes dos tracks
+            ativos. Argumentos e a fonte são validados já na chamada, não no primeiro frame.
+
+        Raises:
+            ValueError: Se ``kwargs`` trouxer ``conf`` ou ``return_format``.
+            FileNotFoundError: Se o vídeo ou a câmera não puder ser aberto.
+
+        Examples:
+            >>> tracker = Tracker(detect_every=10, matching="greedy")
+            >>> for frame, tracks in detector.track("camera.mp4", tracker=tracker):
+            ...     for box, track_id in zip(tracks.boxes, tracks.ids):
+            ...         pass
+            >>> tracker.stats()["detect_ratio"]
+        """
+        _reject_reserved(
+            kwargs,
+            conf="configure os thresholds no Tracker (low_thresh/high_thresh)",
+            return_format="o tracking sempre usa 'arrays'",
+        )
+        tracker = tracker or Tracker(detect_every=detect_every)
+
+        def step(frame: Any) -> TrackFrame:
+            if not tracker.should_detect():
+                tracks = tracker.step()
+            else:
+                boxes, scores, class_ids = self.detect(
+                    frame,
+                    conf=tracker.low_thresh,
+                    iou=iou,
+                    max_det=max_det,
+                    classes=classes,
+                    return_format="arrays",
+                    **kwargs,
+                )[0]
+                tracks = tracker.step(boxes, scores, class_ids)
+            tracks.boxes = clip_boxes(tracks.boxes, frame.shape[:2])
+            return tracks
+
+        return ((frame, step(frame)) for frame in _open_frames(source))
+
     def train(
         self,
         data: str,
@@ -187,10 +1636,19 @@ class Vision:
         Returns:
             Resultados do treinamento.
 
+        Note:
+            O treinamento altera os pesos do modelo. Se o modelo vier do registro compartilhado, esta instância passa
+            a usar uma cópia privada antes de treinar.
+
         Examples:
             >>> detector = Vision("yolov8n.pt")
             >>> results = detector.train(data="dataset.yaml", epochs=50, imgsz=640, batch=16)
         """
+        self._require_torch_backend("train")
+        if self.shared:
+            self._release_model()
+            self.shared = False
+
         results = self.model.train(
             data=data,
             epochs=epochs,
@@ -204,12 +1662,19 @@ class Vision:
     def export(
         self,
         format: str = "onnx",
+        cache: bool | ExportCache = True,
         **kwargs: Any,
     ) -> str:
         """Exporta o modelo para outros formatos.
 
+        Com cache ativo, o artefato é indexado pelo hash dos pesos + formato + argumentos e guardado em
+        ``MODELS_DIR / "exports"``; chamadas repetidas com os mesmos pesos e argumentos retornam o caminho em cache
+        sem re-exportar.
+
         Args:
             format: Formato de exportação. Opções: 'onnx', 'torchscript', 'coreml', 'tflite', etc.
+            cache: True para usar o cache padrão, False para sempre exportar (saída ao lado dos pesos), ou uma
+                instância de ``ExportCache`` (diretório/tamanho customizados).
             **kwargs: Arguments adicionais para model.export()
 
         Returns:
@@ -218,8 +1683,22 @@ class Vision:
         Examples:
             >>> detector = Vision("yolov8n.pt")
             >>> path = detector.export(format="onnx")
+            >>> path = detector.export(format="onnx", imgsz=320, dynamic=True)  # Outra entrada no cache
         """
-        path = self.model.export(format=format, **kwargs)
+        self._require_torch_backend("export")
+        model = self.model
+        weights = getattr(model, "ckpt_path", None)
+
+        if cache and weights and Path(weights).is_file():
+            export_cache = cache if isinstance(cache, ExportCache) else None
+            path, hit = cached_export(model, format, kwargs, cache=export_cache)
+            path = str(path)
+            if self.verbose:
+                print(f"🩸 Modelo exportado ({'cache' if hit else 'novo'}): {path}")
+            return path
+
+        with self._model_lock:
+            path = model.export(format=format, **kwargs)
         if self.verbose:
             print(f"🩸 Modelo exportado: {path}")
         return path
@@ -230,6 +1709,9 @@ class Vision:
     ) -> dict:
         """Realiza benchmark de performance do modelo.
 
+        Compara formatos de exportação (via Ultralytics). Para latência e throughput do caminho real
+        (load → resize → detect → draw → save), use ``python -m yolopunk.bench pipeline``.
+
         Args:
             **kwargs: Arguments adicionais para model.benchmark()
 
@@ -240,12 +1722,272 @@ class Vision:
             >>> detector = Vision("yolov8n.pt")
             >>> metrics = detector.benchmark()
         """
+        self._require_torch_backend("benchmark")
         return self.model.benchmark(**kwargs)
 
     def __repr__(self) -> str:
         """Representação string do objeto."""
-        return f"Vision(model={self.model_name!r}, device={self.device!r}, task={self.task!r})"
+        return (
+            f"Vision(model={self.model_name!r}, device={self.device!r}, task={self.task!r}, backend={self.backend!r}, "
+            f"precision={self.precision!r})"
+        )
 
     def __str__(self) -> str:
         """String legível do objeto."""
         return f"YOLOPunk Vision - {self.model_name} on {self.device}"
+
+
+# ═══════════════════════════════════════════════════════════════
+#  🧵 Pool de processos
+# ═══════════════════════════════════════════════════════════════
+
+# Estado por processo worker do VisionPool
+_pool_vision: Vision | None = None
+_pool_config: dict = {}
+
+
+def _pool_worker_init(counter: Any, config: dict, cpu_slices: list[list[int]]) -> None:
+    """Inicializa um worker do VisionPool: fixa CPUs e threads, sem carregar o modelo ainda."""
+    global _pool_config
+
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+
+    cpus = cpu_slices[index % len(cpu_slices)] if cpu_slices else []
+    if cpus and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, cpus)
+        except OSError:
+            pass
+
+    threads = config["threads_per_worker"]
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+    except (ImportError, RuntimeError):
+        pass
+    try:
+        import cv2
+
+        cv2.setNumThreads(threads)
+    except ImportError:
+        pass
+
+    _pool_config = dict(config, worker_index=index, cpus=cpus)
+
+
+def _pool_worker_detect(source: Any, kwargs: dict) -> list | DetectionBatch | int:
+    """Executa ``Vision.detect`` no worker, carregando o modelo na primeira chamada.
+
+    O retorno volta ao processo pai por pickle: ``DetectionBatch`` (``return_format='arrays'``) já é só arrays, e
+    dos ``Results`` sai o ``orig_img``, que o pai já tem e que dominaria o tráfego pelo pipe.
+    """
+    global _pool_vision
+
+    if _pool_vision is None:
+        _pool_vision = Vision(
+            _pool_config["model_name"],
+            device=_pool_config["device"],
+            task=_pool_config["task"],
+            verbose=_pool_config["verbose"],
+            autotuned=False,  # as threads do worker já foram fixadas pelo pool
+        )
+    output = _pool_vision.detect(source, **kwargs)
+    if isinstance(output, (DetectionBatch, int)):
+        return output
+    results = list(output)
+    for result in results:
+        result.orig_img = None
+    return results
+
+
+def _pool_worker_info() -> dict:
+    """Retorna informações de diagnóstico do worker."""
+    return {
+        "pid": os.getpid(),
+        "worker_index": _pool_config.get("worker_index"),
+        "cpus": _pool_config.get("cpus"),
+        "model_loaded": _pool_vision is not None,
+    }
+
+
+class VisionPool:
+    """Pool de processos com uma réplica do modelo por worker para inferência em CPU.
+
+    Cada worker é um processo separado (livre do GIL) que carrega sua própria cópia de ``model`` na primeira
+    chamada e roda com uma fatia fixa dos cores da máquina (afinidade de CPU + threads do torch/OpenCV). Listas de
+    imagens são divididas em blocos distribuídos entre os workers, e os resultados voltam na ordem de entrada.
+
+    Os ``Results`` voltam sem ``orig_img`` (a imagem não é copiada de volta pelo pipe): para ``plot()``, passe a
+    imagem original com ``result.orig_img = img``. Com ``return_format='arrays'`` só arrays cruzam os processos
+    e ``detect`` devolve um único ``DetectionBatch``.
+
+    Args:
+        model: Gnome do modelo YOLO ou caminho para arquivo de pesos.
+        workers: Número de processos. Padrão: metade dos cores disponíveis.
+        threads_per_worker: Threads de torch/OpenCV por worker. Padrão: cores disponíveis divididos pelos workers.
+        device: Device para inferência nos workers. Padrão: 'cpu'
+        task: Tipo de tarefa (ver ``Vision``).
+        chunk_size: Número de imagens por tarefa enviada a um worker. Padrão: divide a lista igualmente.
+        pin_cpus: Se True, fixa cada worker em uma fatia disjunta de CPUs (somente Linux).
+        verbose: Se True, exibe logs do YOLO nos workers.
+
+    Examples:
+        >>> with VisionPool("yolov8n.pt", workers=8) as pool:
+        ...     results = pool.detect(["img1.jpg", "img2.jpg", "img3.jpg"], conf=0.5)
+
+        >>> pool = VisionPool("yolov8n.pt")
+        >>> future = pool.submit("image.jpg")
+        >>> results = future.result()
+        >>> pool.close()
+    """
+
+    def __init__(
+        self,
+        model: str = "yolov8n.pt",
+        workers: int | None = None,
+        threads_per_worker: int | None = None,
+        device: str = "cpu",
+        task: str = "detect",
+        chunk_size: int | None = None,
+        pin_cpus: bool = True,
+        verbose: bool = False,
+    ):
+        """Inicializa o pool e inicia os processos worker."""
+        if not ULTRALYTICS_AVAILABLE:
+            raise ImportError("Ultralytics YOLO não está instalado. Install com: pip install ultralytics")
+
+        if hasattr(os, "sched_getaffinity"):
+            available = sorted(os.sched_getaffinity(0))
+        else:
+            available = list(range(os.cpu_count() or 1))
+
+        self.model_name = model
+        self.device = device
+        self.task = task
+        self.workers = workers or max(1, len(available) // 2)
+        self.threads_per_worker = threads_per_worker or max(1, len(available) // self.workers)
+        self.chunk_size = chunk_size
+        self.verbose = verbose
+
+        cpu_slices: list[list[int]] = []
+        if pin_cpus and len(available) >= self.workers:
+            step = self.threads_per_worker
+            for i in range(self.workers):
+                cpus = available[i * step : (i + 1) * step]
+                if not cpus:
+                    cpus = [available[i % len(available)]]
+                cpu_slices.append(cpus)
+
+        # 'spawn' evita herdar estado de torch/threads do processo pai via fork
+        context = multiprocessing.get_context("spawn")
+        config = {
+            "model_name": model,
+            "device": device,
+            "task": task,
+            "verbose": verbose,
+            "threads_per_worker": self.threads_per_worker,
+        }
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_pool_worker_init,
+            initargs=(context.Value("i", 0), config, cpu_slices),
+        )
+
+    def submit(self, source: Any, **kwargs: Any) -> concurrent.futures.Future:
+        """Envia uma chamada de ``detect`` para o próximo worker livre.
+
+        Args:
+            source: Imagem, lista de imagens ou caminho aceito por ``Vision.detect``.
+            **kwargs: Arguments adicionais para ``Vision.detect``.
+
+        Returns:
+            Future com a lista de resultados.
+        """
+        if kwargs.get("stream"):
+            raise ValueError("VisionPool não suporta stream=True")
+        return self._executor.submit(_pool_worker_detect, source, kwargs)
+
+    def detect(self, source: Any, **kwargs: Any) -> list:
+        """Realiza detecção distribuindo as imagens entre os workers.
+
+        Args:
+            source: Imagem única ou lista de imagens (caminhos ou arrays).
+            **kwargs: Arguments adicionais para ``Vision.detect`` (conf, iou, classes, ...).
+
+        Returns:
+            Lista de resultados na mesma ordem de ``source`` (sem ``orig_img``), ou ``DetectionBatch`` com
+            ``return_format='arrays'``.
+
+        Examples:
+            >>> results = pool.detect(sorted(Path("images").glob("*.jpg")), conf=0.4)
+            >>> batch = pool.detect(image_paths, return_format="arrays")
+        """
+        if not isinstance(source, (list, tuple)):
+            return self.submit(source, **kwargs).result()
+
+        arrays = kwargs.get("return_format") == "arrays"
+        sources = list(source)
+        if not sources:
+            return DetectionBatch.empty() if arrays else []
+        chunk_size = self.chunk_size or max(1, -(-len(sources) // self.workers))
+        futures = [
+            self.submit(sources[i : i + chunk_size], **kwargs) for i in range(0, len(sources), chunk_size)
+        ]
+        if arrays:
+            return DetectionBatch.concatenate(future.result() for future in futures)
+        results: list = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def map(self, sources: Any, **kwargs: Any) -> Any:
+        """Processa um iterável de imagens, uma tarefa por imagem, retornando resultados em ordem.
+
+        Args:
+            sources: Iterável de imagens.
+            **kwargs: Arguments adicionais para ``Vision.detect``.
+
+        Yields:
+            Resultado de cada imagem, na ordem de entrada.
+        """
+        if kwargs.get("stream"):
+            raise ValueError("VisionPool não suporta stream=True")
+        for results in self._executor.map(_pool_worker_detect, sources, itertools.repeat(kwargs)):
+            yield results[0] if len(results) == 1 else results
+
+    def worker_info(self) -> list[dict]:
+        """Retorna PID, índice, CPUs fixadas e estado do modelo de cada worker alcançado."""
+        futures = [self._executor.submit(_pool_worker_info) for _ in range(self.workers)]
+        seen: dict = {}
+        for future in futures:
+            info = future.result()
+            seen[info["pid"]] = info
+        return list(seen.values())
+
+    def close(self, wait: bool = True) -> None:
+        """Encerra os processos worker.
+
+        Args:
+            wait: Se True, aguarda tarefas pendentes terminarem.
+        """
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> VisionPool:
+        """Suporte a context manager."""
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        """Fecha o pool ao sair do bloco ``with``."""
+        self.close()
+
+    def __repr__(self) -> str:
+        """Representação string do objeto."""
+        return (
+            f"VisionPool(model={self.model_name!r}, workers={self.workers}, "
+            f"threads_per_worker={self.threads_per_worker}, device={self.device!r})"
+        )
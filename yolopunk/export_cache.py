@@ -0,0 +1,284 @@
+# YOLOPunk 🩸 AGPL-3.0 License
+
+"""Cache endereçado por conteúdo para artefatos de ``Vision.export``.
+
+Cada artefato é indexado pelo hash dos pesos + formato + argumentos de exportação. Um acerto devolve o caminho em
+cache sem re-exportar. A publicação é atômica (``os.rename`` de um diretório de staging no mesmo filesystem), então
+vários nós exportando ao mesmo tempo em um storage compartilhado nunca veem artefatos pela metade.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from . import MODELS_DIR, ensure_dir
+from .registry import weights_fingerprint
+
+try:
+    from ultralytics import __version__ as ULTRALYTICS_VERSION
+except ImportError:
+    ULTRALYTICS_VERSION = None
+
+# Diretório padrão do cache
+EXPORT_CACHE_DIR = MODELS_DIR / "exports"
+
+# Tamanho máximo padrão do cache (bytes)
+DEFAULT_MAX_BYTES = 4 * 1024**3
+
+_META_FILE = "meta.json"
+_STAGING_PREFIX = ".staging-"
+
+
+def _tree_size(path: Path) -> int:
+    """Soma o tamanho dos arquivos de um diretório (ou de um arquivo)."""
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+class ExportCache:
+    """Cache de artefatos exportados, com despejo LRU por tamanho.
+
+    Layout: ``<root>/<key[:2]>/<key>/`` contendo o artefato (arquivo ou diretório) e ``meta.json``. O mtime de
+    ``meta.json`` marca o último uso.
+
+    Args:
+        root: Diretório do cache. Padrão: ``MODELS_DIR / "exports"``.
+        max_bytes: Tamanho máximo do cache; artefatos menos recentemente usados são removidos acima disso.
+
+    Examples:
+        >>> cache = ExportCache(max_bytes=2 * 1024**3)
+        >>> key = cache.make_key("yolov8n.pt", "onnx", {"imgsz": 640})
+        >>> cache.get(key)  # None se ainda não exportado
+    """
+
+    def __init__(self, root: str | Path | None = None, max_bytes: int | None = DEFAULT_MAX_BYTES):
+        """Inicializa o cache (o diretório é criado no primeiro uso)."""
+        self.root = Path(root) if root is not None else EXPORT_CACHE_DIR
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(weights: str | Path, format: str, kwargs: dict) -> str:
+        """Calcula a chave de um artefato.
+
+        A versão do Ultralytics entra na chave: o exportador muda o grafo gerado entre versões, e um artefato de
+        uma versão antiga não deve ser servido depois de um upgrade.
+
+        Args:
+            weights: Caminho para os pesos (o conteúdo entra no hash).
+            format: Formato de exportação.
+            kwargs: Argumentos de exportação (imgsz, half, dynamic, opset...).
+
+        Returns:
+            Hash hexadecimal SHA-256.
+        """
+        payload = json.dumps(
+            {
+                "weights": weights_fingerprint(weights),
+                "format": format,
+                "kwargs": kwargs,
+                "ultralytics": ULTRALYTICS_VERSION,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _entry_dir(self, key: str) -> Path:
+        """Diretório de uma entrada."""
+        return self.root / key[:2] / key
+
+    def get(self, key: str) -> Path | None:
+        """Retorna o artefato em cache para a chave, marcando-o como usado.
+
+        Args:
+            key: Chave de ``make_key``.
+
+        Returns:
+            Caminho do artefato, ou None em caso de falta.
+        """
+        meta_path = self._entry_dir(key) / _META_FILE
+        try:
+            meta = json.loads(meta_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        artifact = meta_path.parent / meta["artifact"]
+        if not artifact.exists():
+            return None
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+        return artifact
+
+    def put(self, key: str, produce: Callable[[Path], str | Path], meta: dict | None = None) -> Path:
+        """Produz um artefato em um diretório de staging e o publica atomicamente.
+
+        Se outro processo publicar a mesma chave antes, o artefato dele é usado e o local é descartado. Um diretório
+        de entrada inválido (sem ``meta.json`` legível ou sem o artefato, ex.: apagado à mão pela metade) é tirado
+        do caminho e a publicação é refeita, em vez de falhar para sempre.
+
+        Args:
+            key: Chave de ``make_key``.
+            produce: Função que recebe o diretório de staging e retorna o caminho do artefato criado dentro dele.
+            meta: Metadados extras gravados em ``meta.json``.
+
+        Returns:
+            Caminho do artefato publicado.
+        """
+        entry_dir = self._entry_dir(key)
+        ensure_dir(entry_dir.parent)
+        staging = Path(tempfile.mkdtemp(prefix=_STAGING_PREFIX, dir=entry_dir.parent))
+        try:
+            artifact = Path(produce(staging))
+            # Os dois lados resolvidos: com symlinks no caminho do cache (ex.: /tmp → /private/tmp) a comparação
+            # crua falharia e o artefato seria movido para cima de si mesmo
+            if staging.resolve() not in artifact.resolve().parents:
+                # Artefato criado fora do staging: move para dentro
+                target = staging / artifact.name
+                shutil.move(str(artifact), str(target))
+                artifact = target
+            record = dict(meta or {}, key=key, artifact=artifact.name, created=time.time())
+            (staging / _META_FILE).write_text(json.dumps(record, indent=2, default=str))
+            try:
+                os.rename(staging, entry_dir)
+            except OSError:
+                # Outro processo publicou primeiro (destino já existe) ou o destino é uma entrada inválida
+                if self.get(key) is None:
+                    self._quarantine(entry_dir)
+                    try:
+                        os.rename(staging, entry_dir)
+                    except OSError:
+                        if self.get(key) is None:
+                            raise
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging, ignore_errors=True)
+
+        self.prune(keep=key)
+        return self.get(key) or entry_dir / artifact.name
+
+    @staticmethod
+    def _quarantine(entry_dir: Path) -> None:
+        """Tira uma entrada inválida do caminho (renomeia para um nome de staging e apaga)."""
+        trash = entry_dir.with_name(f"{_STAGING_PREFIX}{entry_dir.name}-invalid-{os.getpid()}-{time.time_ns()}")
+        try:
+            os.rename(entry_dir, trash)
+        except OSError:
+            return
+        shutil.rmtree(trash, ignore_errors=True)
+
+    def entries(self) -> list[dict]:
+        """Lista as entradas publicadas, da menos para a mais recentemente usada.
+
+        Returns:
+            Lista de dicionários com ``key``, ``path``, ``nbytes`` e ``last_used``.
+        """
+        if not self.root.exists():
+            return []
+        items = []
+        for meta_path in self.root.glob(f"*/*/{_META_FILE}"):
+            try:
+                last_used = meta_path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            items.append(
+                {
+                    "key": meta_path.parent.name,
+                    "path": meta_path.parent,
+                    "nbytes": _tree_size(meta_path.parent),
+                    "last_used": last_used,
+                }
+            )
+        return sorted(items, key=lambda e: e["last_used"])
+
+    def prune(self, keep: str | None = None) -> int:
+        """Remove entradas LRU até o cache caber em ``max_bytes``.
+
+        Args:
+            keep: Chave que nunca é removida (ex.: a recém-publicada).
+
+        Returns:
+            Número de entradas removidas.
+        """
+        if self.max_bytes is None:
+            return 0
+        entries = self.entries()
+        total = sum(e["nbytes"] for e in entries)
+        removed = 0
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry["key"] == keep:
+                continue
+            # Renomeia antes de apagar para que leitores nunca vejam uma entrada parcial
+            trash = entry["path"].with_name(f"{_STAGING_PREFIX}{entry['key']}-{os.getpid()}")
+            try:
+                os.rename(entry["path"], trash)
+            except OSError:
+                continue
+            shutil.rmtree(trash, ignore_errors=True)
+            total -= entry["nbytes"]
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Remove todo o cache."""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def __repr__(self) -> str:
+        """Representação string do objeto."""
+        return f"ExportCache(root={str(self.root)!r}, max_bytes={self.max_bytes})"
+
+
+def cached_export(
+    model: Any,
+    format: str,
+    kwargs: dict,
+    cache: ExportCache | None = None,
+    loader: Callable[[str], Any] | None = None,
+) -> tuple[Path, bool]:
+    """Exporta um modelo YOLO passando pelo cache.
+
+    A exportação roda sobre uma cópia dos pesos dentro do staging, para que processos paralelos nunca escrevam no
+    mesmo arquivo ao lado dos pesos originais.
+
+    Args:
+        model: Instância YOLO já carregada (usada para descobrir o arquivo de pesos).
+        format: Formato de exportação.
+        kwargs: Argumentos de exportação.
+        cache: Cache a usar. Padrão: ``ExportCache()``.
+        loader: Função que carrega um YOLO a partir de um caminho. Padrão: ``ultralytics.YOLO``.
+
+    Returns:
+        Tupla (caminho do artefato, True se veio do cache).
+    """
+    cache = cache or ExportCache()
+    weights = getattr(model, "ckpt_path", None)
+    if not weights or not Path(weights).is_file():
+        raise ValueError("Cache de exportação requer um arquivo de pesos local (.pt)")
+
+    key = cache.make_key(weights, format, kwargs)
+    hit = cache.get(key)
+    if hit is not None:
+        return hit, True
+
+    if loader is None:
+        from ultralytics import YOLO as loader
+
+    def produce(staging: Path) -> Path:
+        local_weights = staging / Path(weights).name
+        shutil.copy2(weights, local_weights)
+        artifact = Path(loader(str(local_weights)).export(format=format, **kwargs))
+        local_weights.unlink(missing_ok=True)
+        return artifact
+
+    path = cache.put(key, produce, meta={"weights": str(weights), "format": format, "kwargs": kwargs})
+    return path, False
@@ -0,0 +1,485 @@
+# YOLOPunk 🩸 AGPL-3.0 License
+
+"""Ring buffer de frames em memória compartilhada para pipelines de câmera entre processos.
+
+Passar frames por ``multiprocessing.Queue`` serializa cada um com pickle: em 1080p (6 MB por frame) a cópia custa
+mais que a própria decodificação. ``FrameRing`` pré-aloca N slots uint8 num único bloco
+``multiprocessing.shared_memory`` e manda pelo canal de controle só ``(slot, seq)``:
+
+- o produtor (processo com ``cv2.VideoCapture``) decodifica direto no slot (``capture.read(slot)``) e publica;
+- o consumidor (processo com ``Vision``) recebe o índice e usa o frame como view NumPy do bloco, sem cópia,
+  enquanto o slot fica reservado; ao liberar, o slot volta a ser reutilizável.
+
+Semântica de câmera ao vivo: o produtor nunca espera. Se não há slot livre ele sobrescreve o frame pronto mais
+antigo (``overwritten``); o aviso já enfileirado desse frame fica obsoleto e o consumidor o descarta comparando o
+número de sequência. Slots reservados por consumidores nunca são sobrescritos.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any
+
+from .utils import cv2, np
+
+# Estados de um slot
+SLOT_FREE, SLOT_WRITING, SLOT_READY, SLOT_READING = 0, 1, 2, 3
+
+# Metadados por slot, no início do bloco compartilhado
+SLOT_DTYPE = np.dtype(
+    [
+        ("seq", "<i8"),
+        ("state", "<i4"),
+        ("source", "<i4"),
+        ("height", "<i4"),
+        ("width", "<i4"),
+        ("channels", "<i4"),
+        ("frame_index", "<i8"),
+        ("timestamp", "<f8"),
+    ]
+)
+
+# Contadores globais: próximo seq, frames publicados, sobrescritos sem leitura, descartados sem slot livre
+_COUNTERS = ("next_seq", "published", "overwritten", "dropped")
+
+# Alinhamento do início de cada slot de dados (linha de cache)
+_ALIGN = 64
+
+# Mensagem de fim de fluxo no canal de controle
+_EOS_SLOT = -1
+
+
+def _aligned(n: int) -> int:
+    """Arredonda ``n`` para cima até o múltiplo de ``_ALIGN``."""
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class RingFrame:
+    """Frame lido de um ``FrameRing``.
+
+    ``image`` é uma view do slot compartilhado (sem cópia) válida até ``release()``; use como context manager
+    para liberar o slot automaticamente.
+
+    Attributes:
+        image: Array uint8 ``(H, W, C)``.
+        seq: Número de sequência global do frame.
+        slot: Índice do slot.
+        source: Identificador da fonte (câmera) que produziu o frame.
+        frame_index: Índice do frame na fonte.
+        timestamp: ``time.time()`` da publicação pelo produtor.
+    """
+
+    __slots__ = ("_ring", "frame_index", "image", "seq", "slot", "source", "timestamp")
+
+    def __init__(self, ring: FrameRing | None, slot: int, seq: int, image: Any, meta: Any):
+        self._ring = ring
+        self.slot = slot
+        self.seq = seq
+        self.image = image
+        self.source = int(meta["source"])
+        self.frame_index = int(meta["frame_index"])
+        self.timestamp = float(meta["timestamp"])
+
+    @property
+    def latency_s(self) -> float:
+        """Tempo desde a publicação do frame."""
+        return time.time() - self.timestamp
+
+    def release(self) -> None:
+        """Devolve o slot ao ring (a view ``image`` deixa de ser válida)."""
+        if self._ring is not None:
+            self._ring._release(self.slot, self.seq)
+            self._ring = None
+
+    def __enter__(self) -> RingFrame:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.release()
+
+    def __repr__(self) -> str:
+        """Representação string do objeto."""
+        return (
+            f"RingFrame(seq={self.seq}, slot={self.slot}, source={self.source}, frame_index={self.frame_index}, "
+            f"shape={tuple(self.image.shape)})"
+        )
+
+
+class FrameRing:
+    """Ring buffer de slots uint8 em ``multiprocessing.shared_memory`` com canal de controle de índices.
+
+    O objeto é passado como argumento de ``multiprocessing.Process``: no filho ele se reconecta ao mesmo bloco
+    (por nome), ao mesmo lock e à mesma fila. Só o processo que criou o ring remove o bloco em ``close()``.
+
+    Args:
+        slots: Número de slots. Deve cobrir os frames reservados pelos consumidores mais os em escrita, com folga
+            para o produtor não descartar frames.
+        frame_shape: Maior frame ``(H, W, C)`` aceito; frames menores usam parte do slot.
+        queue_size: Avisos pendentes no canal de controle (padrão: ``slots``). Com o canal cheio, o aviso mais
+            antigo é descartado para dar lugar ao novo.
+        context: Contexto de multiprocessing dos processos que vão usar o ring ('spawn' por padrão, como em
+            ``VisionPool``).
+
+    Examples:
+        >>> ring = FrameRing(slots=8, frame_shape=(1080, 1920, 3))
+        >>> producer = multiprocessing.get_context("spawn").Process(target=capture_to_ring, args=("rtsp://...", ring))
+        >>> producer.start()
+        >>> while (frame := ring.get(latest=True)) is not None:
+        ...     with frame:
+        ...         results = detector.detect(frame.image)
+        >>> ring.close()
+    """
+
+    def __init__(
+        self,
+        slots: int = 8,
+        frame_shape: tuple[int, int, int] = (1080, 1920, 3),
+        queue_size: int | None = None,
+        context: str | Any = "spawn",
+    ):
+        """Aloca o bloco compartilhado, o lock e o canal de controle."""
+        if slots < 2:
+            raise ValueError("FrameRing precisa de pelo menos 2 slots")
+        if len(frame_shape) != 3:
+            raise ValueError(f"frame_shape deve ser (H, W, C), recebido: {frame_shape}")
+        ctx = multiprocessing.get_context(context) if isinstance(context, str) or context is None else context
+
+        self.slots = slots
+        self.frame_shape = tuple(int(v) for v in frame_shape)
+        self.slot_bytes = _aligned(int(np.prod(self.frame_shape)))
+        header = _aligned(8 * len(_COUNTERS) + SLOT_DTYPE.itemsize * slots)
+        self._shm = shared_memory.SharedMemory(create=True, size=header + self.slot_bytes * slots)
+        self._owner = True
+        self._lock = ctx.Lock()
+        self._queue = ctx.Queue(maxsize=queue_size or slots)
+        self._map()
+        self._counters[:] = 0
+        self._meta[:] = np.zeros(slots, dtype=SLOT_DTYPE)
+        self._stale = 0
+
+    def _map(self) -> None:
+        """Cria as views NumPy sobre o bloco compartilhado."""
+        buf = self._shm.buf
+        self._counters = np.ndarray((len(_COUNTERS),), dtype="<i8", buffer=buf)
+        self._meta = np.ndarray((self.slots,), dtype=SLOT_DTYPE, buffer=buf, offset=8 * len(_COUNTERS))
+        header = _aligned(8 * len(_COUNTERS) + SLOT_DTYPE.itemsize * self.slots)
+        self._data = np.ndarray((self.slots, self.slot_bytes), dtype=np.uint8, buffer=buf, offset=header)
+
+    @property
+    def name(self) -> str:
+        """Nome do bloco de memória compartilhada."""
+        return self._shm.name
+
+    # ─── Pickle (envio para processos filhos) ──────────────────────
+
+    def __getstate__(self) -> dict:
+        return {
+            "name": self._shm.name,
+            "slots": self.slots,
+            "frame_shape": self.frame_shape,
+            "slot_bytes": self.slot_bytes,
+            "lock": self._lock,
+            "queue": self._queue,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.slots = state["slots"]
+        self.frame_shape = state["frame_shape"]
+        self.slot_bytes = state["slot_bytes"]
+        self._lock = state["lock"]
+        self._queue = state["queue"]
+        self._shm = shared_memory.SharedMemory(name=state["name"])
+        self._owner = False
+        self._stale = 0
+        self._map()
+
+    # ─── Produtor ──────────────────────────────────────────────────
+
+    def _acquire_slot(self) -> tuple[int, int]:
+        """Reserva um slot para escrita: o livre mais antigo ou, sem livres, o pronto mais antigo.
+
+        Returns:
+            ``(slot, seq)``, ou ``(-1, -1)`` se todos estão em escrita ou reservados por consumidores.
+        """
+        with self._lock:
+            meta = self._meta
+            states = meta["state"]
+            candidates = np.flatnonzero(states == SLOT_FREE)
+            if not len(candidates):
+                candidates = np.flatnonzero(states == SLOT_READY)
+                if not len(candidates):
+                    self._counters[3] += 1
+                    return -1, -1
+                self._counters[2] += 1
+            slot = int(candidates[np.argmin(meta["seq"][candidates])])
+            seq = int(self._counters[0]) + 1
+            self._counters[0] = seq
+            meta["seq"][slot] = seq
+            meta["state"][slot] = SLOT_WRITING
+            return slot, seq
+
+    def _slot_view(self, slot: int, shape: tuple[int, ...]) -> Any:
+        """View ``(H, W, C)`` uint8 do início de um slot."""
+        return self._data[slot, : int(np.prod(shape))].reshape(shape)
+
+    def _publish(self, slot: int, seq: int, shape: tuple, source: int, frame_index: int) -> None:
+        """Marca o slot como pronto e avisa os consumidores; com o canal cheio, descarta o aviso mais antigo."""
+        with self._lock:
+            record = self._meta[slot]
+            record["height"], record["width"], record["channels"] = shape
+            record["source"] = source
+            record["frame_index"] = frame_index
+            record["timestamp"] = time.time()
+            record["state"] = SLOT_READY
+            self._counters[1] += 1
+        message = (slot, seq)
+        while True:
+            try:
+                self._queue.put_nowait(message)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _abort(self, slot: int) -> None:
+        """Devolve um slot reservado para escrita que não chegou a ser publicado."""
+        with self._lock:
+            self._meta["state"][slot] = SLOT_FREE
+
+    def put(self, frame: Any, source: int = 0, frame_index: int = -1) -> int:
+        """Copia um frame para o ring e publica (uma cópia, contra a serialização inteira da fila).
+
+        Args:
+            frame: Array uint8 ``(H, W, C)`` (ou ``(H, W)``) que caiba em ``frame_shape``.
+            source: Identificador da fonte.
+            frame_index: Índice do frame na fonte.
+
+        Returns:
+            Número de sequência do frame, ou -1 se foi descartado por falta de slot.
+        """
+        frame = np.asarray(frame)
+        if frame.ndim == 2:
+            frame = frame[..., None]
+        if frame.dtype != np.uint8 or frame.nbytes > self.slot_bytes:
+            raise ValueError(
+                f"Frame {frame.shape} {frame.dtype} não cabe no slot ({self.frame_shape} uint8 = {self.slot_bytes} B)"
+            )
+        slot, seq = self._acquire_slot()
+        if slot < 0:
+            return -1
+        try:
+            self._slot_view(slot, frame.shape)[...] = frame
+        except BaseException:
+            self._abort(slot)
+            raise
+        self._publish(slot, seq, frame.shape, source, frame_index)
+        return seq
+
+    def read_capture(self, capture: Any, source: int = 0, frame_index: int = -1) -> int | None:
+        """Decodifica o próximo frame de um ``cv2.VideoCapture`` direto num slot (sem cópia intermediária).
+
+        O OpenCV escreve no array passado a ``read`` quando forma e tipo coincidem com o frame decodificado; se
+        não coincidirem (frame de outro tamanho), o frame é copiado para o slot.
+
+        Returns:
+            Número de sequência, -1 se descartado por falta de slot, ou None no fim do vídeo.
+        """
+        slot, seq = self._acquire_slot()
+        if slot < 0:
+            ok = capture.grab()
+            return -1 if ok else None
+        try:
+            view = self._slot_view(slot, self.frame_shape)
+            ok, frame = capture.read(view)
+            if not ok or frame is None:
+                self._abort(slot)
+                return None
+            if not np.shares_memory(frame, self._data[slot]):
+                if frame.nbytes > self.slot_bytes:
+                    raise ValueError(f"Frame {frame.shape} não cabe no slot ({self.frame_shape})")
+                self._slot_view(slot, frame.shape)[...] = frame
+        except BaseException:
+            self._abort(slot)
+            raise
+        self._publish(slot, seq, frame.shape if frame.ndim == 3 else (*frame.shape, 1), source, frame_index)
+        return seq
+
+    def finish(self, consumers: int = 1) -> None:
+        """Sinaliza fim de fluxo: cada consumidor recebe None em ``get``."""
+        for _ in range(consumers):
+            self._queue.put((_EOS_SLOT, _EOS_SLOT))
+
+    # ─── Consumidor ────────────────────────────────────────────────
+
+    def get(self, timeout: float | None = None, latest: bool = False, copy: bool = False) -> RingFrame | None:
+        """Recebe o próximo frame publicado e reserva seu slot.
+
+        Avisos de frames já sobrescritos são descartados. O slot fica reservado até ``RingFrame.release()``.
+
+        Args:
+            timeout: Espera máxima em segundos (None: indefinida).
+            latest: Se True, devolve o frame pronto mais recente da mesma fonte e libera os anteriores sem leitura,
+                para um consumidor que não acompanha uma câmera ao vivo.
+            copy: Se True, copia a imagem e libera o slot na hora.
+
+        Returns:
+            ``RingFrame``, ou None no fim do fluxo (``finish``).
+
+        Raises:
+            TimeoutError: Se nenhum frame chegou dentro de ``timeout``.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            try:
+                slot, seq = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                raise TimeoutError(f"Nenhum frame em {timeout}s") from None
+            if slot == _EOS_SLOT:
+                return None
+            frame = self._claim(slot, seq, latest)
+            if frame is not None:
+                break
+            self._stale += 1
+
+        if copy:
+            frame.image = frame.image.copy()
+            frame.release()
+        return frame
+
+    def _claim(self, slot: int, seq: int, latest: bool = False) -> RingFrame | None:
+        """Reserva o slot se ele ainda guarda o frame ``seq``; None se já foi sobrescrito.
+
+        Com ``latest``, reserva o frame pronto mais recente da mesma fonte e libera os mais antigos dela (os avisos
+        deles viram obsoletos). A escolha usa os metadados compartilhados e não o canal, cujos avisos podem ainda
+        estar em trânsito.
+        """
+        with self._lock:
+            meta = self._meta
+            if int(meta["seq"][slot]) != seq or int(meta["state"][slot]) != SLOT_READY:
+                return None
+            if latest:
+                ready = np.flatnonzero((meta["state"] == SLOT_READY) & (meta["source"] == meta["source"][slot]))
+                slot = int(ready[np.argmax(meta["seq"][ready])])
+                seq = int(meta["seq"][slot])
+                meta["state"][ready[ready != slot]] = SLOT_FREE
+            meta["state"][slot] = SLOT_READING
+            record = meta[slot].copy()
+        shape = (int(record["height"]), int(record["width"]), int(record["channels"]))
+        return RingFrame(self, slot, seq, self._slot_view(slot, shape), record)
+
+    def _release(self, slot: int, seq: int) -> None:
+        """Libera um slot reservado por ``get``."""
+        with self._lock:
+            if int(self._meta["seq"][slot]) == seq:
+                self._meta["state"][slot] = SLOT_FREE
+
+    # ─── Estado ────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        """Retorna contadores do ring.
+
+        Returns:
+            Dicionário com ``published`` (frames publicados), ``overwritten`` (sobrescritos antes de lidos),
+            ``dropped`` (descartados pelo produtor sem slot livre), ``stale`` (avisos obsoletos descartados por
+            este processo), ``slots`` por estado e ``queued`` (avisos pendentes, aproximado).
+        """
+        with self._lock:
+            counters = dict(zip(_COUNTERS, (int(v) for v in self._counters)))
+            states = np.bincount(self._meta["state"], minlength=4)
+        try:
+            queued = self._queue.qsize()
+        except NotImplementedError:
+            queued = None
+        return {
+            "published": counters["published"],
+            "overwritten": counters["overwritten"],
+            "dropped": counters["dropped"],
+            "stale": self._stale,
+            "slots": {
+                "free": int(states[SLOT_FREE]),
+                "writing": int(states[SLOT_WRITING]),
+                "ready": int(states[SLOT_READY]),
+                "reading": int(states[SLOT_READING]),
+            },
+            "queued": queued,
+        }
+
+    def close(self) -> None:
+        """Desconecta do bloco compartilhado; no processo criador, também o remove."""
+        if self._shm is None:
+            return
+        # As views precisam sair antes do close() do bloco
+        self._counters = self._meta = self._data = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self) -> FrameRing:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        """Representação string do objeto."""
+        return f"FrameRing(slots={self.slots}, frame_shape={self.frame_shape}, name={self.name!r})"
+
+
+def capture_to_ring(
+    source: str | Path | int,
+    ring: FrameRing,
+    source_id: int = 0,
+    stride: int = 1,
+    max_frames: int | None = None,
+    consumers: int = 1,
+) -> dict:
+    """Loop de produtor: decodifica uma fonte de vídeo direto nos slots do ring.
+
+    Feito para ser o ``target`` de um ``multiprocessing.Process``. Ao terminar, chama ``ring.finish(consumers)``.
+
+    Args:
+        source: Caminho do vídeo, URL ou índice de câmera.
+        ring: ``FrameRing`` criado no processo pai.
+        source_id: Identificador gravado nos metadados de cada frame.
+        stride: Publica 1 a cada ``stride`` frames (os outros só avançam o decodificador com ``grab``).
+        max_frames: Para depois de publicar esse número de frames.
+        consumers: Avisos de fim de fluxo a enviar.
+
+    Returns:
+        Frames lidos e publicados, FPS de decodificação e contadores do ring.
+    """
+    capture = cv2.VideoCapture(str(source) if isinstance(source, Path) else source)
+    if not capture.isOpened():
+        ring.finish(consumers)
+        raise ValueError(f"Não foi possível abrir: {source}")
+    index = published = 0
+    t0 = time.perf_counter()
+    try:
+        while max_frames is None or published < max_frames:
+            if index % stride:
+                if not capture.grab():
+                    break
+            else:
+                seq = ring.read_capture(capture, source=source_id, frame_index=index)
+                if seq is None:
+                    break
+                published += seq > 0
+            index += 1
+    finally:
+        capture.release()
+        ring.finish(consumers)
+    elapsed = time.perf_counter() - t0
+    return {
+        "frames": index,
+        "published": published,
+        "fps": index / elapsed if elapsed > 0 else 0.0,
+        "ring": ring.stats(),
+    }
@@ -0,0 +1,185 @@
+# YOLOPunk 🩸 AGPL-3.0 License
+
+"""Gate de movimento para pular inferência em frames quase idênticos.
+
+Câmeras fixas produzem longas sequências de frames praticamente estáticos. ``MotionGate`` calcula um score barato
+de diferença (frame em escala de cinza reduzido, diferença absoluta média por bloco de uma grade grossa contra o
+último frame inferido, ficando com o bloco que mais mudou) e só libera o modelo quando o score passa do threshold ou
+quando o resultado em cache fica velho demais. Usar o pior bloco em vez da média global evita que um objeto pequeno
+em movimento se dilua no resto da cena parada.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable
+
+from .utils import CV2_AVAILABLE, cv2, np
+
+
+class MotionGate:
+    """Decide frame a frame se a inferência deve rodar.
+
+    Args:
+        threshold: Diferença absoluta média (0-1) do bloco mais alterado a partir da qual o modelo roda de novo.
+        max_stale: Número máximo de frames seguidos reutilizando o mesmo resultado.
+        width: Largura do frame reduzido usado no score (a altura segue o aspect ratio).
+        grid: Blocos ao longo da largura do frame reduzido (as linhas seguem o aspect ratio). 1 equivale à média
+            global.
+
+    Attributes:
+        last_score: Score do último frame avaliado.
+
+    Examples:
+        >>> gate = MotionGate(threshold=0.02, max_stale=30)
+        >>> if gate.should_run(frame):
+        ...     detections = detector.detect(frame)
+        >>> gate.stats()["skip_ratio"]
+    """
+
+    def __init__(self, threshold: float = 0.02, max_stale: int = 30, width: int = 64, grid: int = 16):
+        """Inicializa o gate sem frame de referência."""
+        if not CV2_AVAILABLE:
+            raise ImportError("OpenCV não está instalado. Install com: pip install opencv-python")
+        if max_stale < 1:
+            raise ValueError(f"max_stale deve ser >= 1, recebido: {max_stale}")
+        if not 1 <= grid <= width:
+            raise ValueError(f"grid deve estar em [1, width], recebido: {grid}")
+
+        self.threshold = threshold
+        self.max_stale = max_stale
+        self.width = width
+        self.grid = grid
+        self.last_score = 0.0
+        self._reference: np.ndarray | None = None
+        self._stale = 0
+        self._frames = 0
+        self._runs = 0
+
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        """Reduz o frame para escala de cinza em baixa resolução."""
+        h, w = frame.shape[:2]
+        size = (self.width, max(1, round(h * self.width / w)))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def score(self, frame: np.ndarray) -> float:
+        """Calcula a diferença entre o frame e o último frame inferido.
+
+        Args:
+            frame: Frame HWC (BGR) ou escala de cinza.
+
+        Returns:
+            Maior diferença absoluta média entre os blocos da grade, normalizada para 0-1 (1.0 se não houver
+            referência).
+        """
+        if self._reference is None:
+            return 1.0
+        thumb = self._thumbnail(frame)
+        if thumb.shape != self._reference.shape:
+            return 1.0
+        diff = cv2.absdiff(thumb, self._reference)
+        # INTER_AREA reduz cada bloco à sua média
+        rows = max(1, round(diff.shape[0] * self.grid / diff.shape[1]))
+        blocks = cv2.resize(diff, (self.grid, rows), interpolation=cv2.INTER_AREA)
+        return float(blocks.max()) / 255.0
+
+    def should_run(self, frame: np.ndarray) -> bool:
+        """Decide se o modelo deve rodar neste frame e atualiza o estado do gate.
+
+        Args:
+            frame: Frame atual.
+
+        Returns:
+            True se a inferência deve rodar; False se o resultado anterior pode ser reutilizado.
+        """
+        self._frames += 1
+        self.last_score = self.score(frame)
+        run = self._reference is None or self.last_score >= self.threshold or self._stale >= self.max_stale
+        if run:
+            self._reference = self._thumbnail(frame)
+            self._stale = 0
+            self._runs += 1
+        else:
+            self._stale += 1
+        return run
+
+    def accept(self, frame: np.ndarray) -> None:
+        """Registra que o modelo rodou num frame que ``should_run`` tinha recusado.
+
+        Atualiza a referência e os contadores como se o gate tivesse liberado o frame (ex.: quando não há
+        detecção em cache para reutilizar).
+
+        Args:
+            frame: Frame recém-avaliado por ``should_run``.
+        """
+        self._reference = self._thumbnail(frame)
+        self._stale = 0
+        self._runs += 1
+
+    def reset(self) -> None:
+        """Esquece o frame de referência (o próximo frame sempre roda)."""
+        self._reference = None
+        self._stale = 0
+
+    def stats(self) -> dict:
+        """Retorna contadores do gate.
+
+        Returns:
+            Dicionário com ``frames``, ``inferences``, ``skipped`` e ``skip_ratio``.
+        """
+        skipped = self._frames - self._runs
+        return {
+            "frames": self._frames,
+            "inferences": self._runs,
+            "skipped": skipped,
+            "skip_ratio": skipped / self._frames if self._frames else 0.0,
+        }
+
+    def __repr__(self) -> str:
+        """Representação string do objeto."""
+        return (
+            f"MotionGate(threshold={self.threshold}, max_stale={self.max_stale}, width={self.width}, grid={self.grid})"
+        )
+
+
+class GatedInfer:
+    """Envolve uma função de inferência em lote com um ``MotionGate``.
+
+    Só os frames liberados pelo gate vão para ``infer``; os demais recebem a detecção do frame liberado mais
+    recente (inclusive de lotes anteriores).
+
+    Args:
+        infer: Função que recebe uma lista de frames e retorna uma lista de detecções na mesma ordem.
+        gate: Gate de movimento.
+
+    Examples:
+        >>> gated = GatedInfer(infer_fn, MotionGate(threshold=0.03))
+        >>> detections = gated(frames)
+    """
+
+    def __init__(self, infer: Callable[[list], list], gate: MotionGate):
+        """Inicializa sem detecção em cache."""
+        self.infer = infer
+        self.gate = gate
+        self._last: Any = None
+
+    def __call__(self, frames: list) -> list:
+        """Processa um lote de frames, rodando o modelo só onde o gate mandar."""
+        plan: list[int] = []
+        to_run: list = []
+        for frame in frames:
+            if self.gate.should_run(frame):
+                to_run.append(frame)
+            elif self._last is None and not to_run:
+                # Sem detecção para reutilizar: roda mesmo assim e o gate passa a comparar com este frame
+                self.gate.accept(frame)
+                to_run.append(frame)
+            plan.append(len(to_run) - 1)
+
+        detections = self.infer(to_run) if to_run else []
+        output = [detections[i] if i >= 0 else self._last for i in plan]
+        if detections:
+            self._last = detections[-1]
+        return output
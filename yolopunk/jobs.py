@@ -0,0 +1,314 @@
+# YOLOPunk 🩸 AGPL-3.0 License
+
+"""Jobs de detecção em diretórios grandes: enumeração preguiçosa, shards, checkpoint e progresso.
+
+``detect("pasta/")`` lista o diretório inteiro antes de começar, não divide o trabalho entre máquinas e, se cair
+em 90%, recomeça do zero. ``Vision.detect_directory`` usa as peças deste módulo:
+
+- ``iter_images``: percorre a árvore com ``os.scandir`` sob demanda (ordem determinística: nomes ordenados dentro
+  de cada diretório), já filtrando o shard;
+- ``shard_of``: atribui cada arquivo a um de N shards pelo hash do caminho relativo, de forma estável entre
+  máquinas e execuções (``shard="2/8"`` processa só o terceiro oitavo);
+- ``JobCheckpoint``: manifesto JSON lines com o cursor (último caminho concluído) de cada chunk, lido na retomada;
+- ``JobProgress``: contadores, taxa e ETA.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Iterator
+
+from .onnx_backend import IMAGE_SUFFIXES
+
+# Imagens por chunk (unidade de inferência e de checkpoint)
+DEFAULT_CHUNK_SIZE = 256
+
+# Campos do cabeçalho do checkpoint que precisam bater na retomada
+_JOB_KEYS = ("root", "shard", "recursive")
+
+
+def parse_shard(shard: str | tuple[int, int] | None) -> tuple[int, int]:
+    """Normaliza a especificação de shard.
+
+    Args:
+        shard: ``"i/N"``, ``(i, N)`` ou None (um único shard com tudo).
+
+    Returns:
+        Tupla ``(i, N)`` com ``0 <= i < N``.
+
+    Examples:
+        >>> parse_shard("2/8")
+        (2, 8)
+    """
+    if shard is None:
+        return 0, 1
+    try:
+        index, count = (int(v) for v in (shard.split("/") if isinstance(shard, str) else shard))
+    except (TypeError, ValueError):
+        raise ValueError(f"Shard inválido: {shard!r}. Use 'i/N' ou (i, N)") from None
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard inválido: {shard!r}. Exige 0 <= i < N")
+    return index, count
+
+
+def shard_of(relpath: str, count: int) -> int:
+    """Shard de um arquivo, pelo hash (blake2b) do caminho relativo à raiz com separador '/'.
+
+    O hash não depende da ordem de enumeração nem de onde a raiz está montada, então máquinas diferentes
+    concordam sobre a divisão sem coordenação.
+    """
+    digest = hashlib.blake2b(relpath.encode("utf-8", "surrogateescape"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") % count
+
+
+def iter_images(
+    root: str | Path,
+    recursive: bool = True,
+    shard: str | tuple[int, int] | None = None,
+    with_relpath: bool = False,
+) -> Iterator[str] | Iterator[tuple[str, str]]:
+    """Enumera as imagens de um diretório sob demanda, com ``os.scandir``.
+
+    Só as entradas de um diretório por vez ficam em memória, ordenadas por nome: a sequência segue a ordem de
+    ``walk_key`` dos caminhos relativos em toda execução, o que permite retomar a partir de um cursor. Links
+    simbólicos para diretórios não são seguidos.
+
+    Args:
+        root: Diretório raiz.
+        recursive: Se True, desce nos subdiretórios.
+        shard: Shard a enumerar (ver ``parse_shard``). None: todos os arquivos.
+        with_relpath: Se True, gera tuplas ``(caminho, caminho relativo à raiz com '/')``.
+
+    Yields:
+        Caminhos das imagens (``root`` + caminho relativo).
+
+    Examples:
+        >>> for path in iter_images("/data/images", shard="0/4"):
+        ...     print(path)
+    """
+    index, count = parse_shard(shard)
+    root = os.fspath(root)
+    if not os.path.isdir(root):
+        raise NotADirectoryError(f"Diretório não encontrado: {root}")
+
+    def walk(directory: str, prefix: str) -> Iterator[str]:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+        for entry in entries:
+            relpath = prefix + entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if recursive:
+                    yield from walk(entry.path, relpath + "/")
+            elif os.path.splitext(entry.name)[1].lower() in IMAGE_SUFFIXES and entry.is_file():
+                if count == 1 or shard_of(relpath, count) == index:
+                    yield (entry.path, relpath) if with_relpath else entry.path
+
+    yield from walk(root, "")
+
+
+def walk_key(relpath: str) -> tuple[str, ...]:
+    """Chave de ordenação de um caminho relativo na ordem de ``iter_images`` (componente a componente).
+
+    A comparação direta das strings não serve: ``"a.jpg" < "a/x.jpg"``, mas o diretório ``a`` vem antes.
+    """
+    return tuple(relpath.split("/"))
+
+
+class JobCheckpoint:
+    """Manifesto de progresso de um job, em JSON lines.
+
+    A primeira linha descreve o job (raiz, shard, recursão); as seguintes registram um chunk concluído cada,
+    gravadas com ``fsync``: o cursor (caminho relativo da última imagem do chunk), o número de imagens e, em
+    ``failed``, os caminhos relativos das imagens ilegíveis. Como ``iter_images`` enumera em ordem determinística,
+    tudo até o cursor está concluído; inserir ou remover arquivos não desloca o que já foi feito (arquivos novos
+    antes do cursor só entram num job novo). Uma última linha truncada por queda do processo é ignorada na leitura.
+    Um checkpoint só é aceito por um job com a mesma descrição, para não pular imagens de outro diretório ou shard.
+
+    Args:
+        path: Arquivo do manifesto (criado se não existir).
+        job: Descrição do job (``root``, ``shard``, ``recursive``).
+
+    Attributes:
+        cursor: Caminho relativo da última imagem concluída (None se nenhuma).
+        failed: Caminhos relativos das imagens ilegíveis já registradas.
+        images: Imagens concluídas.
+
+    Examples:
+        >>> checkpoint = JobCheckpoint("job.ckpt", {"root": "/data", "shard": "0/1", "recursive": True})
+        >>> checkpoint.is_done("sub/img0042.jpg")
+    """
+
+    def __init__(self, path: str | Path, job: dict):
+        """Lê o manifesto existente ou cria um novo."""
+        self.path = Path(path)
+        self.job = {key: job[key] for key in _JOB_KEYS}
+        self.cursor: str | None = None
+        self.failed: list[str] = []
+        self.images = 0
+        self.chunks = 0
+
+        if self.path.exists() and self.path.stat().st_size:
+            with open(self.path, encoding="utf-8") as f:
+                text = f.read()
+            lines = text.splitlines()
+            try:
+                header = json.loads(lines[0])
+            except ValueError:
+                raise ValueError(f"Checkpoint corrompido: {self.path}") from None
+            stored = {key: header.get(key) for key in _JOB_KEYS}
+            if stored != self.job:
+                raise ValueError(f"Checkpoint {self.path} pertence a outro job: {stored} (atual: {self.job})")
+            for line in lines[1:]:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self._record(entry["cursor"], entry["images"], entry.get("failed", []))
+            self._file = open(self.path, "a", encoding="utf-8")
+            if not text.endswith("\n"):
+                # Completa a linha truncada para a próxima entrada começar numa linha nova
+                self._file.write("\n")
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._append([{**self.job, "created": time.time()}])
+
+    def is_done(self, relpath: str) -> bool:
+        """Indica se a imagem (caminho relativo) está até o cursor, ou seja, já foi concluída."""
+        return self.cursor is not None and walk_key(relpath) <= walk_key(self.cursor)
+
+    def mark(self, chunks: list[tuple[str, int, list[str]]]) -> None:
+        """Registra chunks ``(cursor, imagens, falhas)`` como concluídos (uma escrita + ``fsync`` para todos).
+
+        ``cursor`` é o caminho relativo da última imagem do chunk. ``falhas`` são os caminhos relativos das imagens
+        que não puderam ser lidas; ficam no manifesto para o relatório da retomada, sem serem tentadas de novo.
+        """
+        if not chunks:
+            return
+        now = time.time()
+        entries = []
+        for cursor, images, failed in chunks:
+            entry = {"cursor": cursor, "images": images, "t": now}
+            if failed:
+                entry["failed"] = list(failed)
+            entries.append(entry)
+        self._append(entries)
+        for cursor, images, failed in chunks:
+            self._record(cursor, images, failed)
+
+    def _record(self, cursor: str, images: int, failed: list[str]) -> None:
+        """Registra um chunk concluído na memória."""
+        if self.cursor is None or walk_key(cursor) > walk_key(self.cursor):
+            self.cursor = cursor
+        self.images += images
+        self.failed.extend(failed)
+        self.chunks += 1
+
+    def _append(self, entries: list[dict]) -> None:
+        """Acrescenta linhas ao manifesto e força a ida ao disco."""
+        self._file.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        """Fecha o arquivo do manifesto."""
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self.chunks
+
+    def __repr__(self) -> str:
+        """Representação string do objeto."""
+        return f"JobCheckpoint(path={str(self.path)!r}, cursor={self.cursor!r}, images={self.images})"
+
+
+class JobProgress:
+    """Progresso de um job: imagens processadas, puladas (checkpoint), ilegíveis, taxa e ETA.
+
+    O total é opcional: ``detect_directory`` conta os arquivos do shard numa thread em paralelo e preenche
+    ``total`` quando a contagem termina; até lá o ETA fica indefinido.
+    """
+
+    def __init__(self, total: int | None = None):
+        """Inicializa os contadores."""
+        self.total = total
+        self.processed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.chunks = 0
+        self.t0 = time.perf_counter()
+
+    def update(self, processed: int = 0, skipped: int = 0, failed: int = 0) -> None:
+        """Soma imagens processadas nesta execução, puladas por já constarem no checkpoint e ilegíveis."""
+        self.processed += processed
+        self.skipped += skipped
+        self.failed += failed
+        if processed or failed:
+            self.chunks += 1
+
+    def stats(self) -> dict:
+        """Retorna o progresso.
+
+        Returns:
+            Dicionário com ``processed``, ``skipped``, ``failed``, ``done`` (soma dos três), ``total`` (None
+            enquanto não contado), ``percent``, ``chunks``, ``elapsed_s``, ``images_per_s`` (só desta execução) e
+            ``eta_s``.
+        """
+        elapsed = time.perf_counter() - self.t0
+        rate = self.processed / elapsed if elapsed > 0 else 0.0
+        done = self.processed + self.skipped + self.failed
+        percent = eta = None
+        if self.total is not None:
+            remaining = max(self.total - done, 0)
+            percent = 100.0 * done / self.total if self.total else 100.0
+            eta = remaining / rate if rate > 0 else (0.0 if not remaining else None)
+        return {
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "done": done,
+            "total": self.total,
+            "percent": percent,
+            "chunks": self.chunks,
+            "elapsed_s": elapsed,
+            "images_per_s": rate,
+            "eta_s": eta,
+        }
+
+    def format(self) -> str:
+        """Linha de progresso legível (``12.345/1.000.000 (1.2%) · 85.3 img/s · ETA 3h12m``)."""
+        s = self.stats()
+        total = f"/{s['total']}" if s["total"] is not None else ""
+        percent = f" ({s['percent']:.1f}%)" if s["percent"] is not None else ""
+        eta = _format_duration(s["eta_s"]) if s["eta_s"] is not None else "?"
+        return f"{s['done']}{total} imagens{percent} · {s['images_per_s']:.1f} img/s · ETA {eta}"
+
+    def __repr__(self) -> str:
+        """Representação string do objeto."""
+        return f"JobProgress({self.format()})"
+
+
+def _format_duration(seconds: float) -> str:
+    """Formata uma duração como ``3h12m``, ``4m05s`` ou ``12s``."""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{secs:02d}s"
+    return f"{secs}s"
+
+
+def job_description(root: str | Path, shard: tuple[int, int], recursive: bool) -> dict:
+    """Descrição de um job usada no cabeçalho do checkpoint."""
+    return {
+        "root": os.path.abspath(os.fspath(root)),
+        "shard": f"{shard[0]}/{shard[1]}",
+        "recursive": recursive,
+    }
+
@@ -0,0 +1,319 @@
+# YOLOPunk 🩸 AGPL-3.0 License
+
+"""Instrumentação por estágio de ``Vision.detect``.
+
+``VisionMetrics`` acumula, com timers monotônicos, o tempo de cada estágio do caminho quente (carga preguiçosa do
+modelo, decode, pré-processamento, forward, pós-processamento/NMS, conversão de resultados), contadores de chamadas e
+imagens e a distribuição de imagens por chamada (histograma de buckets fixos). Os snapshots saem em JSON ou no
+formato texto do Prometheus, sem dependências.
+
+Com ``Vision(metrics=None)`` (padrão) nada disso roda: o caminho quente só testa um atributo.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import threading
+import time
+from typing import Any, Callable
+
+# Estágios reportados, na ordem do caminho quente
+STAGES = ("load", "decode", "preprocess", "inference", "postprocess", "convert", "overhead")
+
+# Limites (ms) dos buckets dos histogramas de latência
+DEFAULT_BUCKETS_MS = (0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0, 5000.0)
+
+# Limites dos buckets do histograma de imagens por chamada (cardinalidade fixa no Prometheus)
+DEFAULT_BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class _Histogram:
+    """Histograma cumulativo com soma, contagem, mínimo e máximo."""
+
+    __slots__ = ("buckets", "count", "counts", "max", "min", "sum")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Registra uma amostra."""
+        # Primeiro bucket com limite >= value (o último, +Inf, se nenhum)
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def as_dict(self) -> dict:
+        """Resumo em ms."""
+        return {
+            "count": self.count,
+            "total_ms": self.sum,
+            "mean_ms": self.sum / self.count if self.count else 0.0,
+            "min_ms": self.min if self.count else 0.0,
+            "max_ms": self.max,
+        }
+
+
+class CallRecord:
+    """Tempos de uma chamada em andamento.
+
+    Attributes:
+        method: Método instrumentado (ex.: 'detect').
+        stages: Tempo acumulado (ms) por estágio nesta chamada.
+        images: Imagens processadas.
+    """
+
+    __slots__ = ("images", "method", "stages", "started")
+
+    def __init__(self, method: str):
+        self.method = method
+        self.stages: dict[str, float] = {}
+        self.images = 0
+        self.started = time.perf_counter()
+
+    def add(self, stage: str, ms: float) -> None:
+        """Soma ``ms`` ao estágio."""
+        self.stages[stage] = self.stages.get(stage, 0.0) + ms
+
+    def add_speed(self, speed: dict | None) -> None:
+        """Soma o dicionário ``speed`` (ms por estágio) de um resultado e conta uma imagem."""
+        self.images += 1
+        for stage, ms in (speed or {}).items():
+            if ms is not None:
+                self.add(stage, ms)
+
+
+class VisionMetrics:
+    """Métricas por estágio, thread-safe, com hooks e exportação.
+
+    Args:
+        buckets_ms: Limites (ms) dos buckets dos histogramas.
+        batch_buckets: Limites dos buckets do histograma de imagens por chamada.
+
+    Examples:
+        >>> metrics = VisionMetrics()
+        >>> detector = Vision("yolov8n.pt", metrics=metrics)
+        >>> detector.detect("image.jpg")
+        >>> metrics.snapshot()["stages"]["inference"]["mean_ms"]
+        >>> print(metrics.to_prometheus())
+
+        >>> # Callback por chamada
+        >>> metrics.add_hook(lambda event: print(event["wall_ms"], event["stages"]))
+    """
+
+    def __init__(
+        self,
+        buckets_ms: tuple[float, ...] = DEFAULT_BUCKETS_MS,
+        batch_buckets: tuple[int, ...] = DEFAULT_BATCH_BUCKETS,
+    ):
+        """Inicializa contadores zerados e sem hooks."""
+        self.buckets_ms = tuple(buckets_ms)
+        self.batch_buckets = tuple(batch_buckets)
+        self._lock = threading.Lock()
+        self._hooks: list[Callable[[dict], None]] = []
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self) -> None:
+        """Zera todos os contadores (hooks são mantidos)."""
+        with self._lock:
+            self._calls: dict[str, int] = {}
+            self._images: dict[str, int] = {}
+            self._errors: dict[str, int] = {}
+            self._wall: dict[str, _Histogram] = {}
+            self._stages = {stage: _Histogram(self.buckets_ms) for stage in STAGES}
+            self._batch_sizes: dict[int, int] = {}
+            self._batch_hist = _Histogram(self.batch_buckets)
+            self._started = time.time()
+
+    # ─── Hooks ─────────────────────────────────────────────────────
+
+    def add_hook(self, hook: Callable[[dict], None]) -> Callable[[dict], None]:
+        """Registra um callback chamado ao fim de cada chamada instrumentada.
+
+        O callback recebe um dicionário com ``method``, ``wall_ms``, ``images``, ``stages`` (ms por estágio) e
+        ``error`` (None ou a exceção). Roda na thread da chamada, então deve ser rápido.
+
+        Args:
+            hook: Função ``hook(event)``.
+
+        Returns:
+            O próprio ``hook`` (permite uso como decorator).
+        """
+        with self._lock:
+            self._hooks.append(hook)
+        return hook
+
+    def remove_hook(self, hook: Callable[[dict], None]) -> None:
+        """Remove um callback registrado com ``add_hook``."""
+        with self._lock:
+            self._hooks.remove(hook)
+
+    # ─── Registro ──────────────────────────────────────────────────
+
+    @property
+    def active(self) -> CallRecord | None:
+        """Chamada instrumentada em andamento nesta thread, se houver."""
+        return getattr(self._local, "record", None)
+
+    def begin(self, method: str) -> CallRecord | None:
+        """Abre o registro de uma chamada.
+
+        Chamadas aninhadas na mesma thread (ex.: ``detect`` chamando ``detect``) somam no registro externo.
+
+        Returns:
+            Novo registro, ou None se já houver uma chamada aberta nesta thread.
+        """
+        if self.active is not None:
+            return None
+        record = CallRecord(method)
+        self._local.record = record
+        return record
+
+    def detach(self, record: CallRecord | None) -> None:
+        """Desassocia ``record`` da thread atual (ex.: quando a chamada devolve um gerador consumido depois)."""
+        if record is not None and getattr(self._local, "record", None) is record:
+            self._local.record = None
+
+    def end(self, record: CallRecord | None, error: BaseException | None = None) -> None:
+        """Fecha o registro aberto por ``begin`` e notifica os hooks."""
+        if record is None:
+            return
+        self.detach(record)
+        wall_ms = 1000.0 * (time.perf_counter() - record.started)
+        # O que os estágios medidos não explicam (decode e setup do predictor no Ultralytics, filas do micro-batch...)
+        record.stages["overhead"] = max(0.0, wall_ms - sum(record.stages.values()))
+
+        with self._lock:
+            method = record.method
+            self._calls[method] = self._calls.get(method, 0) + 1
+            self._images[method] = self._images.get(method, 0) + record.images
+            if error is not None:
+                self._errors[method] = self._errors.get(method, 0) + 1
+            self._wall.setdefault(method, _Histogram(self.buckets_ms)).observe(wall_ms)
+            for stage, ms in record.stages.items():
+                if stage in self._stages:
+                    self._stages[stage].observe(ms)
+            self._batch_sizes[record.images] = self._batch_sizes.get(record.images, 0) + 1
+            self._batch_hist.observe(record.images)
+            hooks = list(self._hooks)
+
+        if hooks:
+            event = {
+                "method": record.method,
+                "wall_ms": wall_ms,
+                "images": record.images,
+                "stages": dict(record.stages),
+                "error": error,
+            }
+            for hook in hooks:
+                hook(event)
+
+    # ─── Exportação ────────────────────────────────────────────────
+
+    def snapshot(self) -> dict:
+        """Retorna uma cópia consistente das métricas.
+
+        Returns:
+            Dicionário com ``uptime_s``, ``calls``, ``images``, ``errors``, ``wall`` (por método), ``stages`` (por
+            estágio, em ms) e ``batch_sizes`` (imagens por chamada -> número de chamadas).
+        """
+        with self._lock:
+            return {
+                "uptime_s": time.time() - self._started,
+                "calls": dict(self._calls),
+                "images": dict(self._images),
+                "errors": dict(self._errors),
+                "wall": {method: hist.as_dict() for method, hist in self._wall.items()},
+                "stages": {stage: hist.as_dict() for stage, hist in self._stages.items()},
+                "batch_sizes": dict(sorted(self._batch_sizes.items())),
+            }
+
+    def to_json(self, indent: int | None = None) -> str:
+        """Snapshot serializado em JSON."""
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix: str = "yolopunk", labels: dict[str, str] | None = None) -> str:
+        """Snapshot no formato texto de exposição do Prometheus (versão 0.0.4).
+
+        Latências são exportadas em segundos, como manda a convenção do Prometheus.
+
+        Args:
+            prefix: Prefixo dos nomes das métricas.
+            labels: Labels fixos adicionados a todas as séries (ex.: ``{"model": "yolov8n"}``).
+
+        Returns:
+            Texto pronto para servir em ``/metrics``.
+        """
+        base = dict(labels or {})
+
+        def fmt(extra: dict[str, Any]) -> str:
+            merged = {**base, **extra}
+            if not merged:
+                return ""
+            body = ",".join(f'{k}="{_escape(str(v))}"' for k, v in merged.items())
+            return "{" + body + "}"
+
+        lines: list[str] = []
+        with self._lock:
+            lines += [f"# HELP {prefix}_calls_total Chamadas instrumentadas.", f"# TYPE {prefix}_calls_total counter"]
+            lines += [f"{prefix}_calls_total{fmt({'method': m})} {n}" for m, n in self._calls.items()]
+            lines += [f"# HELP {prefix}_images_total Imagens processadas.", f"# TYPE {prefix}_images_total counter"]
+            lines += [f"{prefix}_images_total{fmt({'method': m})} {n}" for m, n in self._images.items()]
+            lines += [f"# HELP {prefix}_errors_total Chamadas que falharam.", f"# TYPE {prefix}_errors_total counter"]
+            lines += [f"{prefix}_errors_total{fmt({'method': m})} {n}" for m, n in self._errors.items()]
+
+            lines += [
+                f"# HELP {prefix}_call_seconds Duração de cada chamada.",
+                f"# TYPE {prefix}_call_seconds histogram",
+            ]
+            for method, hist in self._wall.items():
+                lines += _histogram_lines(f"{prefix}_call_seconds", hist, {"method": method}, fmt)
+
+            lines += [
+                f"# HELP {prefix}_stage_seconds Tempo por estágio em cada chamada.",
+                f"# TYPE {prefix}_stage_seconds histogram",
+            ]
+            for stage, hist in self._stages.items():
+                lines += _histogram_lines(f"{prefix}_stage_seconds", hist, {"stage": stage}, fmt)
+
+            lines += [
+                f"# HELP {prefix}_call_images Imagens por chamada.",
+                f"# TYPE {prefix}_call_images histogram",
+            ]
+            lines += _histogram_lines(f"{prefix}_call_images", self._batch_hist, {}, fmt, scale=1.0)
+        return "\n".join(lines) + "\n"
+
+    def __repr__(self) -> str:
+        """Representação string do objeto."""
+        return f"VisionMetrics(calls={sum(self._calls.values())}, hooks={len(self._hooks)})"
+
+
+def _escape(value: str) -> str:
+    """Escapa um valor de label do Prometheus."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram_lines(
+    name: str, hist: _Histogram, labels: dict, fmt: Callable[[dict], str], scale: float = 1000.0
+) -> list[str]:
+    """Séries ``_bucket``/``_sum``/``_count`` de um histograma, com limites e soma divididos por ``scale``.
+
+    O padrão converte ms em segundos; use ``scale=1.0`` para histogramas sem unidade de tempo.
+    """
+    lines = []
+    cumulative = 0
+    for bound, count in zip((*hist.buckets, float("inf")), hist.counts):
+        cumulative += count
+        le = "+Inf" if bound == float("inf") else f"{bound / scale:g}"
+        lines.append(f"{name}_bucket{fmt({**labels, 'le': le})} {cumulative}")
+    lines.append(f"{name}_sum{fmt(labels)} {hist.sum / scale}")
+    lines.append(f"{name}_count{fmt(labels)} {hist.count}")
+    return lines
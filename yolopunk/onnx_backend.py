@@ -0,0 +1,393 @@
+# YOLOPunk 🩸 AGPL-3.0 License
+
+"""Backend ONNX Runtime para inferência em CPU.
+
+Executa modelos YOLO exportados com ``Vision.export(format="onnx")`` sem ultralytics/torch. O pré-processamento
+(letterbox) e o pós-processamento (decode + NMS) são feitos com NumPy vetorizado, seguindo as mesmas convenções do
+Ultralytics: arrays de entrada em BGR, padding 114 centralizado, NMS por classe.
+"""
+
+from __future__ import annotations
+
+import ast
+import time
+from pathlib import Path
+from typing import Any
+
+from .boxes import nms
+
+try:
+    import cv2
+    import numpy as np
+
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+    cv2 = None
+    np = None
+
+try:
+    import onnxruntime as ort
+
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+    ort = None
+
+IMAGE_SUFFIXES = {".bmp", ".jpeg", ".jpg", ".png", ".tif", ".tiff", ".webp"}
+
+
+class OnnxBoxes:
+    """Detecções de uma imagem, com os mesmos campos de ``ultralytics.engine.results.Boxes``.
+
+    Os campos são arrays NumPy (não tensores), então não é preciso chamar ``.cpu().numpy()``.
+
+    Attributes:
+        data: Array (N, 6) com ``x1, y1, x2, y2, conf, cls``.
+        orig_shape: Forma (altura, largura) da imagem original.
+    """
+
+    __slots__ = ("data", "orig_shape")
+
+    def __init__(self, data: np.ndarray, orig_shape: tuple[int, int]):
+        self.data = data
+        self.orig_shape = orig_shape
+
+    @property
+    def xyxy(self) -> np.ndarray:
+        """Boxes em ``x1, y1, x2, y2`` (pixels)."""
+        return self.data[:, :4]
+
+    @property
+    def conf(self) -> np.ndarray:
+        """Confiança de cada box."""
+        return self.data[:, 4]
+
+    @property
+    def cls(self) -> np.ndarray:
+        """ID de classe de cada box."""
+        return self.data[:, 5]
+
+    @property
+    def id(self) -> None:
+        """IDs de tracking (não suportado neste backend)."""
+        return None
+
+    @property
+    def xywh(self) -> np.ndarray:
+        """Boxes em ``cx, cy, w, h`` (pixels)."""
+        xyxy = self.xyxy
+        return np.concatenate([(xyxy[:, :2] + xyxy[:, 2:]) / 2, xyxy[:, 2:] - xyxy[:, :2]], axis=1)
+
+    @property
+    def xyxyn(self) -> np.ndarray:
+        """Boxes em ``x1, y1, x2, y2`` normalizadas pelo tamanho da imagem."""
+        h, w = self.orig_shape
+        return self.xyxy / np.array([w, h, w, h], dtype=self.data.dtype)
+
+    @property
+    def xywhn(self) -> np.ndarray:
+        """Boxes em ``cx, cy, w, h`` normalizadas pelo tamanho da imagem."""
+        h, w = self.orig_shape
+        return self.xywh / np.array([w, h, w, h], dtype=self.data.dtype)
+
+    def cpu(self) -> OnnxBoxes:
+        """Compatibilidade com ``Boxes.cpu()``."""
+        return self
+
+    def numpy(self) -> OnnxBoxes:
+        """Compatibilidade com ``Boxes.numpy()``."""
+        return self
+
+    def __len__(self) -> int:
+        """Número de detecções."""
+        return len(self.data)
+
+
+class OnnxResult:
+    """Resultado de uma imagem, com os campos principais de ``ultralytics.engine.results.Results``.
+
+    Não mantém a imagem original em memória.
+
+    Attributes:
+        boxes: Detecções da imagem.
+        names: Mapeamento ID de classe -> nome.
+        orig_shape: Forma (altura, largura) da imagem original.
+        path: Caminho da imagem (ou rótulo sintético para arrays).
+        speed: Tempos (ms) por imagem de decode, preprocess, inference e postprocess.
+    """
+
+    __slots__ = ("boxes", "names", "orig_shape", "path", "speed")
+
+    def __init__(self, boxes: OnnxBoxes, names: dict[int, str], orig_shape: tuple[int, int], path: str, speed: dict):
+        self.boxes = boxes
+        self.names = names
+        self.orig_shape = orig_shape
+        self.path = path
+        self.speed = speed
+
+    def __len__(self) -> int:
+        """Número de detecções."""
+        return len(self.boxes)
+
+    def __repr__(self) -> str:
+        """Representação string do objeto."""
+        return f"OnnxResult(path={self.path!r}, detections={len(self)}, orig_shape={self.orig_shape})"
+
+
+def letterbox(
+    img: np.ndarray,
+    new_shape: tuple[int, int],
+    pad_value: int = 114,
+) -> tuple[np.ndarray, tuple[float, float], tuple[int, int]]:
+    """Redimensiona mantendo aspect ratio e centraliza com padding (igual ao ``LetterBox`` do Ultralytics).
+
+    Args:
+        img: Imagem HWC.
+        new_shape: Forma de saída (altura, largura).
+        pad_value: Valor de preenchimento.
+
+    Returns:
+        Tupla (imagem, (escala_x, escala_y), (pad_left, pad_top)). As escalas por eixo refletem o arredondamento de
+        cada lado, como em ``ultralytics.utils.ops.scale_boxes``.
+    """
+    h, w = img.shape[:2]
+    r = min(new_shape[0] / h, new_shape[1] / w)
+    new_w, new_h = round(w * r), round(h * r)
+    dw, dh = (new_shape[1] - new_w) / 2, (new_shape[0] - new_h) / 2
+
+    if (w, h) != (new_w, new_h):
+        img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = round(dh - 0.1), round(dh + 0.1)
+    left, right = round(dw - 0.1), round(dw + 0.1)
+    img = cv2.copyMakeBorder(img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(pad_value,) * 3)
+    return img, (new_w / w, new_h / h), (left, top)
+
+
+def decode_predictions(
+    prediction: np.ndarray,
+    conf: float = 0.25,
+    iou: float = 0.7,
+    max_det: int = 300,
+    classes: list[int] | None = None,
+) -> np.ndarray:
+    """Decodifica a saída bruta de um head YOLOv8/v11 de detecção e aplica NMS por classe.
+
+    Args:
+        prediction: Saída (4 + nc, N) de uma imagem, com boxes em ``cx, cy, w, h``.
+        conf: Threshold de confiança.
+        iou: Threshold de IoU para NMS.
+        max_det: Número máximo de detecções.
+        classes: IDs de classes a manter. None para todas.
+
+    Returns:
+        Array (M, 6) com ``x1, y1, x2, y2, conf, cls`` nas coordenadas da entrada do modelo.
+    """
+    pred = prediction.T  # (N, 4 + nc)
+    class_scores = pred[:, 4:]
+    cls = class_scores.argmax(axis=1)
+    scores = class_scores[np.arange(len(cls)), cls]
+
+    mask = scores > conf
+    if classes is not None:
+        mask &= np.isin(cls, classes)
+    pred, scores, cls = pred[mask], scores[mask], cls[mask]
+    if not len(pred):
+        return np.zeros((0, 6), dtype=np.float32)
+
+    xy, wh = pred[:, :2], pred[:, 2:4]
+    boxes = np.concatenate([xy - wh / 2, xy + wh / 2], axis=1)
+
+    keep = nms(boxes, scores, iou, class_ids=cls, max_det=max_det)
+    return np.concatenate([boxes[keep], scores[keep, None], cls[keep, None].astype(boxes.dtype)], axis=1).astype(
+        np.float32
+    )
+
+
+class OnnxDetector:
+    """Detector YOLO sobre ONNX Runtime.
+
+    Expõe ``predict`` com a mesma assinatura usada por ``Vision`` para o modelo Ultralytics, permitindo que
+    micro-batching e warmup funcionem sem alterações.
+
+    Args:
+        path: Caminho para o arquivo ``.onnx`` exportado pelo Ultralytics.
+        device: 'cpu' ou 'cuda' (requer onnxruntime-gpu).
+        intra_op_threads: Threads intra-op do ONNX Runtime. None usa o padrão da biblioteca.
+
+    Attributes:
+        names: Mapeamento ID de classe -> nome (lido dos metadados do modelo).
+        imgsz: Forma de entrada (altura, largura).
+        dynamic_batch: True se o modelo aceita batch variável.
+
+    Examples:
+        >>> detector = OnnxDetector("yolov8n.onnx")
+        >>> results = detector.predict("image.jpg", conf=0.5)
+        >>> results[0].boxes.xyxy
+    """
+
+    def __init__(self, path: str | Path, device: str = "cpu", intra_op_threads: int | None = None):
+        """Cria a sessão ONNX Runtime e lê os metadados do modelo."""
+        if not ONNXRUNTIME_AVAILABLE:
+            raise ImportError("ONNX Runtime não está instalado. Install com: pip install onnxruntime")
+        if not CV2_AVAILABLE:
+            raise ImportError("OpenCV não está instalado. Install com: pip install opencv-python")
+
+        self.path = str(path)
+        options = ort.SessionOptions()
+        if intra_op_threads is not None:
+            options.intra_op_num_threads = intra_op_threads
+        providers = ["CPUExecutionProvider"]
+        if device.startswith("cuda"):
+            providers.insert(0, "CUDAExecutionProvider")
+        self.session = ort.InferenceSession(self.path, sess_options=options, providers=providers)
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_dtype = np.float16 if "float16" in model_input.type else np.float32
+        batch, _, height, width = model_input.shape
+        self.dynamic_batch = not isinstance(batch, int)
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names: dict[int, str] = ast.literal_eval(metadata["names"]) if "names" in metadata else {}
+        self.task = metadata.get("task", "detect")
+        if self.task != "detect":
+            raise ValueError(f"Backend onnxruntime suporta apenas task='detect', modelo é {self.task!r}")
+        if isinstance(height, int) and isinstance(width, int):
+            self.imgsz = (height, width)
+        elif "imgsz" in metadata:
+            self.imgsz = tuple(ast.literal_eval(metadata["imgsz"]))
+        else:
+            self.imgsz = (640, 640)
+
+    @staticmethod
+    def _iter_sources(source: Any) -> list:
+        """Expande a fonte em uma lista de imagens (caminhos ou arrays)."""
+        if isinstance(source, (list, tuple)):
+            items: list = []
+            for item in source:
+                items.extend(OnnxDetector._iter_sources(item))
+            return items
+        if isinstance(source, (str, Path)):
+            path = Path(source)
+            if path.is_dir():
+                return sorted(p for p in path.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+            if not path.is_file():
+                raise FileNotFoundError(f"Imagem não encontrada: {path}")
+            return [path]
+        if hasattr(source, "shape"):
+            return [source]
+        raise TypeError(f"Fonte não suportada pelo backend onnxruntime: {type(source).__name__}")
+
+    def preprocess(self, images: list[np.ndarray]) -> tuple[np.ndarray, list[tuple[float, tuple[int, int]]]]:
+        """Aplica letterbox e monta o tensor NCHW normalizado.
+
+        Args:
+            images: Imagens BGR HWC uint8.
+
+        Returns:
+            Tupla (tensor de entrada, lista de (escalas, padding) por imagem).
+        """
+        h, w = self.imgsz
+        batch = np.empty((len(images), 3, h, w), dtype=self.input_dtype)
+        transforms = []
+        for i, img in enumerate(images):
+            boxed, gains, pad = letterbox(img, self.imgsz)
+            # BGR HWC -> RGB CHW, escala para [0, 1]
+            np.multiply(boxed[..., ::-1].transpose(2, 0, 1), 1 / 255.0, out=batch[i], casting="unsafe")
+            transforms.append((gains, pad))
+        return batch, transforms
+
+    def predict(
+        self,
+        source: Any,
+        conf: float = 0.25,
+        iou: float = 0.7,
+        max_det: int = 300,
+        classes: list[int] | None = None,
+        save: bool = False,
+        save_txt: bool = False,
+        save_conf: bool = False,
+        stream: bool = False,
+        batch: int | None = None,
+        **kwargs: Any,
+    ) -> list[OnnxResult]:
+        """Executa detecção em imagem(ns).
+
+        Args:
+            source: Caminho de imagem, diretório, array BGR ou lista deles.
+            conf: Threshold de confiança.
+            iou: Threshold de IoU para NMS.
+            max_det: Número máximo de detecções por imagem.
+            classes: IDs de classes a manter.
+            save: Não suportado neste backend.
+            save_txt: Não suportado neste backend.
+            save_conf: Não suportado neste backend.
+            stream: Não suportado neste backend.
+            batch: Imagens por forward pass (somente modelos com batch dinâmico). Padrão: todas.
+            **kwargs: ``imgsz`` só é aceito se igual ao da exportação; os demais (``device``, ``verbose``...) são
+                ignorados, mantidos por compatibilidade.
+
+        Returns:
+            Lista de ``OnnxResult`` na ordem das imagens.
+
+        Raises:
+            FileNotFoundError: Se uma imagem não puder ser lida.
+            ValueError: Se ``imgsz`` diferir do tamanho de entrada exportado.
+        """
+        if save or save_txt or save_conf or stream:
+            raise ValueError("Backend onnxruntime não suporta save, save_txt, save_conf nem stream")
+        imgsz = kwargs.pop("imgsz", None)
+        if imgsz is not None:
+            requested = (imgsz, imgsz) if isinstance(imgsz, int) else tuple(imgsz)
+            if requested != tuple(self.imgsz):
+                raise ValueError(
+                    f"Modelo ONNX exportado com imgsz={self.imgsz}, recebido imgsz={imgsz}. "
+                    f"Exporte de novo com esse tamanho: Vision.export(format='onnx', imgsz={imgsz})"
+                )
+
+        items = self._iter_sources(source)
+        batch_size = (batch or len(items) or 1) if self.dynamic_batch else 1
+        results: list[OnnxResult] = []
+
+        for start in range(0, len(items), batch_size):
+            chunk = items[start : start + batch_size]
+            t0 = time.perf_counter()
+            images = []
+            for item in chunk:
+                if isinstance(item, Path):
+                    img = cv2.imread(str(item), cv2.IMREAD_COLOR)
+                    if img is None:
+                        raise FileNotFoundError(f"Imagem não encontrada ou ilegível: {item}")
+                    item = img
+                images.append(item)
+            t_decoded = time.perf_counter()
+            tensor, transforms = self.preprocess(images)
+            t1 = time.perf_counter()
+            outputs = self.session.run(None, {self.input_name: tensor})[0]
+            t2 = time.perf_counter()
+
+            for j, (item, img, ((gain_x, gain_y), (pad_x, pad_y))) in enumerate(zip(chunk, images, transforms)):
+                det = decode_predictions(outputs[j].astype(np.float32), conf, iou, max_det, classes)
+                # Desfaz o letterbox e limita às bordas da imagem
+                det[:, [0, 2]] = ((det[:, [0, 2]] - pad_x) / gain_x).clip(0, img.shape[1])
+                det[:, [1, 3]] = ((det[:, [1, 3]] - pad_y) / gain_y).clip(0, img.shape[0])
+                orig_shape = img.shape[:2]
+                path = str(item) if isinstance(item, Path) else f"image{start + j}.jpg"
+                results.append(OnnxResult(OnnxBoxes(det, orig_shape), self.names, orig_shape, path, {}))
+
+            t3 = time.perf_counter()
+            speed = {
+                "decode": 1000.0 * (t_decoded - t0) / len(chunk),
+                "preprocess": 1000.0 * (t1 - t_decoded) / len(chunk),
+                "inference": 1000.0 * (t2 - t1) / len(chunk),
+                "postprocess": 1000.0 * (t3 - t2) / len(chunk),
+            }
+            for result in results[-len(chunk) :]:
+                result.speed = speed
+
+        return results
+
+    def __repr__(self) -> str:
+        """Representação string do objeto."""
+        return f"OnnxDetector(path={self.path!r}, imgsz={self.imgsz}, dynamic_batch={self.dynamic_batch})"
@@ -0,0 +1,303 @@
+# YOLOPunk 🩸 AGPL-3.0 License
+
+"""Quantização INT8 para inferência em CPU.
+
+Quantiza um modelo ONNX com o quantizador do ONNX Runtime, em modo dinâmico (só pesos, sem calibração) ou estático
+(pesos e ativações, calibrado com imagens de uma pasta local). O resultado passa pelo ``ExportCache``, então cada
+combinação de pesos + modo + conjunto de calibração é quantizada uma única vez.
+
+``measure_quantization`` mede o custo da quantização: compara as detecções do modelo INT8 com as do FP32 (tratadas como
+referência) em uma lista de validação e mostra a diferença de acurácia ao lado do ganho de velocidade.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from pathlib import Path
+from typing import Any
+
+from .boxes import box_iou
+from .export_cache import ExportCache
+from .onnx_backend import IMAGE_SUFFIXES, OnnxDetector
+from .utils import cv2, np
+
+# Modos de quantização suportados
+QUANTIZATION_MODES = ("dynamic", "static")
+
+# Imagens usadas na calibração estática
+DEFAULT_CALIBRATION_IMAGES = 64
+
+# Operadores do head de detecção mantidos em FP32: boxes (pixels) e scores (0-1) saem concatenados no mesmo tensor,
+# e uma escala INT8 compartilhada destrói um dos dois
+_HEAD_FLOAT_OPS = {
+    "Add", "Concat", "Div", "Mul", "Reshape", "Sigmoid", "Slice", "Softmax", "Split", "Sub", "Transpose",
+}  # fmt: skip
+
+
+def _require_quantization() -> Any:
+    """Importa ``onnxruntime.quantization`` com mensagem clara se faltar."""
+    try:
+        import onnxruntime.quantization as quantization
+    except ImportError as e:
+        raise ImportError("Quantização requer onnxruntime e onnx. Install com: pip install onnxruntime onnx") from e
+    return quantization
+
+
+def calibration_images(folder: str | Path, max_images: int = DEFAULT_CALIBRATION_IMAGES) -> list[Path]:
+    """Lista as imagens de calibração de uma pasta (ordem estável, no máximo ``max_images``)."""
+    folder = Path(folder)
+    if not folder.is_dir():
+        raise FileNotFoundError(f"Pasta de calibração não encontrada: {folder}")
+    images = sorted(p for p in folder.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)[:max_images]
+    if not images:
+        raise ValueError(f"Nenhuma imagem de calibração em {folder}")
+    return images
+
+
+def calibration_fingerprint(images: list[Path]) -> str:
+    """Identidade de um conjunto de calibração (nomes, tamanhos e mtimes), para a chave do cache."""
+    hasher = hashlib.sha256()
+    for path in images:
+        stat = path.stat()
+        hasher.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return hasher.hexdigest()
+
+
+def _head_nodes_to_exclude(model_path: str | Path) -> list[str]:
+    """Nós de pós-processamento do head (último ``/model.N/``) que devem ficar em FP32.
+
+    As convoluções do head (``cv2``/``cv3``) continuam quantizadas; só a decodificação (DFL, ``Concat``, ``Sigmoid``
+    final, grade de âncoras) fica de fora.
+    """
+    import onnx
+
+    graph = onnx.load(str(model_path), load_external_data=False).graph
+    modules = {node.name.split("/")[1] for node in graph.node if node.name.startswith("/model.")}
+    indices = [int(m.split(".")[1]) for m in modules if m.split(".")[-1].isdigit()]
+    if not indices:
+        return []
+    head = f"/model.{max(indices)}/"
+    excluded = []
+    for node in graph.node:
+        if not node.name.startswith(head):
+            continue
+        local = node.name[len(head) :]
+        if local.startswith("dfl/") or ("/" not in local and node.op_type in _HEAD_FLOAT_OPS):
+            excluded.append(node.name)
+    return excluded
+
+
+def quantize_onnx(
+    source: str | Path,
+    output: str | Path,
+    mode: str = "dynamic",
+    calibration: list[Path] | None = None,
+    per_channel: bool = True,
+) -> Path:
+    """Quantiza um modelo ONNX para INT8.
+
+    Args:
+        source: Modelo ONNX FP32 (exportado por ``Vision.export(format="onnx")``).
+        output: Arquivo de saída.
+        mode: 'dynamic' (pesos INT8, ativações quantizadas em tempo de execução) ou 'static' (pesos e ativações
+            INT8 com escalas calibradas).
+        calibration: Imagens de calibração (obrigatório no modo 'static').
+        per_channel: Escalas por canal nos pesos (mais precisão, mesmo custo).
+
+    Returns:
+        Caminho do modelo quantizado.
+    """
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"Modo de quantização inválido: {mode!r}. Opções: {', '.join(QUANTIZATION_MODES)}")
+    quantization = _require_quantization()
+    output = Path(output)
+    exclude = _head_nodes_to_exclude(source)
+
+    if mode == "dynamic":
+        quantization.quantize_dynamic(
+            str(source),
+            str(output),
+            weight_type=quantization.QuantType.QUInt8,
+            per_channel=per_channel,
+            nodes_to_exclude=exclude,
+        )
+        return output
+
+    if not calibration:
+        raise ValueError("Quantização estática requer imagens de calibração")
+    detector = OnnxDetector(source)
+
+    class _FolderReader(quantization.CalibrationDataReader):
+        """Entrega as imagens de calibração já pré-processadas como o ``OnnxDetector`` faz."""
+
+        def __init__(self) -> None:
+            self._paths = iter(calibration)
+
+        def get_next(self) -> dict | None:
+            for path in self._paths:
+                img = cv2.imread(str(path), cv2.IMREAD_COLOR)
+                if img is not None:
+                    tensor, _ = detector.preprocess([img])
+                    return {detector.input_name: tensor}
+            return None
+
+    quantization.quantize_static(
+        str(source),
+        str(output),
+        _FolderReader(),
+        quant_format=quantization.QuantFormat.QDQ,
+        activation_type=quantization.QuantType.QUInt8,
+        weight_type=quantization.QuantType.QInt8,
+        per_channel=per_channel,
+        nodes_to_exclude=exclude,
+    )
+    return output
+
+
+def cached_quantize(
+    source: str | Path,
+    mode: str = "dynamic",
+    calibration: str | Path | None = None,
+    max_calibration_images: int = DEFAULT_CALIBRATION_IMAGES,
+    cache: ExportCache | None = None,
+) -> tuple[Path, bool]:
+    """Quantiza passando pelo cache de exportação.
+
+    Args:
+        source: Modelo ONNX FP32.
+        mode: 'dynamic' ou 'static'.
+        calibration: Pasta com imagens de calibração (modo 'static').
+        max_calibration_images: Máximo de imagens de calibração usadas.
+        cache: Cache a usar. Padrão: ``ExportCache()``.
+
+    Returns:
+        Tupla (caminho do modelo INT8, True se veio do cache).
+
+    Examples:
+        >>> path, hit = cached_quantize("yolov8n.onnx", mode="static", calibration="data/calib")
+    """
+    cache = cache or ExportCache()
+    images: list[Path] = []
+    params: dict[str, Any] = {"mode": mode}
+    if mode == "static":
+        if calibration is None:
+            raise ValueError("precision='int8' com quantização estática requer calibration=<pasta de imagens>")
+        images = calibration_images(calibration, max_calibration_images)
+        params["calibration"] = calibration_fingerprint(images)
+
+    key = cache.make_key(source, "onnx-int8", params)
+    hit = cache.get(key)
+    if hit is not None:
+        return hit, True
+
+    def produce(staging: Path) -> Path:
+        return quantize_onnx(source, staging / f"{Path(source).stem}-int8-{mode}.onnx", mode, images)
+
+    path = cache.put(key, produce, meta={"source": str(source), "format": "onnx-int8", "kwargs": params})
+    return path, False
+
+
+def compare_detections(reference: Any, candidate: Any, iou: float = 0.5) -> dict:
+    """Compara dois ``DetectionBatch`` das mesmas imagens, tratando ``reference`` como verdade.
+
+    Cada detecção do candidato casa com no máximo uma da referência (mesma classe, IoU >= ``iou``, maior IoU
+    primeiro).
+
+    Args:
+        reference: Detecções do modelo de referência (FP32).
+        candidate: Detecções do modelo avaliado (INT8).
+        iou: IoU mínimo para um casamento.
+
+    Returns:
+        Dicionário com ``precision``, ``recall``, ``f1``, ``mean_iou`` (dos casamentos), ``score_mae`` (diferença
+        média de confiança nos casamentos) e as contagens.
+    """
+    matched = 0
+    ious: list[np.ndarray] = []
+    score_errors: list[np.ndarray] = []
+    for (ref_boxes, ref_scores, ref_cls), (cand_boxes, cand_scores, cand_cls) in zip(reference, candidate):
+        if not len(ref_boxes) or not len(cand_boxes):
+            continue
+        overlap = box_iou(ref_boxes, cand_boxes)
+        overlap[ref_cls[:, None] != cand_cls[None, :]] = 0.0
+        rows, cols = np.nonzero(overlap >= iou)
+        order = np.argsort(-overlap[rows, cols], kind="stable")
+        used_ref, used_cand, pairs = set(), set(), []
+        for r, c in zip(rows[order], cols[order]):
+            if r in used_ref or c in used_cand:
+                continue
+            used_ref.add(r)
+            used_cand.add(c)
+            pairs.append((r, c))
+        if pairs:
+            r_idx, c_idx = np.array(pairs, dtype=np.int64).T
+            matched += len(pairs)
+            ious.append(overlap[r_idx, c_idx])
+            score_errors.append(np.abs(ref_scores[r_idx] - cand_scores[c_idx]))
+
+    total_ref, total_cand = reference.num_detections, candidate.num_detections
+    precision = matched / total_cand if total_cand else 1.0
+    recall = matched / total_ref if total_ref else 1.0
+    return {
+        "precision": precision,
+        "recall": recall,
+        "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        "mean_iou": float(np.concatenate(ious).mean()) if ious else 0.0,
+        "score_mae": float(np.concatenate(score_errors).mean()) if score_errors else 0.0,
+        "reference_detections": total_ref,
+        "candidate_detections": total_cand,
+        "matched": matched,
+    }
+
+
+def _timed_detect(detector: Any, images: list, repeat: int, **kwargs: Any) -> tuple[Any, float]:
+    """Roda ``detect`` imagem a imagem e retorna (DetectionBatch, latência mediana em ms)."""
+    from .results import DetectionBatch
+
+    detector.detect(images[0], return_format="arrays", **kwargs)  # warmup
+    batches, timings = [], []
+    for image in images:
+        for r in range(repeat):
+            t0 = time.perf_counter()
+            batch = detector.detect(image, return_format="arrays", **kwargs)
+            timings.append(1000.0 * (time.perf_counter() - t0))
+            if r == 0:
+                batches.append(batch)
+    return DetectionBatch.concatenate(batches), float(np.median(timings))
+
+
+def measure_quantization(
+    reference: Any,
+    candidate: Any,
+    validation: list,
+    iou: float = 0.5,
+    repeat: int = 1,
+    **kwargs: Any,
+) -> dict:
+    """Mede velocidade e fidelidade de um detector quantizado contra o FP32.
+
+    Args:
+        reference: ``Vision`` FP32.
+        candidate: ``Vision`` INT8.
+        validation: Imagens de validação (caminhos ou arrays).
+        iou: IoU mínimo para casar detecções.
+        repeat: Repetições por imagem na medição de latência.
+        **kwargs: Arguments adicionais para ``detect`` (conf, classes...).
+
+    Returns:
+        Dicionário com ``reference_ms``, ``candidate_ms``, ``speedup`` e as métricas de ``compare_detections``.
+    """
+    images = list(validation)
+    if not images:
+        raise ValueError("Lista de validação vazia")
+    ref_batch, ref_ms = _timed_detect(reference, images, repeat, **kwargs)
+    cand_batch, cand_ms = _timed_detect(candidate, images, repeat, **kwargs)
+    report = {
+        "images": len(images),
+        "reference_ms": ref_ms,
+        "candidate_ms": cand_ms,
+        "speedup": ref_ms / cand_ms if cand_ms > 0 else 0.0,
+    }
+    report.update(compare_detections(ref_batch, cand_batch, iou=iou))
+    return report
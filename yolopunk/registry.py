@@ -0,0 +1,322 @@
+# YOLOPunk 🩸 AGPL-3.0 License
+
+"""Registro de modelos compartilhado pelo processo.
+
+Permite que várias instâncias de ``Vision`` usem os mesmos pesos carregados em memória. Os modelos são indexados
+por (identidade dos pesos, tarefa, device), contam referências e são despejados em ordem LRU quando o orçamento de
+modelos ou de memória é excedido.
+"""
+
+from __future__ import annotations
+
+import collections
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+try:
+    from ultralytics import YOLO
+
+    ULTRALYTICS_AVAILABLE = True
+except ImportError:
+    ULTRALYTICS_AVAILABLE = False
+    YOLO = None
+
+# Cache de hashes de arquivo: (path, size, mtime_ns) -> sha256
+_digest_cache: dict[tuple[str, int, int], str] = {}
+_digest_lock = threading.Lock()
+
+
+def weights_fingerprint(model: str | Path) -> str:
+    """Retorna uma identidade estável para um arquivo de pesos.
+
+    Para arquivos locais é o SHA-256 do conteúdo (calculado uma vez por combinação de caminho, tamanho e mtime).
+    Para nomes que ainda não existem no disco (ex.: 'yolov8n.pt', baixado pelo Ultralytics) é o próprio nome.
+
+    Args:
+        model: Gnome do modelo ou caminho para arquivo de pesos.
+
+    Returns:
+        String que identifica o conteúdo dos pesos.
+
+    Examples:
+        >>> weights_fingerprint("models/best.pt")
+        'sha256:3f1a...'
+    """
+    path = Path(model)
+    if not path.is_file():
+        return str(model)
+
+    stat = path.stat()
+    cache_key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    with _digest_lock:
+        digest = _digest_cache.get(cache_key)
+    if digest is None:
+        hasher = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                hasher.update(block)
+        digest = f"sha256:{hasher.hexdigest()}"
+        with _digest_lock:
+            _digest_cache[cache_key] = digest
+    return digest
+
+
+def _model_nbytes(model: Any) -> int:
+    """Estima a memória ocupada pelos parâmetros e buffers de um modelo YOLO."""
+    module = getattr(model, "model", None)
+    try:
+        tensors = list(module.parameters()) + list(module.buffers())
+    except (AttributeError, TypeError):
+        return 0
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class _Entry:
+    """Modelo carregado no registro."""
+
+    __slots__ = ("key", "load_lock", "lock", "model", "nbytes", "refs")
+
+    def __init__(self, key: tuple):
+        self.key = key
+        self.model: Any = None
+        self.nbytes = 0
+        self.refs = 0
+        # Serializa carregamento e chamadas ao modelo compartilhado
+        self.load_lock = threading.Lock()
+        self.lock = threading.RLock()
+
+
+class ModelRegistry:
+    """Registro de modelos com contagem de referências e despejo LRU.
+
+    Entradas em uso (``refs > 0``) nunca são despejadas. Entradas ociosas ficam em cache e são removidas da menos
+    recentemente usada para a mais recente sempre que ``max_models`` ou ``max_bytes`` é excedido.
+
+    Args:
+        max_models: Número máximo de modelos mantidos em memória. None para ilimitado.
+        max_bytes: Orçamento de memória (bytes de parâmetros e buffers). None para ilimitado.
+        loader: Função ``loader(model_name, task)`` que carrega o modelo. Padrão: ``YOLO(model_name, task=task)``.
+
+    Examples:
+        >>> registry = ModelRegistry(max_models=4)
+        >>> key = registry.preload("yolov8n.pt", device="cpu")
+        >>> registry.stats()["models"]
+        1
+    """
+
+    def __init__(
+        self,
+        max_models: int | None = 8,
+        max_bytes: int | None = None,
+        loader: Callable[[str, str], Any] | None = None,
+    ):
+        """Inicializa o registro vazio."""
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self._loader = loader
+        self._entries: collections.OrderedDict[tuple, _Entry] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def make_key(model_name: str | Path, task: str = "detect", device: str = "cpu") -> tuple:
+        """Monta a chave do registro para um modelo.
+
+        Args:
+            model_name: Gnome do modelo ou caminho para arquivo de pesos.
+            task: Tarefa do modelo.
+            device: Device de inferência.
+
+        Returns:
+            Tupla (identidade dos pesos, tarefa, device).
+        """
+        return (weights_fingerprint(model_name), task, device)
+
+    def _load(self, model_name: str, task: str) -> Any:
+        """Carrega um modelo com o loader configurado."""
+        if self._loader is not None:
+            return self._loader(model_name, task)
+        if not ULTRALYTICS_AVAILABLE:
+            raise ImportError("Ultralytics YOLO não está instalado. Install com: pip install ultralytics")
+        return YOLO(model_name, task=task)
+
+    def _get_entry(self, model_name: str | Path, task: str, device: str, ref: bool) -> _Entry:
+        """Retorna a entrada carregada para a chave, carregando se necessário."""
+        key = self.make_key(model_name, task, device)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _Entry(key)
+                self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if ref:
+                # Reserva a entrada antes de carregar para que não seja despejada no meio do caminho
+                entry.refs += 1
+
+        try:
+            with entry.load_lock:
+                hit = entry.model is not None
+                if not hit:
+                    entry.model = self._load(str(model_name), task)
+                    entry.nbytes = _model_nbytes(entry.model)
+            with self._lock:
+                if hit:
+                    self._hits += 1
+                else:
+                    self._misses += 1
+        except BaseException:
+            with self._lock:
+                if ref:
+                    entry.refs -= 1
+                if entry.model is None and entry.refs == 0 and self._entries.get(key) is entry:
+                    del self._entries[key]
+            raise
+
+        with self._lock:
+            self._enforce_budget()
+        return entry
+
+    def acquire(self, model_name: str | Path, task: str = "detect", device: str = "cpu") -> tuple[Any, Any, Any]:
+        """Obtém o modelo compartilhado e incrementa sua contagem de referências.
+
+        Args:
+            model_name: Gnome do modelo ou caminho para arquivo de pesos.
+            task: Tarefa do modelo.
+            device: Device de inferência.
+
+        Returns:
+            Tupla (token, modelo, lock). O lock deve envolver chamadas ao modelo compartilhado. O token deve ser
+            devolvido com ``release`` quando o modelo não for mais usado.
+        """
+        entry = self._get_entry(model_name, task, device, ref=True)
+        return entry, entry.model, entry.lock
+
+    def release(self, token: Any) -> None:
+        """Decrementa a contagem de referências da entrada de um ``acquire``.
+
+        O token identifica a entrada em si, não a chave: depois de um ``evict(force=True)`` seguido de um novo
+        ``acquire`` dos mesmos pesos, soltar o handle antigo não mexe nas referências da entrada nova.
+
+        Args:
+            token: Token retornado por ``acquire``.
+        """
+        with self._lock:
+            if token.refs == 0:
+                return
+            token.refs -= 1
+            if self._entries.get(token.key) is token:
+                self._enforce_budget()
+
+    def preload(self, model_name: str | Path, task: str = "detect", device: str = "cpu") -> tuple:
+        """Carrega um modelo no registro sem reservá-lo.
+
+        Args:
+            model_name: Gnome do modelo ou caminho para arquivo de pesos.
+            task: Tarefa do modelo.
+            device: Device de inferência.
+
+        Returns:
+            Chave da entrada carregada.
+
+        Examples:
+            >>> preload("yolov8n.pt", device="cpu")
+        """
+        return self._get_entry(model_name, task, device, ref=False).key
+
+    def evict(
+        self,
+        model_name: str | Path | None = None,
+        task: str | None = None,
+        device: str | None = None,
+        force: bool = False,
+    ) -> int:
+        """Remove modelos do registro.
+
+        Sem argumentos, remove todos os modelos ociosos. Modelos em uso só são removidos com ``force=True``; nesse
+        caso os handles existentes continuam funcionando com sua referência, mas novos ``acquire`` carregam de novo.
+
+        Args:
+            model_name: Filtra pelo modelo. None para todos.
+            task: Filtra pela tarefa. None para todas.
+            device: Filtra pelo device. None para todos.
+            force: Se True, remove também entradas em uso.
+
+        Returns:
+            Número de entradas removidas.
+        """
+        fingerprint = weights_fingerprint(model_name) if model_name is not None else None
+        with self._lock:
+            victims = [
+                key
+                for key, entry in self._entries.items()
+                if (fingerprint is None or key[0] == fingerprint)
+                and (task is None or key[1] == task)
+                and (device is None or key[2] == device)
+                and (force or entry.refs == 0)
+                and entry.model is not None
+            ]
+            for key in victims:
+                del self._entries[key]
+        return len(victims)
+
+    def _enforce_budget(self) -> None:
+        """Despeja entradas ociosas em ordem LRU até respeitar o orçamento. Requer ``self._lock``."""
+
+        def over_budget() -> bool:
+            loaded = [e for e in self._entries.values() if e.model is not None]
+            if self.max_models is not None and len(loaded) > self.max_models:
+                return True
+            return self.max_bytes is not None and sum(e.nbytes for e in loaded) > self.max_bytes
+
+        while over_budget():
+            idle = next((k for k, e in self._entries.items() if e.refs == 0 and e.model is not None), None)
+            if idle is None:
+                break
+            del self._entries[idle]
+
+    def stats(self) -> dict:
+        """Retorna o estado do registro.
+
+        Returns:
+            Dicionário com número de modelos, bytes totais, hits, misses e a lista de entradas (chave, refs, bytes)
+            da menos para a mais recentemente usada.
+        """
+        with self._lock:
+            entries = [
+                {"key": key, "refs": entry.refs, "nbytes": entry.nbytes}
+                for key, entry in self._entries.items()
+                if entry.model is not None
+            ]
+            return {
+                "models": len(entries),
+                "nbytes": sum(e["nbytes"] for e in entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "entries": entries,
+            }
+
+    def __repr__(self) -> str:
+        """Representação string do objeto."""
+        return f"ModelRegistry(max_models={self.max_models}, max_bytes={self.max_bytes})"
+
+
+# Registro padrão do processo, usado por Vision
+registry = ModelRegistry()
+
+
+def preload(model_name: str | Path, task: str = "detect", device: str = "cpu") -> tuple:
+    """Carrega um modelo no registro padrão (ver ``ModelRegistry.preload``)."""
+    return registry.preload(model_name, task=task, device=device)
+
+
+def evict(
+    model_name: str | Path | None = None,
+    task: str | None = None,
+    device: str | None = None,
+    force: bool = False,
+) -> int:
+    """Remove modelos do registro padrão (ver ``ModelRegistry.evict``)."""
+    return registry.evict(model_name, task=task, device=device, force=force)
@@ -0,0 +1,333 @@
+# YOLOPunk 🩸 AGPL-3.0 License
+
+"""Cache persistente de resultados de detecção.
+
+Indexa detecções por hash do conteúdo da imagem + identidade do modelo + parâmetros de ``detect`` e as guarda de
+forma compacta (um blob float32 por imagem) em um SQLite local. Uma segunda tabela memoriza o hash de cada arquivo
+por (caminho, tamanho, mtime), então reprocessar um diretório inalterado custa só ``stat`` + consultas ao banco; uma
+terceira guarda os nomes de classe de cada configuração, para que um acerto total não precise carregar o modelo.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+from . import RESULTS_DIR, ensure_dir
+from .utils import np
+
+# Arquivo padrão do cache
+RESULT_CACHE_PATH = RESULTS_DIR / "detect_cache.sqlite"
+
+# Tamanho máximo padrão (bytes de detecções armazenadas)
+DEFAULT_MAX_BYTES = 1024**3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    height INTEGER NOT NULL,
+    width INTEGER NOT NULL,
+    nbytes INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS names (
+    params TEXT PRIMARY KEY,
+    names TEXT NOT NULL
+);
+"""
+
+# Limite de variáveis por consulta do SQLite
+_SQL_CHUNK = 500
+
+
+class ResultCache:
+    """Cache de detecções em SQLite com despejo LRU por tamanho.
+
+    Cada entrada guarda um array float32 (N, 6) com ``x1, y1, x2, y2, conf, cls`` e a forma da imagem.
+
+    Args:
+        path: Arquivo SQLite. Padrão: ``RESULTS_DIR / "detect_cache.sqlite"``.
+        max_bytes: Tamanho máximo das detecções armazenadas; as menos recentemente usadas são removidas acima disso.
+
+    Examples:
+        >>> cache = ResultCache("cache/detections.sqlite")
+        >>> batch = detector.detect("images/", result_cache=cache)
+        >>> cache.stats()["hit_ratio"]
+    """
+
+    def __init__(self, path: str | Path | None = None, max_bytes: int | None = DEFAULT_MAX_BYTES):
+        """Abre (ou cria) o banco."""
+        self.path = Path(path) if path is not None else RESULT_CACHE_PATH
+        self.max_bytes = max_bytes
+        ensure_dir(self.path.parent)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._hits = 0
+        self._misses = 0
+        # Total corrente de bytes armazenados; ressincronizado com SUM(nbytes) só quando passa do limite
+        self._nbytes = self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM results").fetchone()[0]
+
+    # ─── Chaves ────────────────────────────────────────────────────
+
+    def content_digest(self, item: Any) -> str:
+        """Hash do conteúdo de uma imagem (arquivo ou array); ver ``content_digests``."""
+        return self.content_digests([item])[0]
+
+    def content_digests(self, items: list) -> list[str]:
+        """Hash do conteúdo de várias imagens (arquivos ou arrays).
+
+        Para arquivos, o hash é memorizado por (caminho, tamanho, mtime) e o arquivo só é relido se mudar. As
+        consultas à tabela de arquivos são feitas em lote (``IN`` de até ``_SQL_CHUNK`` caminhos) e os hashes
+        novos gravados numa única transação.
+
+        Args:
+            items: Caminhos de arquivo ou arrays NumPy.
+
+        Returns:
+            Hashes hexadecimais BLAKE2b de 128 bits, na ordem de ``items``.
+        """
+        digests: list[str | None] = [None] * len(items)
+        files: dict[str, tuple[int, int]] = {}
+        positions: dict[str, list[int]] = {}
+        for i, item in enumerate(items):
+            if isinstance(item, (str, Path)):
+                path = str(Path(item).resolve())
+                if path not in files:
+                    stat = os.stat(path)
+                    files[path] = (stat.st_size, stat.st_mtime_ns)
+                positions.setdefault(path, []).append(i)
+            else:
+                array = np.ascontiguousarray(item)
+                hasher = hashlib.blake2b(digest_size=16)
+                hasher.update(str(array.shape).encode())
+                hasher.update(memoryview(array).cast("B"))
+                digests[i] = hasher.hexdigest()
+        if not files:
+            return digests
+
+        known: dict[str, str] = {}
+        paths = list(files)
+        with self._lock:
+            for start in range(0, len(paths), _SQL_CHUNK):
+                chunk = paths[start : start + _SQL_CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT path, size, mtime_ns, digest FROM files WHERE path IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                known.update((path, digest) for path, size, mtime_ns, digest in rows if files[path] == (size, mtime_ns))
+
+        fresh = []
+        for path in paths:
+            digest = known.get(path)
+            if digest is None:
+                hasher = hashlib.blake2b(digest_size=16)
+                with open(path, "rb") as f:
+                    for block in iter(lambda: f.read(1 << 20), b""):
+                        hasher.update(block)
+                digest = hasher.hexdigest()
+                fresh.append((path, *files[path], digest))
+            for i in positions[path]:
+                digests[i] = digest
+        if fresh:
+            with self._lock:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO files (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)", fresh
+                )
+                self._conn.execute("COMMIT")
+        return digests
+
+    @staticmethod
+    def params_digest(params: dict) -> str:
+        """Hash dos parâmetros que afetam o resultado (modelo, conf, iou, classes, max_det, imgsz...)."""
+        payload = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    # ─── Leitura e escrita ─────────────────────────────────────────
+
+    def get_many(self, keys: list[str]) -> dict[str, tuple[np.ndarray, tuple[int, int]]]:
+        """Busca várias entradas de uma vez.
+
+        Args:
+            keys: Chaves a buscar.
+
+        Returns:
+            Dicionário chave -> (array (N, 6), (altura, largura)) apenas para as chaves encontradas.
+        """
+        found: dict[str, tuple[np.ndarray, tuple[int, int]]] = {}
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(keys), _SQL_CHUNK):
+                chunk = keys[start : start + _SQL_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, data, height, width FROM results WHERE key IN ({marks})", chunk
+                ).fetchall()
+                for key, data, height, width in rows:
+                    found[key] = (np.frombuffer(data, dtype=np.float32).reshape(-1, 6), (height, width))
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE results SET last_used = ? WHERE key IN ({','.join('?' * len(rows))})",
+                        [now, *(row[0] for row in rows)],
+                    )
+            self._hits += len(found)
+            self._misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, entries: Iterable[tuple[str, np.ndarray, tuple[int, int]]]) -> None:
+        """Grava várias entradas em uma transação e aplica o limite de tamanho.
+
+        Args:
+            entries: Tuplas (chave, array (N, 6), (altura, largura)).
+        """
+        now = time.time()
+        rows = []
+        for key, data, (height, width) in entries:
+            blob = np.ascontiguousarray(data, dtype=np.float32).tobytes()
+            rows.append((key, blob, int(height), int(width), len(blob), now))
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            # Entradas substituídas saem do total corrente
+            replaced = 0
+            for start in range(0, len(rows), _SQL_CHUNK):
+                chunk = [row[0] for row in rows[start : start + _SQL_CHUNK]]
+                replaced += self._conn.execute(
+                    f"SELECT COALESCE(SUM(nbytes), 0) FROM results WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchone()[0]
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results (key, data, height, width, nbytes, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.execute("COMMIT")
+            self._nbytes += sum(row[4] for row in rows) - replaced
+            self._evict()
+
+    def get_names(self, params: str) -> dict[int, str] | None:
+        """Nomes de classe guardados para um ``params_digest`` (None se ainda não gravados)."""
+        with self._lock:
+            row = self._conn.execute("SELECT names FROM names WHERE params = ?", (params,)).fetchone()
+        return {int(k): v for k, v in json.loads(row[0]).items()} if row is not None else None
+
+    def put_names(self, params: str, names: dict[int, str]) -> None:
+        """Guarda os nomes de classe de um ``params_digest``."""
+        payload = json.dumps({str(k): v for k, v in names.items()}, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO names (params, names) VALUES (?, ?)", (params, payload))
+
+    def _evict(self) -> None:
+        """Remove entradas LRU até respeitar ``max_bytes``. Requer ``self._lock``.
+
+        Usa o total corrente; só quando ele passa do limite o total real é recalculado (o banco pode ser
+        compartilhado com outros processos), antes de despejar.
+        """
+        if self.max_bytes is None or self._nbytes <= self.max_bytes:
+            return
+        total = self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM results").fetchone()[0]
+        self._nbytes = total
+        if total <= self.max_bytes:
+            return
+        # Remove um pouco abaixo do limite para não despejar a cada inserção
+        excess = total - int(self.max_bytes * 0.9)
+        # Apaga as entradas mais antigas cujo acumulado (antes delas) ainda não cobre o excesso
+        self._conn.execute(
+            """
+            DELETE FROM results WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, nbytes, SUM(nbytes) OVER (ORDER BY last_used, key) AS running FROM results
+                ) WHERE running - nbytes < ?
+            )
+            """,
+            (excess,),
+        )
+        self._nbytes = self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM results").fetchone()[0]
+        self._prune_files()
+
+    def _prune_files(self) -> int:
+        """Remove hashes de arquivos sem nenhuma entrada em ``results``. Requer ``self._lock``.
+
+        As chaves de ``results`` começam com ``<digest>:``; a busca por intervalo na chave primária evita varrer
+        a tabela para cada arquivo.
+        """
+        return self._conn.execute(
+            """
+            DELETE FROM files WHERE NOT EXISTS (
+                SELECT 1 FROM results WHERE key >= files.digest || ':' AND key < files.digest || ';'
+            )
+            """
+        ).rowcount
+
+    # ─── Manutenção ────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        """Retorna hits, misses, taxa de acerto, número de entradas e bytes armazenados."""
+        with self._lock:
+            entries, nbytes = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM results").fetchone()
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "entries": entries,
+                "nbytes": nbytes,
+            }
+
+    def prune(self) -> int:
+        """Remove da tabela de arquivos os caminhos que não existem mais ou cujo hash não tem resultados.
+
+        Roda também a cada despejo (só a parte dos hashes órfãos, sem ``stat``).
+
+        Returns:
+            Número de linhas removidas.
+        """
+        with self._lock:
+            paths = [row[0] for row in self._conn.execute("SELECT path FROM files")]
+        gone = [path for path in paths if not os.path.exists(path)]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            removed = 0
+            for start in range(0, len(gone), _SQL_CHUNK):
+                chunk = gone[start : start + _SQL_CHUNK]
+                removed += self._conn.execute(
+                    f"DELETE FROM files WHERE path IN ({','.join('?' * len(chunk))})", chunk
+                ).rowcount
+            removed += self._prune_files()
+            self._conn.execute("COMMIT")
+        return removed
+
+    def clear(self) -> None:
+        """Remove todas as entradas (e os hashes memorizados)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.execute("DELETE FROM files")
+            self._conn.execute("DELETE FROM names")
+            self._conn.execute("VACUUM")
+            self._nbytes = 0
+
+    def close(self) -> None:
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            self._conn.close()
+
+    def __repr__(self) -> str:
+        """Representação string do objeto."""
+        return f"ResultCache(path={str(self.path)!r}, max_bytes={self.max_bytes})"
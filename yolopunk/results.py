@@ -0,0 +1,248 @@
+# YOLOPunk 🩸 AGPL-3.0 License
+
+"""Resultados de detecção compactos em arrays contíguos.
+
+``DetectionBatch`` guarda as detecções de muitas imagens em poucos arrays NumPy (boxes, scores, classes e um índice
+de offsets por imagem), sem manter imagens originais nem tensores vivos. Filtros e estatísticas viram operações
+vetorizadas.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+
+def _to_numpy(value: Any) -> np.ndarray:
+    """Converte tensor (torch) ou array em ``np.ndarray``."""
+    if hasattr(value, "cpu"):
+        value = value.cpu()
+    if hasattr(value, "numpy"):
+        value = value.numpy()
+    return np.asarray(value)
+
+
+class DetectionBatch:
+    """Detecções de várias imagens em arrays contíguos.
+
+    As detecções da imagem ``i`` ocupam as linhas ``offsets[i]:offsets[i + 1]`` de ``boxes``, ``scores`` e
+    ``class_ids``.
+
+    Args:
+        boxes: Array float32 (N, 4) em ``x1, y1, x2, y2`` (pixels da imagem original).
+        scores: Array float32 (N,) de confianças.
+        class_ids: Array int32 (N,) de IDs de classe.
+        offsets: Array int64 (B + 1,) com o início das detecções de cada imagem.
+        orig_shapes: Array int32 (B, 2) com (altura, largura) de cada imagem.
+        paths: Caminho (ou rótulo) de cada imagem.
+        names: Mapeamento ID de classe -> nome.
+
+    Examples:
+        >>> batch = detector.detect(images, return_format="arrays")
+        >>> len(batch), batch.num_detections
+        >>> people = batch.filter(classes=[0], min_score=0.5)
+        >>> boxes, scores, class_ids = people[3]
+    """
+
+    __slots__ = ("boxes", "class_ids", "names", "offsets", "orig_shapes", "paths", "scores")
+
+    def __init__(
+        self,
+        boxes: np.ndarray,
+        scores: np.ndarray,
+        class_ids: np.ndarray,
+        offsets: np.ndarray,
+        orig_shapes: np.ndarray,
+        paths: list[str],
+        names: dict[int, str] | None = None,
+    ):
+        """Inicializa o batch a partir de arrays já montados."""
+        self.boxes = np.ascontiguousarray(boxes, dtype=np.float32).reshape(-1, 4)
+        self.scores = np.ascontiguousarray(scores, dtype=np.float32).reshape(-1)
+        self.class_ids = np.ascontiguousarray(class_ids, dtype=np.int32).reshape(-1)
+        self.offsets = np.ascontiguousarray(offsets, dtype=np.int64).reshape(-1)
+        self.orig_shapes = np.ascontiguousarray(orig_shapes, dtype=np.int32).reshape(-1, 2)
+        self.paths = list(paths)
+        self.names = dict(names or {})
+
+        if not (len(self.boxes) == len(self.scores) == len(self.class_ids) == self.offsets[-1]):
+            raise ValueError("boxes, scores, class_ids e offsets[-1] devem ter o mesmo número de detecções")
+        if len(self.offsets) != len(self.orig_shapes) + 1:
+            raise ValueError("offsets deve ter uma entrada a mais que orig_shapes")
+
+    @classmethod
+    def empty(cls, names: dict[int, str] | None = None) -> DetectionBatch:
+        """Cria um batch sem imagens."""
+        return cls(
+            np.zeros((0, 4), np.float32),
+            np.zeros(0, np.float32),
+            np.zeros(0, np.int32),
+            np.zeros(1, np.int64),
+            np.zeros((0, 2), np.int32),
+            [],
+            names,
+        )
+
+    @classmethod
+    def from_results(cls, results: Iterable[Any]) -> DetectionBatch:
+        """Converte resultados por imagem (Ultralytics ``Results`` ou ``OnnxResult``) em um batch.
+
+        Aceita um gerador (ex.: ``stream=True``): cada resultado é convertido e descartado em seguida, então o pico
+        de memória não depende do número de imagens.
+
+        Args:
+            results: Iterável de resultados com ``boxes``, ``orig_shape``, ``path`` e ``names``.
+
+        Returns:
+            Batch com as detecções de todas as imagens.
+        """
+        boxes, scores, class_ids, counts, shapes, paths = [], [], [], [], [], []
+        names: dict[int, str] = {}
+        for result in results:
+            det = result.boxes
+            if det is None:
+                n = 0
+            else:
+                boxes.append(_to_numpy(det.xyxy).astype(np.float32, copy=False))
+                scores.append(_to_numpy(det.conf).astype(np.float32, copy=False))
+                class_ids.append(_to_numpy(det.cls).astype(np.int32))
+                n = len(boxes[-1])
+            counts.append(n)
+            shapes.append(tuple(result.orig_shape[:2]))
+            paths.append(str(getattr(result, "path", "")))
+            names = names or dict(getattr(result, "names", {}) or {})
+
+        if not counts:
+            return cls.empty(names)
+        offsets = np.zeros(len(counts) + 1, np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(
+            np.concatenate(boxes) if boxes else np.zeros((0, 4), np.float32),
+            np.concatenate(scores) if scores else np.zeros(0, np.float32),
+            np.concatenate(class_ids) if class_ids else np.zeros(0, np.int32),
+            offsets,
+            np.asarray(shapes, np.int32),
+            paths,
+            names,
+        )
+
+    @classmethod
+    def concatenate(cls, batches: Iterable[DetectionBatch]) -> DetectionBatch:
+        """Junta vários batches em um só, na ordem dada.
+
+        Args:
+            batches: Batches a juntar.
+
+        Returns:
+            Novo batch.
+        """
+        batches = list(batches)
+        if not batches:
+            return cls.empty()
+        counts = np.concatenate([np.diff(b.offsets) for b in batches])
+        offsets = np.zeros(len(counts) + 1, np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        names: dict[int, str] = {}
+        for b in batches:
+            names.update(b.names)
+        return cls(
+            np.concatenate([b.boxes for b in batches]),
+            np.concatenate([b.scores for b in batches]),
+            np.concatenate([b.class_ids for b in batches]),
+            offsets,
+            np.concatenate([b.orig_shapes for b in batches]),
+            [p for b in batches for p in b.paths],
+            names,
+        )
+
+    @property
+    def num_detections(self) -> int:
+        """Número total de detecções."""
+        return int(self.offsets[-1])
+
+    @property
+    def counts(self) -> np.ndarray:
+        """Número de detecções por imagem."""
+        return np.diff(self.offsets)
+
+    @property
+    def image_ids(self) -> np.ndarray:
+        """Índice da imagem de cada detecção (N,)."""
+        return np.repeat(np.arange(len(self), dtype=np.int64), self.counts)
+
+    @property
+    def nbytes(self) -> int:
+        """Memória ocupada pelos arrays."""
+        return sum(a.nbytes for a in (self.boxes, self.scores, self.class_ids, self.offsets, self.orig_shapes))
+
+    def select(self, mask: np.ndarray) -> DetectionBatch:
+        """Mantém apenas as detecções marcadas em ``mask`` (todas as imagens são preservadas).
+
+        Args:
+            mask: Array booleano (N,).
+
+        Returns:
+            Novo batch filtrado.
+        """
+        mask = np.asarray(mask, dtype=bool)
+        counts = np.bincount(self.image_ids[mask], minlength=len(self))
+        offsets = np.zeros(len(self) + 1, np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return DetectionBatch(
+            self.boxes[mask],
+            self.scores[mask],
+            self.class_ids[mask],
+            offsets,
+            self.orig_shapes,
+            self.paths,
+            self.names,
+        )
+
+    def filter(self, min_score: float | None = None, classes: Iterable[int] | None = None) -> DetectionBatch:
+        """Filtra detecções por score mínimo e/ou classes.
+
+        Args:
+            min_score: Score mínimo.
+            classes: IDs de classe a manter.
+
+        Returns:
+            Novo batch filtrado.
+
+        Examples:
+            >>> cars = batch.filter(classes=[2], min_score=0.6)
+        """
+        mask = np.ones(self.num_detections, dtype=bool)
+        if min_score is not None:
+            mask &= self.scores >= min_score
+        if classes is not None:
+            mask &= np.isin(self.class_ids, np.fromiter(classes, dtype=np.int32))
+        return self.select(mask)
+
+    def __len__(self) -> int:
+        """Número de imagens."""
+        return len(self.orig_shapes)
+
+    def __getitem__(self, index: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Retorna (boxes, scores, class_ids) da imagem ``index`` como views (sem cópia)."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Índice de imagem fora do intervalo: {index}")
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.boxes[start:end], self.scores[start:end], self.class_ids[start:end]
+
+    def __iter__(self):
+        """Itera sobre (boxes, scores, class_ids) de cada imagem."""
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self) -> str:
+        """Representação string do objeto."""
+        return f"DetectionBatch(images={len(self)}, detections={self.num_detections}, nbytes={self.nbytes})"
@@ -0,0 +1,495 @@
+# YOLOPunk 🩸 AGPL-3.0 License
+
+"""Sink colunar para detecções: arquivos Arrow/Parquet em vez de um ``.txt`` por imagem.
+
+``save_txt=True`` cria um arquivo por imagem; em milhões de imagens isso vira milhões de inodes, I/O preso em
+``fsync`` e um passo de parse lento depois. ``DetectionSink`` recebe ``DetectionBatch`` e grava as detecções em
+row groups de um arquivo colunar, a partir de uma thread de fundo com fila limitada (``write`` bloqueia quando o
+disco não acompanha), passando para um arquivo novo quando o atual atinge ``rollover_bytes``.
+
+Cada parte tem dois arquivos:
+
+- ``part-00000.<ext>``: uma linha por detecção (``image_id``, ``class_id``, ``score``, ``x1``, ``y1``, ``x2``,
+  ``y2``);
+- ``part-00000.images.<ext>``: uma linha por imagem (``image_id``, ``path``, ``height``, ``width``,
+  ``detections``), inclusive as sem detecção.
+
+Formatos: 'arrow' (Arrow IPC, lido por memory map sem cópia), 'parquet' (comprimido, para ferramentas externas) e
+'npy' (sem pyarrow: array estruturado NumPy lido com ``np.load(mmap_mode="r")``, índice de imagens em JSON lines).
+"""
+
+from __future__ import annotations
+
+import json
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from .results import DetectionBatch
+from .utils import np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = None
+    pq = None
+
+# Formatos suportados
+SINK_FORMATS = ("arrow", "parquet", "npy")
+
+# Tamanho padrão de cada parte antes do rollover (bytes)
+DEFAULT_ROLLOVER_BYTES = 512 * 1024**2
+
+# Linhas por row group
+DEFAULT_ROW_GROUP_ROWS = 64 * 1024
+
+# Colunas das detecções e das imagens
+DETECTION_DTYPE = np.dtype(
+    [
+        ("image_id", "<i8"),
+        ("class_id", "<i4"),
+        ("score", "<f4"),
+        ("x1", "<f4"),
+        ("y1", "<f4"),
+        ("x2", "<f4"),
+        ("y2", "<f4"),
+    ]
+)
+IMAGE_COLUMNS = ("image_id", "path", "height", "width", "detections")
+
+_SUFFIXES = {"arrow": ".arrow", "parquet": ".parquet", "npy": ".npy"}
+
+# Espaço reservado para o cabeçalho .npy, reescrito no fechamento com o número final de linhas
+_NPY_HEADER_BYTES = 256
+
+# Marca de fim da fila do writer
+_EOS = object()
+
+
+def _arrow_schemas() -> tuple[Any, Any]:
+    """Schemas Arrow das detecções e das imagens."""
+    detections = pa.schema([(name, pa.from_numpy_dtype(DETECTION_DTYPE[name])) for name in DETECTION_DTYPE.names])
+    images = pa.schema(
+        [
+            ("image_id", pa.int64()),
+            ("path", pa.string()),
+            ("height", pa.int32()),
+            ("width", pa.int32()),
+            ("detections", pa.int32()),
+        ]
+    )
+    return detections, images
+
+
+class _ArrowPart:
+    """Um arquivo Arrow IPC ou Parquet aberto para escrita, um row group por ``write``."""
+
+    def __init__(self, path: Path, schema: Any, format: str, compression: str | None):
+        self.path = path
+        self.schema = schema
+        if format == "parquet":
+            self._file = None
+            self._writer = pq.ParquetWriter(str(path), schema, compression=compression or "none")
+        else:
+            self._file = pa.OSFile(str(path), "wb")
+            options = pa.ipc.IpcWriteOptions(compression=compression) if compression else None
+            self._writer = pa.ipc.new_file(self._file, schema, options=options)
+
+    def write(self, columns: dict[str, Any]) -> None:
+        self._writer.write_table(pa.table(columns, schema=self.schema))
+
+    @property
+    def nbytes(self) -> int:
+        return self._file.tell() if self._file is not None else self.path.stat().st_size
+
+    def close(self) -> None:
+        self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+
+class _NpyPart:
+    """Arquivo ``.npy`` de registros crescendo por append; o cabeçalho é reescrito com o total no fechamento."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.rows = 0
+        self._file = open(path, "wb")
+        self._file.write(self._header(0))
+
+    @staticmethod
+    def _header(rows: int) -> bytes:
+        """Cabeçalho .npy (versão 1.0) de tamanho fixo."""
+        spec = {"descr": DETECTION_DTYPE.descr, "fortran_order": False, "shape": (rows,)}
+        text = repr(spec).encode("latin1")
+        prefix = b"\x93NUMPY\x01\x00"
+        padding = _NPY_HEADER_BYTES - len(prefix) - 2 - len(text) - 1
+        if padding < 0:
+            raise ValueError("Cabeçalho .npy maior que o espaço reservado")
+        return prefix + (_NPY_HEADER_BYTES - len(prefix) - 2).to_bytes(2, "little") + text + b" " * padding + b"\n"
+
+    def write(self, records: np.ndarray) -> None:
+        self._file.write(records.tobytes())
+        self.rows += len(records)
+
+    @property
+    def nbytes(self) -> int:
+        return self._file.tell()
+
+    def close(self) -> None:
+        self._file.seek(0)
+        self._file.write(self._header(self.rows))
+        self._file.close()
+
+
+class DetectionSink:
+    """Grava detecções em arquivos colunares a partir de uma thread de fundo.
+
+    Args:
+        root: Diretório das partes (criado se não existir).
+        format: 'arrow' (padrão com pyarrow), 'parquet' ou 'npy' (padrão sem pyarrow).
+        rollover_bytes: Tamanho a partir do qual a parte atual é fechada e uma nova é aberta.
+        row_group_rows: Detecções acumuladas antes de gravar um row group.
+        max_pending: Batches aguardando na fila; acima disso ``write`` bloqueia (back-pressure).
+        compression: Compressão dos formatos pyarrow ('zstd', 'lz4', 'snappy'...). None: padrão do formato
+            ('zstd' no Parquet, nenhuma no Arrow, para manter a leitura por memory map sem cópia).
+        prefix: Prefixo do nome das partes.
+        start_image_id: Primeiro ``image_id``. None: continua depois do maior ``image_id`` dos índices de imagens
+            já gravados em ``root`` (0 num diretório novo), para que ids não se repitam entre execuções. Num
+            ``root`` que já tem partes, as novas também continuam a numeração dos arquivos em vez de sobrescrevê-los.
+
+    Examples:
+        >>> with DetectionSink("results/run1", format="parquet") as sink:
+        ...     detector.detect(image_paths, sink=sink)
+        >>> sink.stats()["parts"]
+
+        >>> # Leitura por memory map
+        >>> table = read_detections("results/run1")
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        format: str | None = None,
+        rollover_bytes: int = DEFAULT_ROLLOVER_BYTES,
+        row_group_rows: int = DEFAULT_ROW_GROUP_ROWS,
+        max_pending: int = 8,
+        compression: str | None = None,
+        prefix: str = "part",
+        start_image_id: int | None = None,
+    ):
+        """Cria o diretório e inicia a thread de escrita."""
+        format = format or ("arrow" if PYARROW_AVAILABLE else "npy")
+        if format not in SINK_FORMATS:
+            raise ValueError(f"Formato inválido: {format!r}. Opções: {', '.join(SINK_FORMATS)}")
+        if format != "npy" and not PYARROW_AVAILABLE:
+            raise ImportError(f"format={format!r} requer pyarrow. Install com: pip install pyarrow")
+        if max_pending < 1 or row_group_rows < 1:
+            raise ValueError("max_pending e row_group_rows devem ser >= 1")
+
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.format = format
+        self.rollover_bytes = rollover_bytes
+        self.row_group_rows = row_group_rows
+        self.compression = compression if compression is not None else ("zstd" if format == "parquet" else None)
+        self.prefix = prefix
+        self._schemas = _arrow_schemas() if format != "npy" else (None, None)
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._errors: list[BaseException] = []
+        self._closed = False
+        self._next_image_id = start_image_id if start_image_id is not None else _resume_image_id(self.root, prefix)
+        self._parts: list[Path] = []
+        # Num diretório já usado (execução retomada), as partes novas continuam a numeração das existentes
+        self._first_part = len(list_parts(self.root, prefix))
+        self._part: Any = None
+        self._images_part: Any = None
+        self._pending: list[np.ndarray] = []
+        self._pending_rows = 0
+        self._pending_images: list[tuple] = []
+        self._images = 0
+        self._detections = 0
+        self._bytes_closed = 0
+        self._busy_s = 0.0
+        self._blocked_s = 0.0
+        self._thread = threading.Thread(target=self._run, name="yolopunk-sink", daemon=True)
+        self._thread.start()
+
+    # ─── API ───────────────────────────────────────────────────────
+
+    def write(self, batch: DetectionBatch) -> None:
+        """Enfileira um batch para gravação (bloqueia se a fila estiver cheia).
+
+        Os ``image_id`` são atribuídos na ordem das chamadas, continuando de um batch para o outro.
+        """
+        if self._closed:
+            raise RuntimeError("DetectionSink já foi fechado")
+        if self._errors:
+            raise self._errors[0]
+        t0 = time.perf_counter()
+        self._queue.put(batch)
+        self._blocked_s += time.perf_counter() - t0
+
+    def sync(self) -> None:
+        """Bloqueia até tudo o que foi enfileirado estar gravado e fecha a parte atual.
+
+        Depois do retorno os dados já escritos estão em partes completas e legíveis mesmo que o processo morra em
+        seguida; o próximo ``write`` abre uma parte nova. Usado por ``Vision.detect_directory`` antes de marcar
+        chunks como concluídos no checkpoint.
+        """
+        if self._closed:
+            raise RuntimeError("DetectionSink já foi fechado")
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+        if self._errors:
+            raise self._errors[0]
+
+    def close(self) -> None:
+        """Grava o que falta, fecha a parte atual e encerra a thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_EOS)
+        self._thread.join()
+        if self._errors:
+            raise self._errors[0]
+
+    def stats(self) -> dict:
+        """Retorna contadores do sink.
+
+        Returns:
+            Dicionário com ``images``, ``detections``, ``parts`` (arquivos de detecções abertos até agora),
+            ``bytes`` (tamanho das partes), ``pending`` (batches na fila), ``writer_busy_s`` (tempo da thread
+            gravando) e ``blocked_s`` (tempo que ``write`` esperou por espaço na fila).
+        """
+        current = self._part.nbytes if self._part is not None else 0
+        return {
+            "images": self._images,
+            "detections": self._detections,
+            "parts": len(self._parts),
+            "bytes": self._bytes_closed + current,
+            "pending": self._queue.qsize(),
+            "writer_busy_s": self._busy_s,
+            "blocked_s": self._blocked_s,
+        }
+
+    @property
+    def parts(self) -> list[Path]:
+        """Arquivos de detecções gravados (na ordem)."""
+        return list(self._parts)
+
+    def __enter__(self) -> DetectionSink:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        """Representação string do objeto."""
+        return f"DetectionSink(root={str(self.root)!r}, format={self.format!r}, parts={len(self._parts)})"
+
+    # ─── Thread de escrita ─────────────────────────────────────────
+
+    def _run(self) -> None:
+        """Consome a fila até o fim do fluxo; depois de um erro só drena (para não travar quem escreve)."""
+        while True:
+            batch = self._queue.get()
+            if batch is _EOS:
+                break
+            if isinstance(batch, threading.Event):
+                if not self._errors:
+                    try:
+                        self._flush()
+                        self._close_part()
+                    except BaseException as e:
+                        self._errors.append(e)
+                batch.set()
+                continue
+            if self._errors:
+                continue
+            t0 = time.perf_counter()
+            try:
+                self._consume(batch)
+            except BaseException as e:
+                self._errors.append(e)
+            self._busy_s += time.perf_counter() - t0
+        if not self._errors:
+            try:
+                self._flush()
+                self._close_part()
+            except BaseException as e:
+                self._errors.append(e)
+
+    def _consume(self, batch: DetectionBatch) -> None:
+        """Converte um batch em registros e grava row groups completos."""
+        n_images = len(batch)
+        image_ids = np.arange(self._next_image_id, self._next_image_id + n_images, dtype=np.int64)
+        self._next_image_id += n_images
+
+        records = np.empty(batch.num_detections, dtype=DETECTION_DTYPE)
+        records["image_id"] = image_ids[batch.image_ids]
+        records["class_id"] = batch.class_ids
+        records["score"] = batch.scores
+        for k, name in enumerate(("x1", "y1", "x2", "y2")):
+            records[name] = batch.boxes[:, k]
+        self._pending.append(records)
+        self._pending_rows += len(records)
+        counts = batch.counts
+        self._pending_images.extend(
+            zip(image_ids.tolist(), batch.paths, *batch.orig_shapes.T.tolist(), counts.tolist())
+        )
+        self._images += n_images
+        self._detections += len(records)
+        if self._pending_rows >= self.row_group_rows:
+            self._flush()
+
+    def _open_part(self) -> None:
+        """Abre a próxima parte (detecções + índice de imagens)."""
+        index = self._first_part + len(self._parts)
+        suffix = _SUFFIXES[self.format]
+        path = self.root / f"{self.prefix}-{index:05d}{suffix}"
+        if self.format == "npy":
+            self._part = _NpyPart(path)
+            self._images_part = open(self.root / f"{self.prefix}-{index:05d}.images.jsonl", "w")
+        else:
+            det_schema, img_schema = self._schemas
+            self._part = _ArrowPart(path, det_schema, self.format, self.compression)
+            self._images_part = _ArrowPart(
+                self.root / f"{self.prefix}-{index:05d}.images{suffix}", img_schema, self.format, self.compression
+            )
+        self._parts.append(path)
+
+    def _close_part(self) -> None:
+        """Fecha a parte atual, se houver."""
+        if self._part is None:
+            return
+        self._part.close()
+        self._images_part.close()
+        self._bytes_closed += self._part.path.stat().st_size
+        self._part = None
+        self._images_part = None
+
+    def _flush(self) -> None:
+        """Grava o acumulado como um row group e faz rollover se a parte passou do limite."""
+        if not self._pending_images:
+            return
+        if self._part is None:
+            self._open_part()
+        records = np.concatenate(self._pending) if len(self._pending) > 1 else self._pending[0]
+        images = self._pending_images
+        self._pending, self._pending_rows, self._pending_images = [], 0, []
+
+        if self.format == "npy":
+            self._part.write(records)
+            self._images_part.writelines(
+                json.dumps(dict(zip(IMAGE_COLUMNS, row)), ensure_ascii=False) + "\n" for row in images
+            )
+        else:
+            self._part.write({name: np.ascontiguousarray(records[name]) for name in DETECTION_DTYPE.names})
+            columns = list(zip(*images))
+            self._images_part.write({name: list(values) for name, values in zip(IMAGE_COLUMNS, columns)})
+
+        if self._part.nbytes >= self.rollover_bytes:
+            self._close_part()
+
+
+def _resume_image_id(root: Path, prefix: str) -> int:
+    """Primeiro ``image_id`` livre num diretório de sink: um depois do maior dos índices de imagens existentes.
+
+    Partes ilegíveis (ex.: Arrow sem rodapé de uma execução que caiu) são ignoradas, assim como a última linha
+    truncada de um índice JSON lines.
+    """
+    last = -1
+    for path in root.glob(f"{prefix}-*.images.*"):
+        if path.suffix == ".jsonl":
+            last = max(last, _last_jsonl_image_id(path))
+        elif path.suffix in (".arrow", ".parquet") and PYARROW_AVAILABLE:
+            try:
+                if path.suffix == ".parquet":
+                    column = pq.read_table(str(path), columns=["image_id"]).column("image_id")
+                else:
+                    column = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all().column("image_id")
+            except (OSError, pa.ArrowException):
+                continue
+            if len(column):
+                last = max(last, int(column.to_numpy().max()))
+    return last + 1
+
+
+def _last_jsonl_image_id(path: Path, tail_bytes: int = 64 * 1024) -> int:
+    """Maior ``image_id`` de um índice JSON lines (ids crescentes dentro da parte: basta o fim do arquivo)."""
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        f.seek(max(size - tail_bytes, 0))
+        lines = f.read().splitlines()
+    for line in reversed(lines):
+        try:
+            return int(json.loads(line)["image_id"])
+        except (ValueError, KeyError, TypeError):
+            continue
+    return -1
+
+
+def list_parts(root: str | Path, prefix: str = "part") -> list[Path]:
+    """Arquivos de detecções de um diretório de sink, em ordem."""
+    root = Path(root)
+    parts = [p for p in root.glob(f"{prefix}-*") if ".images." not in p.name and p.suffix in _SUFFIXES.values()]
+    return sorted(parts)
+
+
+def read_detections(source: str | Path, images: bool = False) -> Any:
+    """Lê detecções (ou o índice de imagens) gravadas por ``DetectionSink`` via memory map.
+
+    Args:
+        source: Diretório do sink ou um arquivo de parte.
+        images: Se True, lê o índice de imagens em vez das detecções.
+
+    Returns:
+        Formatos pyarrow: ``pyarrow.Table`` (Arrow IPC sem cópia; Parquet descomprimido a partir do arquivo
+        mapeado). Formato 'npy': array estruturado NumPy memory-mapped (detecções) ou lista de dicionários
+        (imagens); com várias partes, as detecções são concatenadas (cópia).
+
+    Examples:
+        >>> table = read_detections("results/run1")
+        >>> scores = table.column("score").to_numpy()
+
+        >>> records = read_detections("results/run1/part-00000.npy")
+        >>> records["score"].mean()
+    """
+    source = Path(source)
+    parts = list_parts(source) if source.is_dir() else [source]
+    if not parts:
+        raise FileNotFoundError(f"Nenhuma parte de DetectionSink em {source}")
+    if images:
+        parts = [p.with_name(p.name.replace(p.suffix, ".images" + p.suffix)) for p in parts]
+        if parts[0].suffix == ".npy":
+            parts = [p.with_suffix(".jsonl") for p in parts]
+
+    suffix = parts[0].suffix
+    if suffix == ".jsonl":
+        rows = []
+        for part in parts:
+            with open(part) as f:
+                rows.extend(json.loads(line) for line in f)
+        return rows
+    if suffix == ".npy":
+        arrays = [np.load(part, mmap_mode="r") for part in parts]
+        return arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+
+    if not PYARROW_AVAILABLE:
+        raise ImportError("Ler partes Arrow/Parquet requer pyarrow. Install com: pip install pyarrow")
+    tables = []
+    for part in parts:
+        if suffix == ".parquet":
+            tables.append(pq.read_table(str(part), memory_map=True))
+        else:
+            tables.append(pa.ipc.open_file(pa.memory_map(str(part), "r")).read_all())
+    return tables[0] if len(tables) == 1 else pa.concat_tables(tables)
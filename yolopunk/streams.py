@@ -0,0 +1,416 @@
+# YOLOPunk 🩸 AGPL-3.0 License
+
+"""Agendador de inferência para muitas fontes de vídeo com batches entre streams.
+
+Um loop ``detect(source, stream=True)`` por câmera roda sempre com batch 1 e deixa as fontes mais rápidas tomarem
+o modelo das mais lentas. ``StreamScheduler`` mantém uma thread de captura por fonte guardando só o frame mais
+recente e uma única thread de inferência que monta batches com frames de streams diferentes:
+
+- limite de FPS por stream (``max_fps``): um stream só entra num batch quando vence o seu intervalo;
+- justiça ponderada: cada stream tem um relógio virtual que avança ``1 / weight`` por frame atendido e o batch é
+  preenchido pelos streams mais atrasados, então uma fonte rápida não ocupa o lugar de uma lenta;
+- espera limitada (``max_wait_ms``) por mais streams antes de disparar um batch incompleto;
+- os resultados voltam para cada stream (callback ``on_result`` ou fila consultada com ``results``).
+
+Fontes ao vivo (câmeras, URLs) sobrescrevem o frame não atendido (contado em ``dropped``); arquivos esperam o frame
+anterior ser atendido, sem perder nenhum.
+"""
+
+from __future__ import annotations
+
+import collections
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from .utils import CV2_AVAILABLE, cv2
+
+# Prefixos de fontes tratadas como ao vivo por padrão
+_LIVE_PREFIXES = ("rtsp://", "rtmp://", "http://", "https://", "udp://", "tcp://")
+
+
+class _Stream:
+    """Estado de uma fonte registrada no agendador."""
+
+    def __init__(
+        self,
+        name: str,
+        source: str | Path | int,
+        max_fps: float | None,
+        weight: float,
+        live: bool,
+        stride: int,
+        on_result: Callable | None,
+        result_buffer: int,
+    ):
+        self.name = name
+        self.source = source
+        self.interval = 1.0 / max_fps if max_fps else 0.0
+        self.weight = weight
+        self.live = live
+        self.stride = stride
+        self.on_result = on_result
+        self.results: collections.deque = collections.deque(maxlen=result_buffer)
+
+        # Frame mais recente ainda não atendido: (índice, frame, capturado_em)
+        self.pending: tuple[int, Any, float] | None = None
+        self.finished = False
+        self.error: str | None = None
+        self.stop = threading.Event()
+        self.thread: threading.Thread | None = None
+
+        # Agendamento
+        self.virtual_time = 0.0
+        self.next_due = 0.0
+
+        # Métricas
+        self.captured = 0
+        self.inferred = 0
+        self.dropped = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.first_served: float | None = None
+        self.last_served = 0.0
+
+    def stats(self) -> dict:
+        """Contadores do stream."""
+        span = self.last_served - self.first_served if self.first_served is not None else 0.0
+        return {
+            "source": str(self.source),
+            "live": self.live,
+            "captured": self.captured,
+            "inferred": self.inferred,
+            "dropped": self.dropped,
+            "fps": (self.inferred - 1) / span if span > 0 else 0.0,
+            "mean_latency_ms": 1000.0 * self.latency_total / self.inferred if self.inferred else 0.0,
+            "max_latency_ms": 1000.0 * self.latency_max,
+            "finished": self.finished,
+            "error": self.error,
+        }
+
+
+class StreamScheduler:
+    """Agenda frames de várias fontes em batches compartilhados de inferência.
+
+    Args:
+        infer: Função que recebe uma lista de frames BGR e retorna uma lista de resultados na mesma ordem
+            (``Vision.multi_stream`` usa ``(boxes, scores, class_ids)`` por frame).
+        batch_size: Máximo de frames por chamada de ``infer`` (no máximo um frame por stream em cada batch).
+        max_wait_ms: Quanto o primeiro frame elegível espera por outros streams antes de um batch incompleto.
+        result_buffer: Resultados guardados por stream para ``results`` (os mais antigos saem primeiro).
+
+    Examples:
+        >>> scheduler = StreamScheduler(infer_fn, batch_size=8)
+        >>> scheduler.add("cam1.mp4", max_fps=10)
+        >>> scheduler.add(0, name="webcam", on_result=lambda name, index, frame, dets: ...)
+        >>> report = scheduler.run(duration=60)
+        >>> report["mean_batch_size"], report["streams"]["webcam"]["fps"]
+    """
+
+    def __init__(
+        self,
+        infer: Callable[[list], list],
+        batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        result_buffer: int = 32,
+    ):
+        """Configura o agendador (as threads só iniciam em ``start`` ou ``run``)."""
+        if not CV2_AVAILABLE:
+            raise ImportError("OpenCV não está instalado. Install com: pip install opencv-python")
+        if batch_size < 1 or result_buffer < 1:
+            raise ValueError("batch_size e result_buffer devem ser >= 1")
+        if max_wait_ms < 0:
+            raise ValueError(f"max_wait_ms deve ser >= 0, recebido: {max_wait_ms}")
+
+        self.infer = infer
+        self.batch_size = batch_size
+        self.max_wait_ms = max_wait_ms
+        self.result_buffer = result_buffer
+
+        self._streams: dict[str, _Stream] = {}
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._errors: list[BaseException] = []
+        self._thread: threading.Thread | None = None
+
+        # Métricas
+        self._batches = 0
+        self._frames = 0
+        self._histogram: collections.Counter[int] = collections.Counter()
+        self._infer_s = 0.0
+        self._t0: float | None = None
+
+    # ─── Registro de fontes ────────────────────────────────────────
+
+    def add(
+        self,
+        source: str | Path | int,
+        name: str | None = None,
+        max_fps: float | None = None,
+        weight: float = 1.0,
+        live: bool | None = None,
+        stride: int = 1,
+        on_result: Callable[[str, int, Any, Any], None] | None = None,
+    ) -> str:
+        """Registra uma fonte (e inicia sua captura, se o agendador já estiver rodando).
+
+        Args:
+            source: Caminho de vídeo, URL ou índice de câmera.
+            name: Nome do stream (padrão: ``str(source)``).
+            max_fps: Limite de frames inferidos por segundo deste stream. None: sem limite.
+            weight: Peso na divisão dos lugares do batch (2.0 recebe o dobro de um stream de peso 1.0).
+            live: Se True, guarda só o frame mais recente (câmeras); se False, espera o frame ser atendido antes
+                de ler o próximo (arquivos). Padrão: True para índices de câmera e URLs.
+            stride: Lê 1 a cada ``stride`` frames da fonte (os outros só avançam com ``grab``).
+            on_result: Callback ``on_result(name, frame_index, frame, result)`` chamado na thread de inferência.
+                Sem callback, os resultados ficam disponíveis em ``results(name)``.
+
+        Returns:
+            Nome do stream.
+        """
+        name = name if name is not None else str(source)
+        if weight <= 0 or stride < 1:
+            raise ValueError("weight deve ser > 0 e stride >= 1")
+        if live is None:
+            live = isinstance(source, int) or str(source).lower().startswith(_LIVE_PREFIXES)
+        stream = _Stream(name, source, max_fps, weight, live, stride, on_result, self.result_buffer)
+        with self._cond:
+            if name in self._streams:
+                raise ValueError(f"Stream já registrado: {name!r}")
+            # Entra no ritmo dos demais, sem crédito acumulado que atropelaria os streams existentes
+            active = [s.virtual_time for s in self._streams.values() if not s.finished]
+            stream.virtual_time = min(active) if active else 0.0
+            self._streams[name] = stream
+        if self._thread is not None:
+            self._start_capture(stream)
+        return name
+
+    def remove(self, name: str) -> None:
+        """Para a captura de um stream e o remove do agendador."""
+        with self._cond:
+            stream = self._streams.pop(name)
+            stream.stop.set()
+            self._cond.notify_all()
+        if stream.thread is not None:
+            stream.thread.join()
+
+    @property
+    def streams(self) -> list[str]:
+        """Nomes dos streams registrados."""
+        return list(self._streams)
+
+    def results(self, name: str) -> list[tuple[int, Any, Any]]:
+        """Retira os resultados acumulados de um stream.
+
+        Returns:
+            Lista de ``(frame_index, frame, result)`` na ordem de inferência.
+        """
+        with self._cond:
+            stream = self._streams[name]
+            items = list(stream.results)
+            stream.results.clear()
+        return items
+
+    # ─── Captura ───────────────────────────────────────────────────
+
+    def _start_capture(self, stream: _Stream) -> None:
+        stream.thread = threading.Thread(
+            target=self._capture, args=(stream,), name=f"yolopunk-stream-{stream.name}", daemon=True
+        )
+        stream.thread.start()
+
+    def _capture(self, stream: _Stream) -> None:
+        """Thread de captura de um stream: mantém ``stream.pending`` com o frame mais recente."""
+        source = str(stream.source) if isinstance(stream.source, Path) else stream.source
+        capture = cv2.VideoCapture(source)
+        try:
+            if not capture.isOpened():
+                raise ValueError(f"Não foi possível abrir: {stream.source}")
+            index = 0
+            while not stream.stop.is_set() and not self._stop.is_set():
+                if index % stream.stride:
+                    if not capture.grab():
+                        break
+                    index += 1
+                    continue
+                if not stream.live:
+                    # Arquivo: só lê o próximo depois que o atual foi atendido
+                    with self._cond:
+                        while stream.pending is not None and not (stream.stop.is_set() or self._stop.is_set()):
+                            self._cond.wait(0.1)
+                    if stream.pending is not None:
+                        break
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                with self._cond:
+                    if stream.pending is not None:
+                        stream.dropped += 1
+                    stream.pending = (index, frame, time.perf_counter())
+                    stream.captured += 1
+                    self._cond.notify_all()
+                index += 1
+        except Exception as e:
+            # Uma fonte com problema (câmera fora do ar) não derruba os outros streams
+            stream.error = f"{type(e).__name__}: {e}"
+        finally:
+            capture.release()
+            with self._cond:
+                stream.finished = True
+                self._cond.notify_all()
+
+    # ─── Agendamento e inferência ──────────────────────────────────
+
+    def _eligible(self, now: float) -> list[_Stream]:
+        """Streams com frame pendente e intervalo de FPS vencido, dos mais atrasados aos mais adiantados."""
+        ready = [s for s in self._streams.values() if s.pending is not None and now >= s.next_due]
+        ready.sort(key=lambda s: (s.virtual_time, s.pending[2]))
+        return ready
+
+    def _wait_timeout(self, now: float) -> float:
+        """Tempo até o próximo stream pendente vencer o intervalo de FPS (limitado a 0.1 s)."""
+        waits = [s.next_due - now for s in self._streams.values() if s.pending is not None]
+        return min([0.1, *waits]) if waits else 0.1
+
+    def _next_batch(self) -> list[tuple[_Stream, int, Any, float]] | None:
+        """Espera frames elegíveis e retira até ``batch_size`` deles. None quando todos os streams acabaram."""
+        with self._cond:
+            while True:
+                if self._stop.is_set():
+                    return None
+                now = time.perf_counter()
+                eligible = self._eligible(now)
+                if eligible:
+                    break
+                if self._streams and all(s.finished and s.pending is None for s in self._streams.values()):
+                    return None
+                self._cond.wait(max(self._wait_timeout(now), 0.0005))
+
+            # Espera curta por outros streams para não disparar um batch pela metade
+            deadline = now + self.max_wait_ms / 1000.0
+            while len(eligible) < self.batch_size and not self._stop.is_set():
+                remaining = deadline - time.perf_counter()
+                waiting = any(
+                    (s.pending is None and not s.finished) or (s.pending is not None and s.next_due <= deadline)
+                    for s in self._streams.values()
+                    if s not in eligible
+                )
+                if remaining <= 0 or not waiting:
+                    break
+                self._cond.wait(remaining)
+                eligible = self._eligible(time.perf_counter())
+
+            now = time.perf_counter()
+            batch = []
+            for stream in eligible[: self.batch_size]:
+                index, frame, captured_at = stream.pending
+                stream.pending = None
+                stream.virtual_time += 1.0 / stream.weight
+                stream.next_due = max(stream.next_due + stream.interval, now) if stream.interval else now
+                batch.append((stream, index, frame, captured_at))
+            self._cond.notify_all()
+            return batch
+
+    def _run(self) -> None:
+        """Loop da thread de inferência."""
+        try:
+            while True:
+                batch = self._next_batch()
+                if batch is None:
+                    break
+                t0 = time.perf_counter()
+                outputs = self.infer([frame for _, _, frame, _ in batch])
+                done = time.perf_counter()
+                if len(outputs) != len(batch):
+                    raise RuntimeError(f"infer retornou {len(outputs)} resultados para {len(batch)} frames")
+                self._infer_s += done - t0
+                self._batches += 1
+                self._frames += len(batch)
+                self._histogram[len(batch)] += 1
+
+                for (stream, index, frame, captured_at), output in zip(batch, outputs):
+                    latency = done - captured_at
+                    stream.inferred += 1
+                    stream.latency_total += latency
+                    stream.latency_max = max(stream.latency_max, latency)
+                    if stream.first_served is None:
+                        stream.first_served = done
+                    stream.last_served = done
+                    if stream.on_result is not None:
+                        stream.on_result(stream.name, index, frame, output)
+                    else:
+                        with self._cond:
+                            stream.results.append((index, frame, output))
+        except BaseException as e:
+            self._errors.append(e)
+            self._stop.set()
+        finally:
+            with self._cond:
+                self._cond.notify_all()
+
+    # ─── Ciclo de vida ─────────────────────────────────────────────
+
+    def start(self) -> StreamScheduler:
+        """Inicia as threads de captura e a de inferência (sem bloquear)."""
+        if self._thread is not None:
+            raise RuntimeError("StreamScheduler já foi iniciado")
+        self._t0 = time.perf_counter()
+        for stream in list(self._streams.values()):
+            self._start_capture(stream)
+        self._thread = threading.Thread(target=self._run, name="yolopunk-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def run(self, duration: float | None = None) -> dict:
+        """Roda até todas as fontes terminarem (ou por ``duration`` segundos) e retorna o relatório."""
+        if self._thread is None:
+            self.start()
+        self._thread.join(duration)
+        self.stop()
+        return self.stats()
+
+    def stop(self) -> None:
+        """Para a captura e a inferência e propaga o primeiro erro de qualquer thread."""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for stream in list(self._streams.values()):
+            stream.stop.set()
+            if stream.thread is not None:
+                stream.thread.join()
+        if self._thread is not None:
+            self._thread.join()
+        if self._errors:
+            raise self._errors[0]
+
+    def stats(self) -> dict:
+        """Retorna métricas agregadas e por stream.
+
+        Returns:
+            Dicionário com ``frames`` (inferidos), ``batches``, ``mean_batch_size``, ``batch_size_histogram``,
+            ``fps`` (agregado sobre o tempo total), ``capacity_fps`` (sobre o tempo dentro de ``infer``) e
+            ``streams`` (nome → ``captured``, ``inferred``, ``dropped``, ``fps``, latências, ``finished`` e ``error``).
+        """
+        wall = time.perf_counter() - self._t0 if self._t0 is not None else 0.0
+        with self._cond:
+            streams = {name: stream.stats() for name, stream in self._streams.items()}
+        return {
+            "frames": self._frames,
+            "batches": self._batches,
+            "mean_batch_size": self._frames / self._batches if self._batches else 0.0,
+            "batch_size_histogram": dict(sorted(self._histogram.items())),
+            "fps": self._frames / wall if wall > 0 else 0.0,
+            "capacity_fps": self._frames / self._infer_s if self._infer_s > 0 else 0.0,
+            "streams": streams,
+        }
+
+    def __enter__(self) -> StreamScheduler:
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def __repr__(self) -> str:
+        """Representação string do objeto."""
+        return f"StreamScheduler(streams={len(self._streams)}, batch_size={self.batch_size})"
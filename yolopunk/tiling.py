@@ -0,0 +1,202 @@
+# YOLOPunk 🩸 AGPL-3.0 License
+
+"""Inferência fatiada (tiled) para imagens muito grandes.
+
+Divide a imagem em tiles sobrepostos (views NumPy, sem cópia), permitindo que objetos pequenos sejam vistos na
+resolução nativa. As detecções de cada tile voltam para coordenadas globais e duplicatas nas emendas são removidas
+com NMS ou weighted box fusion por classe; opcionalmente, pedaços de objetos cortados numa emenda, cujo IoU com a
+box inteira é baixo, são absorvidos por interseção sobre a menor área (IoS) pela box que atravessa a emenda.
+"""
+
+from __future__ import annotations
+
+from .boxes import _class_groups, _overlap_pairs, _resolve_sparse, box_area, nms, weighted_boxes_fusion
+from .utils import np
+
+
+def tile_grid(height: int, width: int, tile: int = 640, overlap: float = 0.2) -> list[tuple[int, int, int, int]]:
+    """Calcula as janelas de uma grade de tiles sobrepostos.
+
+    O último tile de cada linha/coluna é alinhado à borda da imagem, então toda a imagem é coberta sem tiles
+    parciais (exceto quando a imagem é menor que ``tile``).
+
+    Args:
+        height: Altura da imagem.
+        width: Largura da imagem.
+        tile: Lado do tile em pixels.
+        overlap: Fração de sobreposição entre tiles vizinhos (0 a <1).
+
+    Returns:
+        Lista de janelas ``(x0, y0, x1, y1)``.
+
+    Examples:
+        >>> tile_grid(1080, 1920, tile=640, overlap=0.2)[:2]
+        [(0, 0, 640, 640), (512, 0, 1152, 640)]
+    """
+    if not 0 <= overlap < 1:
+        raise ValueError(f"overlap deve estar em [0, 1), recebido: {overlap}")
+    step = max(1, int(tile * (1 - overlap)))
+
+    def starts(size: int) -> list[int]:
+        if size <= tile:
+            return [0]
+        positions = list(range(0, size - tile, step))
+        positions.append(size - tile)
+        return positions
+
+    return [
+        (x0, y0, min(x0 + tile, width), min(y0 + tile, height)) for y0 in starts(height) for x0 in starts(width)
+    ]
+
+
+def slice_image(img: np.ndarray, tile: int = 640, overlap: float = 0.2) -> tuple[list[np.ndarray], np.ndarray]:
+    """Fatia uma imagem em tiles sobrepostos sem copiar pixels.
+
+    Args:
+        img: Imagem HWC.
+        tile: Lado do tile em pixels.
+        overlap: Fração de sobreposição entre tiles vizinhos.
+
+    Returns:
+        Tupla (lista de views da imagem, array (T, 2) com o deslocamento ``(x0, y0)`` de cada tile).
+    """
+    windows = tile_grid(img.shape[0], img.shape[1], tile, overlap)
+    views = [img[y0:y1, x0:x1] for x0, y0, x1, y1 in windows]
+    offsets = np.array([(x0, y0) for x0, y0, _, _ in windows], dtype=np.float32).reshape(-1, 2)
+    return views, offsets
+
+
+# Estratégias de fusão entre tiles
+MERGE_METHODS = ("nms", "wbf")
+
+
+# Tolerância (px) para considerar que uma box encosta na borda de um tile
+_SEAM_MARGIN = 2.0
+
+
+def _seam_lines(boxes: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    """Emendas em que cada box foi cortada: bordas internas (não da imagem) de um tile que a contém.
+
+    Returns:
+        Array (N, 4) com a coordenada da emenda à esquerda, acima, à direita e abaixo de cada box (``-inf``/``inf``
+        quando a box não encosta naquela borda de nenhum tile).
+    """
+    m = _SEAM_MARGIN
+    lo, hi = windows[:, :2].min(axis=0), windows[:, 2:].max(axis=0)
+    internal = np.concatenate([windows[:, :2] > lo, windows[:, 2:] < hi], axis=1)
+    seams = np.tile(np.array([-np.inf, -np.inf, np.inf, np.inf], np.float32), (len(boxes), 1))
+
+    # Só boxes com alguma borda perto de uma linha de emenda vão para a comparação box × tile
+    near = np.zeros(len(boxes), dtype=bool)
+    for k in range(4):
+        lines = np.unique(windows[internal[:, k], k])
+        if len(lines):
+            pos = np.searchsorted(lines, boxes[:, k])
+            below = lines[np.maximum(pos - 1, 0)]
+            above = lines[np.minimum(pos, len(lines) - 1)]
+            near |= np.minimum(np.abs(boxes[:, k] - below), np.abs(boxes[:, k] - above)) <= m
+    idx = np.flatnonzero(near)
+    if not len(idx):
+        return seams
+
+    b, w, edge = boxes[idx, None, :], windows[None, :, :], internal[None, :, :]
+    inside = (b[..., :2] >= w[..., :2] - m).all(axis=-1) & (b[..., 2:] <= w[..., 2:] + m).all(axis=-1)
+    # (n, T, 2): a box encosta na borda inicial/final de um tile que a contém e essa borda é uma emenda
+    start = inside[..., None] & edge[..., :2] & (b[..., :2] <= w[..., :2] + m)
+    end = inside[..., None] & edge[..., 2:] & (b[..., 2:] >= w[..., 2:] - m)
+    seams[idx, :2] = np.where(start, w[..., :2], -np.inf).max(axis=1)
+    seams[idx, 2:] = np.where(end, w[..., 2:], np.inf).min(axis=1)
+    return seams
+
+
+def _merge_seams(
+    boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray, windows: np.ndarray, ios: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Funde pedaços de objetos cortados numa emenda na box da mesma classe que atravessa essa emenda.
+
+    Só pares em que uma box encosta numa emenda do seu tile e a outra passa dela são considerados, então objetos
+    aninhados dentro de um mesmo tile não se fundem. Os pares saem das matrizes em blocos do NMS
+    (``boxes._overlap_pairs``) e são resolvidos gulosamente em ordem de score (``boxes._resolve_sparse``); a box
+    mantida passa a envolver as que absorveu.
+
+    Espera boxes em ordem decrescente de score e preserva essa ordem.
+    """
+    seams = _seam_lines(boxes, windows)
+    cut = np.isfinite(seams).any(axis=1)
+    if not cut.any():
+        return boxes, scores, class_ids
+
+    def crosses(seam: np.ndarray, other: np.ndarray) -> np.ndarray:
+        return ((other[:, :2] < seam[:, :2] - _SEAM_MARGIN) | (other[:, 2:] > seam[:, 2:] + _SEAM_MARGIN)).any(axis=1)
+
+    boxes = np.array(boxes, dtype=np.float32)
+    keep = np.ones(len(boxes), dtype=bool)
+    for group in _class_groups(class_ids, len(boxes)):
+        if len(group) < 2 or not cut[group].any():
+            continue
+        # ``group`` preserva a ordem de score: índices locais são ranks
+        group = np.sort(group)
+        local = boxes[group]
+        a, b = _overlap_pairs(local, 0.0)
+        first, second = local[a], local[b]
+        inter = np.clip(np.minimum(first[:, 2:], second[:, 2:]) - np.maximum(first[:, :2], second[:, :2]), 0, None)
+        smaller = np.minimum(box_area(first), box_area(second)) + 1e-9
+        seam = crosses(seams[group[a]], second) | crosses(seams[group[b]], first)
+        match = (inter.prod(axis=1) / smaller > ios) & seam
+        if not match.any():
+            continue
+        kept, leader = _resolve_sparse(a[match], b[match], len(group))
+        np.minimum.at(local[:, :2], leader, local[:, :2].copy())
+        np.maximum.at(local[:, 2:], leader, local[:, 2:].copy())
+        boxes[group] = local
+        keep[group[~kept]] = False
+    return boxes[keep], scores[keep], class_ids[keep]
+
+
+def merge_detections(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    class_ids: np.ndarray,
+    iou: float = 0.5,
+    max_det: int | None = None,
+    method: str = "nms",
+    ios: float | None = None,
+    windows: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Remove duplicatas entre tiles, por classe.
+
+    Args:
+        boxes: Array (N, 4) em ``x1, y1, x2, y2`` globais.
+        scores: Array (N,) de confianças.
+        class_ids: Array (N,) de IDs de classe.
+        iou: IoU acima do qual boxes da mesma classe são consideradas duplicatas.
+        max_det: Número máximo de detecções mantidas.
+        method: 'nms' mantém a box de maior score; 'wbf' funde as duplicatas em uma box média ponderada (melhor
+            para objetos cortados na emenda).
+        ios: Se definido, depois da fusão por IoU e do corte em ``max_det``, uma box cortada numa emenda de tile
+            cuja interseção com outra box da mesma classe que atravessa a emenda cobre mais que essa fração da
+            menor das duas (ex.: a metade de um objeto vista pelo tile vizinho) é fundida na de maior score, que
+            passa a envolver as duas. None desativa.
+        windows: Array (T, 4) com as janelas ``(x0, y0, x1, y1)`` dos tiles, obrigatório com ``ios``.
+
+    Returns:
+        Tupla (boxes, scores, class_ids) mantidos, em ordem decrescente de score.
+
+    Examples:
+        >>> windows = np.array(tile_grid(2160, 3840, tile=640, overlap=0.2))
+        >>> boxes, scores, class_ids = merge_detections(boxes, scores, class_ids, ios=0.8, windows=windows)
+    """
+    if method not in MERGE_METHODS:
+        raise ValueError(f"method inválido: {method!r}. Opções: {', '.join(MERGE_METHODS)}")
+    if ios is not None and windows is None:
+        raise ValueError("ios requer as janelas dos tiles (windows)")
+    if method == "wbf":
+        boxes, scores, class_ids = weighted_boxes_fusion(boxes, scores, class_ids, iou_threshold=iou, conf_type="max")
+        boxes, scores, class_ids = boxes[:max_det], scores[:max_det], class_ids[:max_det]
+    else:
+        keep = nms(boxes, scores, iou, class_ids=class_ids, max_det=max_det)
+        boxes, scores, class_ids = boxes[keep], scores[keep], class_ids[keep]
+    if ios is not None:
+        windows = np.asarray(windows, dtype=np.float32).reshape(-1, 4)
+        boxes, scores, class_ids = _merge_seams(boxes, scores, class_ids, windows, ios)
+    return boxes, scores, class_ids
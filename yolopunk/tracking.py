@@ -0,0 +1,477 @@
+# YOLOPunk 🩸 AGPL-3.0 License
+
+"""Tracker multi-objeto leve em NumPy, no estilo SORT/ByteTrack.
+
+Cada track carrega um filtro de Kalman de velocidade constante sobre ``(cx, cy, aspect, h)``; o estado de todos os
+tracks vive em arrays (N, 8) e (N, 8, 8), então o passo de predição é uma única multiplicação de matrizes. A
+associação detecção-track usa IoU, com o algoritmo húngaro (implementado aqui, sem SciPy) ou guloso, em duas
+etapas como no ByteTrack: primeiro as detecções de score alto, depois as de score baixo contra os tracks que
+sobraram.
+
+Entre detecções o tracker só prediz, o que permite rodar o detector a cada N frames: ``Tracker.should_detect()``
+pede uma nova detecção quando o intervalo vence ou quando a confiança dos tracks decai abaixo do mínimo.
+"""
+
+from __future__ import annotations
+
+from .boxes import box_iou
+from .utils import np
+
+# Algoritmos de associação suportados
+MATCHING_METHODS = ("hungarian", "greedy")
+
+# Pesos do ruído do Kalman em relação à altura da box (valores do ByteTrack)
+_STD_POSITION = 1.0 / 20
+_STD_VELOCITY = 1.0 / 160
+
+# Modelo de velocidade constante: estado (cx, cy, a, h, vcx, vcy, va, vh), medição (cx, cy, a, h)
+_F = np.eye(8)
+_F[:4, 4:] = np.eye(4)
+
+
+def _to_xyah(boxes: np.ndarray) -> np.ndarray:
+    """``x1, y1, x2, y2`` -> ``cx, cy, largura/altura, altura``."""
+    w = boxes[:, 2] - boxes[:, 0]
+    h = boxes[:, 3] - boxes[:, 1]
+    return np.stack([boxes[:, 0] + w / 2, boxes[:, 1] + h / 2, w / np.maximum(h, 1e-6), h], axis=1)
+
+
+def _to_xyxy(xyah: np.ndarray) -> np.ndarray:
+    """``cx, cy, largura/altura, altura`` -> ``x1, y1, x2, y2``."""
+    h = xyah[:, 3]
+    w = xyah[:, 2] * h
+    return np.stack(
+        [xyah[:, 0] - w / 2, xyah[:, 1] - h / 2, xyah[:, 0] + w / 2, xyah[:, 1] + h / 2], axis=1
+    ).astype(np.float32)
+
+
+def _diag_cov(std: np.ndarray) -> np.ndarray:
+    """Covariâncias diagonais (N, K, K) a partir dos desvios (N, K)."""
+    cov = np.zeros((*std.shape, std.shape[1]))
+    idx = np.arange(std.shape[1])
+    cov[:, idx, idx] = std**2
+    return cov
+
+
+def buffered_iou(tracks: np.ndarray, margins: np.ndarray, detections: np.ndarray) -> np.ndarray:
+    """IoU entre boxes expandidas (C-BIoU): cada par usa a margem do track nas duas boxes.
+
+    Com detecção esparsa o objeto anda bastante entre duas detecções e o IoU simples contra a predição cai a zero;
+    expandir as duas boxes pela incerteza do track recupera o casamento sem distorcer o IoU de boxes alinhadas.
+
+    Args:
+        tracks: Boxes preditas (N, 4) em ``x1, y1, x2, y2``.
+        margins: Margens (N, 2) em x e y, em pixels.
+        detections: Boxes detectadas (M, 4).
+
+    Returns:
+        Matriz (N, M) de IoU.
+    """
+    mx, my = margins[:, 0:1], margins[:, 1:2]
+    t = [tracks[:, 0:1] - mx, tracks[:, 1:2] - my, tracks[:, 2:3] + mx, tracks[:, 3:4] + my]
+    x1, y1, x2, y2 = (detections[None, :, k] for k in range(4))
+    d = [x1 - mx, y1 - my, x2 + mx, y2 + my]
+    iw = np.clip(np.minimum(t[2], d[2]) - np.maximum(t[0], d[0]), 0, None)
+    ih = np.clip(np.minimum(t[3], d[3]) - np.maximum(t[1], d[1]), 0, None)
+    inter = iw * ih
+    union = (t[2] - t[0]) * (t[3] - t[1]) + (d[2] - d[0]) * (d[3] - d[1]) - inter
+    return inter / np.maximum(union, 1e-9)
+
+
+def linear_assignment(cost: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Atribuição de custo mínimo (algoritmo húngaro com caminhos aumentantes, O(n²·m)).
+
+    Args:
+        cost: Matriz (N, M) de custos.
+
+    Returns:
+        Tupla (linhas, colunas) do casamento; ``min(N, M)`` pares.
+
+    Examples:
+        >>> rows, cols = linear_assignment(1.0 - box_iou(tracks, detections))
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.shape[0] > cost.shape[1]:
+        cols, rows = linear_assignment(cost.T)
+        order = np.argsort(rows, kind="stable")
+        return rows[order], cols[order]
+    n, m = cost.shape
+    if n == 0:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64)
+
+    # Potenciais u (linhas) e v (colunas); p[j] = linha (1-based) casada com a coluna j; coluna 0 é sentinela
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, np.int64)
+    way = np.zeros(m + 1, np.int64)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, bool)
+        while True:
+            used[j0] = True
+            free = ~used[1:]
+            reduced = cost[p[j0] - 1] - u[p[j0]] - v[1:]
+            better = free & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = j0
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[1:][free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    cols = np.nonzero(p[1:])[0]
+    rows = p[1:][cols] - 1
+    order = np.argsort(rows, kind="stable")
+    return rows[order], cols[order]
+
+
+def _greedy_assignment(iou: np.ndarray, threshold: float) -> tuple[np.ndarray, np.ndarray]:
+    """Casamento guloso: pares de maior IoU primeiro."""
+    rows, cols = np.nonzero(iou >= threshold)
+    order = np.argsort(-iou[rows, cols], kind="stable")
+    used_rows, used_cols, pairs = set(), set(), []
+    for r, c in zip(rows[order], cols[order]):
+        if r in used_rows or c in used_cols:
+            continue
+        used_rows.add(r)
+        used_cols.add(c)
+        pairs.append((r, c))
+    if not pairs:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64)
+    matched = np.array(pairs, dtype=np.int64)
+    return matched[:, 0], matched[:, 1]
+
+
+class TrackFrame:
+    """Tracks ativos em um frame.
+
+    Attributes:
+        frame_index: Índice do frame no stream.
+        boxes: Array float32 (N, 4) em ``x1, y1, x2, y2``.
+        ids: Array int64 (N,) com o ID estável de cada track.
+        scores: Array float32 (N,) com a confiança atual de cada track (score da última detecção, decaindo a cada
+            frame sem detecção).
+        class_ids: Array int32 (N,) de IDs de classe.
+        detected: True se o detector rodou neste frame.
+    """
+
+    __slots__ = ("boxes", "class_ids", "detected", "frame_index", "ids", "scores")
+
+    def __init__(
+        self,
+        frame_index: int,
+        boxes: np.ndarray,
+        ids: np.ndarray,
+        scores: np.ndarray,
+        class_ids: np.ndarray,
+        detected: bool,
+    ):
+        self.frame_index = frame_index
+        self.boxes = boxes
+        self.ids = ids
+        self.scores = scores
+        self.class_ids = class_ids
+        self.detected = detected
+
+    def __len__(self) -> int:
+        """Número de tracks no frame."""
+        return len(self.ids)
+
+    def __repr__(self) -> str:
+        """Representação string do objeto."""
+        return f"TrackFrame(frame={self.frame_index}, tracks={len(self)}, detected={self.detected})"
+
+
+class Tracker:
+    """Tracker SORT/ByteTrack com filtro de Kalman vetorizado e detecção esparsa.
+
+    Args:
+        high_thresh: Detecções com score >= isso entram na primeira associação (e podem criar tracks).
+        low_thresh: Detecções com ``low_thresh <= score < high_thresh`` só recuperam tracks existentes (segunda
+            associação do ByteTrack); abaixo disso são ignoradas.
+        new_track_thresh: Score mínimo para uma detecção sem par criar um track novo.
+        match_iou: IoU mínimo entre o track predito e a detecção para casá-los (ver ``buffer``).
+        buffer: Margem das boxes na associação, em desvios-padrão da posição prevista pelo Kalman. A incerteza
+            cresce a cada frame sem detecção, então com ``detect_every`` alto as boxes crescem junto
+            (``buffered_iou``); 0 usa o IoU simples.
+        max_age: Frames sem detecção casada até um track ser removido.
+        matching: 'hungarian' (atribuição ótima, alguns ms com dezenas de tracks) ou 'greedy' (maior IoU primeiro,
+            mais barato em cenas lotadas).
+        detect_every: Intervalo máximo, em frames, entre duas detecções.
+        min_confidence: Se a confiança média dos tracks ativos cair abaixo disso, ``should_detect()`` pede uma
+            detecção antes do intervalo vencer.
+        decay: Fator aplicado à confiança de cada track a cada frame sem detecção casada.
+
+    Examples:
+        >>> tracker = Tracker(detect_every=5)
+        >>> for frame in frames:
+        ...     if tracker.should_detect():
+        ...         boxes, scores, class_ids = detector.detect(frame, conf=0.1, return_format="arrays")[0]
+        ...         tracks = tracker.step(boxes, scores, class_ids)
+        ...     else:
+        ...         tracks = tracker.step()
+        >>> tracker.stats()["detect_ratio"]
+    """
+
+    def __init__(
+        self,
+        high_thresh: float = 0.5,
+        low_thresh: float = 0.1,
+        new_track_thresh: float = 0.6,
+        match_iou: float = 0.3,
+        buffer: float = 1.5,
+        max_age: int = 30,
+        matching: str = "hungarian",
+        detect_every: int = 5,
+        min_confidence: float = 0.3,
+        decay: float = 0.9,
+    ):
+        """Inicializa o tracker sem tracks."""
+        if matching not in MATCHING_METHODS:
+            raise ValueError(f"matching inválido: {matching!r}. Opções: {', '.join(MATCHING_METHODS)}")
+        if detect_every < 1:
+            raise ValueError(f"detect_every deve ser >= 1, recebido: {detect_every}")
+        if not 0 <= low_thresh <= high_thresh:
+            raise ValueError(f"Requer 0 <= low_thresh <= high_thresh, recebido: {low_thresh}, {high_thresh}")
+        self.high_thresh = high_thresh
+        self.low_thresh = low_thresh
+        self.new_track_thresh = new_track_thresh
+        self.match_iou = match_iou
+        self.buffer = buffer
+        self.max_age = max_age
+        self.matching = matching
+        self.detect_every = detect_every
+        self.min_confidence = min_confidence
+        self.decay = decay
+        self.reset()
+
+    def reset(self) -> None:
+        """Remove todos os tracks e zera os contadores (os IDs recomeçam em 1)."""
+        self._mean = np.zeros((0, 8))
+        self._cov = np.zeros((0, 8, 8))
+        self._ids = np.zeros(0, np.int64)
+        self._class_ids = np.zeros(0, np.int32)
+        self._scores = np.zeros(0, np.float32)
+        self._since_update = np.zeros(0, np.int64)
+        self._active = np.zeros(0, bool)
+        self._next_id = 1
+        self._frames = 0
+        self._detections = 0
+        self._since_detection = 0
+
+    # ─── Kalman ────────────────────────────────────────────────────
+
+    def _predict(self) -> None:
+        """Avança todos os tracks um frame (um único ``matmul`` para o lote inteiro)."""
+        if not len(self._ids):
+            return
+        h = self._mean[:, 3:4]
+        std = np.concatenate(
+            [
+                _STD_POSITION * h,
+                _STD_POSITION * h,
+                np.full_like(h, 1e-2),
+                _STD_POSITION * h,
+                _STD_VELOCITY * h,
+                _STD_VELOCITY * h,
+                np.full_like(h, 1e-5),
+                _STD_VELOCITY * h,
+            ],
+            axis=1,
+        )
+        self._mean = self._mean @ _F.T
+        self._cov = _F @ self._cov @ _F.T + _diag_cov(std)
+
+    def _correct(self, index: np.ndarray, measurements: np.ndarray) -> None:
+        """Atualiza os tracks ``index`` com as medições ``xyah`` (N, 4)."""
+        mean, cov = self._mean[index], self._cov[index]
+        h = mean[:, 3:4]
+        std = np.concatenate([_STD_POSITION * h, _STD_POSITION * h, np.full_like(h, 1e-1), _STD_POSITION * h], 1)
+        innovation_cov = cov[:, :4, :4] + _diag_cov(std)
+        # K = P Hᵀ S⁻¹, resolvido sem inverter S
+        gain = np.linalg.solve(innovation_cov, cov[:, :4, :]).transpose(0, 2, 1)
+        self._mean[index] = mean + (gain @ (measurements - mean[:, :4])[:, :, None])[:, :, 0]
+        self._cov[index] = cov - gain @ innovation_cov @ gain.transpose(0, 2, 1)
+
+    def _spawn(self, boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray) -> None:
+        """Cria tracks novos a partir de detecções sem par."""
+        xyah = _to_xyah(boxes).astype(np.float64)
+        h = xyah[:, 3:4]
+        std = np.concatenate(
+            [
+                2 * _STD_POSITION * h,
+                2 * _STD_POSITION * h,
+                np.full_like(h, 1e-2),
+                2 * _STD_POSITION * h,
+                10 * _STD_VELOCITY * h,
+                10 * _STD_VELOCITY * h,
+                np.full_like(h, 1e-5),
+                10 * _STD_VELOCITY * h,
+            ],
+            axis=1,
+        )
+        n = len(boxes)
+        self._mean = np.concatenate([self._mean, np.concatenate([xyah, np.zeros_like(xyah)], axis=1)])
+        self._cov = np.concatenate([self._cov, _diag_cov(std)])
+        self._ids = np.concatenate([self._ids, np.arange(self._next_id, self._next_id + n)])
+        self._next_id += n
+        self._class_ids = np.concatenate([self._class_ids, class_ids.astype(np.int32)])
+        self._scores = np.concatenate([self._scores, scores.astype(np.float32)])
+        self._since_update = np.concatenate([self._since_update, np.zeros(n, np.int64)])
+        self._active = np.concatenate([self._active, np.ones(n, bool)])
+
+    # ─── Associação ────────────────────────────────────────────────
+
+    def _associate(
+        self,
+        tracks: np.ndarray,
+        boxes: np.ndarray,
+        class_ids: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Casa os tracks ``tracks`` (índices) com as detecções; só pares da mesma classe e IoU >= ``match_iou``."""
+        if not len(tracks) or not len(boxes):
+            return np.zeros(0, np.int64), np.zeros(0, np.int64)
+        predicted = _to_xyxy(self._mean[tracks, :4])
+        if self.buffer > 0:
+            margins = self.buffer * np.sqrt(self._cov[tracks][:, [0, 1], [0, 1]])
+            iou = buffered_iou(predicted, margins, boxes)
+        else:
+            iou = box_iou(predicted, boxes)
+        iou[self._class_ids[tracks][:, None] != class_ids[None, :]] = 0.0
+        if self.matching == "greedy":
+            rows, cols = _greedy_assignment(iou, self.match_iou)
+        else:
+            rows, cols = linear_assignment(1.0 - iou)
+            keep = iou[rows, cols] >= self.match_iou
+            rows, cols = rows[keep], cols[keep]
+        return tracks[rows], cols
+
+    def _update(self, boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray) -> None:
+        """Associação em duas etapas (ByteTrack), correção do Kalman e ciclo de vida dos tracks."""
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+        class_ids = np.asarray(class_ids).astype(np.int32).reshape(-1)
+        high = np.nonzero(scores >= self.high_thresh)[0]
+        low = np.nonzero((scores >= self.low_thresh) & (scores < self.high_thresh))[0]
+
+        # 1ª etapa: detecções fortes contra todos os tracks
+        all_tracks = np.arange(len(self._ids))
+        t1, d1 = self._associate(all_tracks, boxes[high], class_ids[high])
+        d1 = high[d1]
+        # 2ª etapa: detecções fracas recuperam os tracks que sobraram
+        remaining = np.setdiff1d(all_tracks, t1)
+        t2, d2 = self._associate(remaining, boxes[low], class_ids[low])
+        d2 = low[d2]
+
+        matched_tracks = np.concatenate([t1, t2])
+        matched_dets = np.concatenate([d1, d2])
+        if len(matched_tracks):
+            self._correct(matched_tracks, _to_xyah(boxes[matched_dets]).astype(np.float64))
+            self._scores[matched_tracks] = scores[matched_dets]
+            self._since_update[matched_tracks] = 0
+        self._active[:] = False
+        self._active[matched_tracks] = True
+
+        unmatched = np.setdiff1d(high, d1)
+        unmatched = unmatched[scores[unmatched] >= self.new_track_thresh]
+        if len(unmatched):
+            self._spawn(boxes[unmatched], scores[unmatched], class_ids[unmatched])
+
+    # ─── API ───────────────────────────────────────────────────────
+
+    @property
+    def confidence(self) -> np.ndarray:
+        """Confiança atual de cada track ativo: score da última detecção x ``decay`` por frame desde então."""
+        active = self._active
+        return self._scores[active] * self.decay ** self._since_update[active]
+
+    def should_detect(self) -> bool:
+        """Diz se o próximo frame deve passar pelo detector.
+
+        True no primeiro frame, quando ``detect_every`` frames se passaram desde a última detecção ou quando a
+        confiança média dos tracks ativos caiu abaixo de ``min_confidence``.
+        """
+        if self._detections == 0 or self._since_detection + 1 >= self.detect_every:
+            return True
+        confidence = self.confidence
+        return bool(len(confidence)) and float(confidence.mean()) * self.decay < self.min_confidence
+
+    def step(
+        self,
+        boxes: np.ndarray | None = None,
+        scores: np.ndarray | None = None,
+        class_ids: np.ndarray | None = None,
+        frame_index: int | None = None,
+    ) -> TrackFrame:
+        """Avança um frame.
+
+        Args:
+            boxes: Detecções do frame (N, 4) em ``x1, y1, x2, y2``, ou None se o detector não rodou.
+            scores: Scores (N,).
+            class_ids: Classes (N,).
+            frame_index: Índice do frame (padrão: contador interno).
+
+        Returns:
+            ``TrackFrame`` com os tracks ativos.
+        """
+        index = self._frames if frame_index is None else frame_index
+        self._frames += 1
+        self._predict()
+        self._since_update += 1
+        detected = boxes is not None
+        if detected:
+            self._update(boxes, scores, class_ids)
+            self._detections += 1
+            self._since_detection = 0
+        else:
+            self._since_detection += 1
+
+        alive = self._since_update <= self.max_age
+        if not alive.all():
+            self._mean, self._cov = self._mean[alive], self._cov[alive]
+            self._ids, self._class_ids = self._ids[alive], self._class_ids[alive]
+            self._scores, self._since_update = self._scores[alive], self._since_update[alive]
+            self._active = self._active[alive]
+
+        active = self._active
+        return TrackFrame(
+            index,
+            _to_xyxy(self._mean[active, :4]),
+            self._ids[active].copy(),
+            self.confidence.astype(np.float32),
+            self._class_ids[active].copy(),
+            detected,
+        )
+
+    def stats(self) -> dict:
+        """Retorna contadores do tracker.
+
+        Returns:
+            Dicionário com ``frames``, ``detections`` (frames que passaram pelo detector), ``detect_ratio``,
+            ``active_tracks`` e ``total_tracks`` (IDs criados).
+        """
+        return {
+            "frames": self._frames,
+            "detections": self._detections,
+            "detect_ratio": self._detections / self._frames if self._frames else 0.0,
+            "active_tracks": int(self._active.sum()),
+            "total_tracks": self._next_id - 1,
+        }
+
+    def __repr__(self) -> str:
+        """Representação string do objeto."""
+        return (
+            f"Tracker(matching={self.matching!r}, detect_every={self.detect_every}, "
+            f"active={int(self._active.sum())}, total={self._next_id - 1})"
+        )
@@ -8,8 +8,13 @@ e visualização de resultados.
 
 from __future__ import annotations
 
+import collections
+import os
+import struct
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Iterator
 
 try:
     import cv2
@@ -61,6 +66,204 @@ def load_image(
     return img
 
 
+# Marcadores JPEG "start of frame" (trazem altura e largura); C4, C8 e CC são outros segmentos
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# Fator de redução do decoder JPEG -> flags do imread (cor, cinza)
+_REDUCED_FLAGS = {
+    8: ("IMREAD_REDUCED_COLOR_8", "IMREAD_REDUCED_GRAYSCALE_8"),
+    4: ("IMREAD_REDUCED_COLOR_4", "IMREAD_REDUCED_GRAYSCALE_4"),
+    2: ("IMREAD_REDUCED_COLOR_2", "IMREAD_REDUCED_GRAYSCALE_2"),
+}
+
+
+def _jpeg_size(path: str) -> tuple[int, int] | None:
+    """Lê ``(altura, largura)`` do cabeçalho de um JPEG sem decodificá-lo; None se não for JPEG."""
+    with open(path, "rb") as f:
+        if f.read(2) != b"\xff\xd8":
+            return None
+        while True:
+            byte = f.read(1)
+            while byte and byte != b"\xff":
+                byte = f.read(1)
+            while byte == b"\xff":
+                byte = f.read(1)
+            if not byte:
+                return None
+            marker = byte[0]
+            if marker in (0x01, *range(0xD0, 0xD9)):
+                # Marcadores sem segmento
+                continue
+            header = f.read(2)
+            if len(header) < 2:
+                return None
+            length = struct.unpack(">H", header)[0]
+            if marker in _JPEG_SOF:
+                data = f.read(5)
+                if len(data) < 5:
+                    return None
+                height, width = struct.unpack(">HH", data[1:5])
+                return height, width
+            f.seek(length - 2, os.SEEK_CUR)
+
+
+def read_image(
+    path: str | Path,
+    max_side: int | None = None,
+    color_mode: str = "RGB",
+) -> np.ndarray | None:
+    """Carrega uma imagem já reduzida para ``max_side``, decodificando JPEGs em resolução menor.
+
+    Diferente de ``load_image`` + ``resize_image``, não decodifica a imagem inteira para depois encolher: em JPEGs
+    o tamanho é lido do cabeçalho e o decoder usa ``IMREAD_REDUCED_*`` (1/2, 1/4 ou 1/8 direto na DCT) com o
+    maior fator que ainda mantém o lado maior >= ``max_side``. A conversão para RGB é feita depois do resize,
+    sobre a imagem pequena.
+
+    Args:
+        path: Caminho para a imagem.
+        max_side: Lado maior da imagem retornada (só reduz, mantendo o aspect ratio). None: resolução original.
+        color_mode: 'RGB', 'BGR' (sem conversão; o que ``Vision.detect`` espera em arrays) ou 'GRAY'.
+
+    Returns:
+        Array numpy com a imagem ou None se falhar.
+
+    Examples:
+        >>> img = read_image("photo_4000x3000.jpg", max_side=640, color_mode="BGR")
+        >>> img.shape
+        (480, 640, 3)
+    """
+    if not CV2_AVAILABLE:
+        raise ImportError("OpenCV não está instalado. Install com: pip install opencv-python")
+    if color_mode not in ("RGB", "BGR", "GRAY"):
+        raise ValueError(f"color_mode inválido: {color_mode!r}. Opções: RGB, BGR, GRAY")
+
+    path = str(path)
+    gray = color_mode == "GRAY"
+    flag = cv2.IMREAD_GRAYSCALE if gray else cv2.IMREAD_COLOR
+    if max_side:
+        try:
+            size = _jpeg_size(path)
+        except OSError:
+            size = None
+        if size is not None:
+            for factor, names in _REDUCED_FLAGS.items():
+                if max(size) // factor >= max_side:
+                    flag = getattr(cv2, names[gray])
+                    break
+
+    img = cv2.imread(path, flag)
+    if img is None:
+        warnings.warn(f"Não foi possível ler a imagem: {path}", stacklevel=2)
+        return None
+
+    if max_side:
+        h, w = img.shape[:2]
+        scale = max_side / max(h, w)
+        if scale < 1:
+            size = (max(1, round(w * scale)), max(1, round(h * scale)))
+            img = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+    if color_mode == "RGB":
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    return img
+
+
+def load_images(
+    paths: Any,
+    workers: int | None = None,
+    max_side: int | None = None,
+    color_mode: str = "RGB",
+    prefetch: int | None = None,
+    batch_size: int | None = None,
+) -> Iterator[tuple]:
+    """Carrega imagens em paralelo, na ordem, com pré-carregamento limitado.
+
+    A decodificação roda num pool de threads (o OpenCV libera o GIL em ``imread`` e ``resize``) usando
+    ``read_image``, então JPEGs grandes são decodificados direto em resolução reduzida. Até ``prefetch`` imagens
+    ficam em andamento à frente do consumidor, o que mantém a memória limitada mesmo com milhões de caminhos.
+
+    Com ``batch_size``, as imagens são empilhadas num array ``(N, max_side, max_side, C)`` uint8 pré-alocado
+    (cada imagem no canto superior esquerdo, resto zerado). Dois arrays são reaproveitados em rodízio: um batch
+    continua válido durante o uso do batch seguinte e é sobrescrito quando o consumidor pede o próximo depois
+    dele; copie se precisar guardá-lo por mais tempo.
+
+    Args:
+        paths: Iterável de caminhos (consumido sob demanda).
+        workers: Threads de decodificação. Padrão: número de CPUs.
+        max_side: Lado maior das imagens (ver ``read_image``). Obrigatório com ``batch_size``.
+        color_mode: 'RGB', 'BGR' ou 'GRAY'.
+        prefetch: Imagens em andamento à frente do consumidor. Padrão: ``2 * workers`` (ao menos dois batches).
+        batch_size: Se definido, agrupa as imagens em batches empilhados.
+
+    Yields:
+        ``(path, image)`` por imagem (``image`` None se a leitura falhou), ou, com ``batch_size``,
+        ``(paths, batch, shapes)`` com ``shapes`` um array ``(n, 2)`` de ``(altura, largura)`` de cada imagem no
+        batch (``(0, 0)`` para falhas); o último batch pode ser menor (``batch[:len(paths)]``).
+
+    Examples:
+        >>> for path, img in load_images(image_paths, workers=8, max_side=640, color_mode="BGR"):
+        ...     results = detector.detect(img)
+
+        >>> for paths, batch, shapes in load_images(image_paths, max_side=640, batch_size=16, color_mode="BGR"):
+        ...     results = detector.detect(list(batch[: len(paths)]))
+    """
+    if not CV2_AVAILABLE:
+        raise ImportError("OpenCV não está instalado. Install com: pip install opencv-python")
+    if batch_size is not None and (batch_size < 1 or not max_side):
+        raise ValueError("batch_size exige batch_size >= 1 e max_side definido")
+    workers = workers or os.cpu_count() or 1
+    prefetch = max(prefetch or 2 * workers, 2 * batch_size if batch_size else 1)
+
+    def generate() -> Iterator[tuple]:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="yolopunk-load") as pool:
+            pending: collections.deque = collections.deque()
+            items = iter(paths)
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < prefetch:
+                    try:
+                        path = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending.append((path, pool.submit(read_image, path, max_side, color_mode)))
+                if not pending:
+                    return
+                path, future = pending.popleft()
+                yield path, future.result()
+
+    if batch_size is None:
+        return generate()
+    return _stack_batches(generate(), batch_size, max_side, color_mode)
+
+
+def _stack_batches(images: Iterator[tuple], batch_size: int, max_side: int, color_mode: str) -> Iterator[tuple]:
+    """Agrupa ``(path, image)`` em dois arrays pré-alocados usados em rodízio."""
+    channels = () if color_mode == "GRAY" else (3,)
+    buffers = [np.zeros((batch_size, max_side, max_side, *channels), dtype=np.uint8) for _ in range(2)]
+    index = 0
+    paths: list = []
+    shapes = np.zeros((batch_size, 2), dtype=np.int32)
+    for path, img in images:
+        batch = buffers[index % len(buffers)]
+        i = len(paths)
+        if img is None:
+            batch[i] = 0
+            shapes[i] = 0
+        else:
+            h, w = img.shape[:2]
+            batch[i, :h, :w] = img
+            batch[i, h:] = 0
+            batch[i, :h, w:] = 0
+            shapes[i] = h, w
+        paths.append(path)
+        if len(paths) == batch_size:
+            yield paths, batch, shapes.copy()
+            index += 1
+            paths = []
+    if paths:
+        yield paths, buffers[index % len(buffers)], shapes[: len(paths)].copy()
+
+
 def save_image(
     img: np.ndarray,
     path: str | Path,
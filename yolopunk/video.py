@@ -0,0 +1,283 @@
+# YOLOPunk 🩸 AGPL-3.0 License
+
+"""Pipeline de vídeo em estágios paralelos.
+
+Decodificação (``cv2.VideoCapture``), inferência e codificação (``cv2.VideoWriter`` + ``draw_boxes``) rodam em
+threads separadas ligadas por filas limitadas. O throughput tende ao do estágio mais lento, e não à soma dos três.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from .utils import CV2_AVAILABLE, cv2, draw_boxes
+
+# Marca de fim de fluxo entre os estágios
+_EOS = object()
+
+
+class StageStats:
+    """Contadores de um estágio do pipeline.
+
+    Attributes:
+        frames: Frames processados pelo estágio.
+        busy_s: Tempo gasto trabalhando (sem contar espera em filas).
+    """
+
+    __slots__ = ("busy_s", "frames")
+
+    def __init__(self) -> None:
+        self.frames = 0
+        self.busy_s = 0.0
+
+    def as_dict(self, wall_s: float) -> dict:
+        """Converte em dicionário com FPS efetivo (sobre o tempo total) e de capacidade (sobre o tempo ocupado)."""
+        return {
+            "frames": self.frames,
+            "busy_s": self.busy_s,
+            "fps": self.frames / wall_s if wall_s > 0 else 0.0,
+            "capacity_fps": self.frames / self.busy_s if self.busy_s > 0 else 0.0,
+        }
+
+
+class VideoPipeline:
+    """Pipeline decode → inferência → encode com filas limitadas.
+
+    Args:
+        infer: Função que recebe uma lista de frames BGR e retorna uma lista de ``(boxes, labels, scores)``.
+        source: Caminho do vídeo ou índice de câmera.
+        output: Caminho do vídeo anotado. None para não codificar.
+        batch_size: Frames por chamada de ``infer``.
+        stride: Processa 1 a cada ``stride`` frames decodificados.
+        queue_size: Capacidade de cada fila entre estágios.
+        drop_frames: Se True, quando a inferência não acompanha o decodificador descarta o frame mais antigo da
+            fila (útil para câmeras ao vivo); se False, ele espera.
+        on_result: Callback ``on_result(frame_index, frame, detections)`` chamado no estágio de inferência.
+        codec: FourCC do vídeo de saída.
+        color: Cor das boxes em RGB.
+
+    Examples:
+        >>> pipeline = VideoPipeline(infer_fn, "video.mp4", output="out.mp4", batch_size=4)
+        >>> report = pipeline.run()
+        >>> report["inference"]["fps"]
+    """
+
+    def __init__(
+        self,
+        infer: Callable[[list], list],
+        source: str | Path | int,
+        output: str | Path | None = None,
+        batch_size: int = 1,
+        stride: int = 1,
+        queue_size: int = 8,
+        drop_frames: bool = False,
+        on_result: Callable[[int, Any, tuple], None] | None = None,
+        codec: str = "mp4v",
+        color: tuple[int, int, int] = (139, 0, 0),
+    ):
+        """Configura o pipeline (as threads só iniciam em ``run``)."""
+        if not CV2_AVAILABLE:
+            raise ImportError("OpenCV não está instalado. Install com: pip install opencv-python")
+        if batch_size < 1 or stride < 1 or queue_size < 1:
+            raise ValueError("batch_size, stride e queue_size devem ser >= 1")
+
+        self.infer = infer
+        self.source = source
+        self.output = output
+        self.batch_size = batch_size
+        self.stride = stride
+        self.drop_frames = drop_frames
+        self.on_result = on_result
+        self.codec = codec
+        self.color = color
+
+        self._frames: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._encoded: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._errors: list[BaseException] = []
+        self._stats = {"decode": StageStats(), "inference": StageStats(), "encode": StageStats()}
+        self._dropped = 0
+        self._fps = 0.0
+
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        """Coloca na fila bloqueando, mas desiste se o pipeline for interrompido."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decode(self, capture: Any) -> None:
+        """Estágio de decodificação."""
+        stats = self._stats["decode"]
+        index = 0
+        try:
+            while not self._stop.is_set():
+                t0 = time.perf_counter()
+                if index % self.stride:
+                    # Frames pulados pelo stride: grab() avança sem decodificar
+                    ok = capture.grab()
+                    stats.busy_s += time.perf_counter() - t0
+                    if not ok:
+                        break
+                    index += 1
+                    continue
+                ok, frame = capture.read()
+                stats.busy_s += time.perf_counter() - t0
+                if not ok:
+                    break
+                stats.frames += 1
+                if self.drop_frames:
+                    try:
+                        self._frames.put_nowait((index, frame))
+                    except queue.Full:
+                        # Sobrecarga: descarta o frame mais antigo para manter a inferência no presente
+                        try:
+                            self._frames.get_nowait()
+                            self._dropped += 1
+                        except queue.Empty:
+                            pass
+                        try:
+                            self._frames.put_nowait((index, frame))
+                        except queue.Full:
+                            self._dropped += 1
+                elif not self._put(self._frames, (index, frame)):
+                    break
+                index += 1
+        except BaseException as e:
+            self._errors.append(e)
+            self._stop.set()
+        finally:
+            self._put(self._frames, _EOS)
+
+    def _encode(self) -> None:
+        """Estágio de codificação."""
+        stats = self._stats["encode"]
+        writer = None
+        # draw_boxes trata a imagem como RGB; frames do OpenCV são BGR, então a cor é passada invertida
+        color = self.color[::-1]
+        try:
+            while True:
+                try:
+                    item = self._encoded.get(timeout=0.1)
+                except queue.Empty:
+                    if self._stop.is_set():
+                        break
+                    continue
+                if item is _EOS or self._stop.is_set():
+                    break
+                t0 = time.perf_counter()
+                _, frame, (boxes, labels, scores) = item
+                if writer is None:
+                    h, w = frame.shape[:2]
+                    fps = self._fps / self.stride if self._fps > 0 else 30.0
+                    writer = cv2.VideoWriter(str(self.output), cv2.VideoWriter_fourcc(*self.codec), fps, (w, h))
+                writer.write(draw_boxes(frame, boxes, labels, scores, color=color))
+                stats.frames += 1
+                stats.busy_s += time.perf_counter() - t0
+        except BaseException as e:
+            self._errors.append(e)
+            self._stop.set()
+        finally:
+            if writer is not None:
+                writer.release()
+
+    def _next_batch(self) -> tuple[list, bool]:
+        """Coleta até ``batch_size`` frames da fila de decodificação."""
+        batch: list = []
+        while True:
+            try:
+                item = self._frames.get(timeout=0.1)
+                break
+            except queue.Empty:
+                if self._stop.is_set():
+                    return batch, True
+        if item is _EOS:
+            return batch, True
+        batch.append(item)
+        while len(batch) < self.batch_size:
+            try:
+                item = self._frames.get_nowait()
+            except queue.Empty:
+                break
+            if item is _EOS:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def run(self) -> dict:
+        """Executa o pipeline até o fim do vídeo.
+
+        Returns:
+            Relatório com estatísticas por estágio (``frames``, ``busy_s``, ``fps``, ``capacity_fps``), ``wall_s``,
+            ``fps`` de ponta a ponta e ``dropped``.
+        """
+        capture = cv2.VideoCapture(self.source if isinstance(self.source, int) else str(self.source))
+        if not capture.isOpened():
+            raise FileNotFoundError(f"Não foi possível abrir o vídeo: {self.source}")
+        self._fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+
+        started = time.perf_counter()
+        decoder = threading.Thread(target=self._decode, args=(capture,), name="yolopunk-decode", daemon=True)
+        encoder = None
+        if self.output is not None:
+            Path(self.output).parent.mkdir(parents=True, exist_ok=True)
+            encoder = threading.Thread(target=self._encode, name="yolopunk-encode", daemon=True)
+            encoder.start()
+        decoder.start()
+
+        stats = self._stats["inference"]
+        try:
+            done = False
+            while not done and not self._stop.is_set():
+                batch, done = self._next_batch()
+                if not batch:
+                    break
+                t0 = time.perf_counter()
+                detections = self.infer([frame for _, frame in batch])
+                if self.on_result is not None:
+                    for (index, frame), det in zip(batch, detections):
+                        self.on_result(index, frame, det)
+                stats.frames += len(batch)
+                # O put bloqueia enquanto o encoder está atrasado: é espera, não trabalho da inferência
+                stats.busy_s += time.perf_counter() - t0
+                if encoder is not None:
+                    for (index, frame), det in zip(batch, detections):
+                        if not self._put(self._encoded, (index, frame, det)):
+                            break
+        except BaseException:
+            self._stop.set()
+            raise
+        finally:
+            if self._stop.is_set():
+                # Libera o decodificador caso esteja bloqueado em uma fila cheia
+                while decoder.is_alive():
+                    try:
+                        self._frames.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+            decoder.join()
+            if encoder is not None:
+                self._put(self._encoded, _EOS)
+                encoder.join()
+            capture.release()
+
+        if self._errors:
+            raise self._errors[0]
+
+        wall_s = time.perf_counter() - started
+        report = {name: s.as_dict(wall_s) for name, s in self._stats.items()}
+        report.update(
+            {
+                "wall_s": wall_s,
+                "fps": stats.frames / wall_s if wall_s > 0 else 0.0,
+                "dropped": self._dropped,
+            }
+        )
+        return report